@@ -0,0 +1,4 @@
+"""
+Benchmarks package initialization file.
+This module contains the throughput benchmarks of the parsers and their corpus generators.
+"""
@@ -0,0 +1,100 @@
+"""
+Deterministic generators of synthetic XML and ZIP corpora for the benchmarks.
+"""
+
+import random
+import zipfile
+from pathlib import Path
+
+# Alphabet used for the generated text values
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+
+# Fixed member timestamp, so archives are byte-for-byte reproducible
+_ZIP_DATE_TIME = (2024, 1, 1, 0, 0, 0)
+
+
+def _random_text(rng, length):
+    """
+    Build a random text value.
+
+    Args:
+        rng (random.Random): The seeded random generator.
+        length (int): Number of characters.
+
+    Returns:
+        str: The generated text.
+    """
+    return "".join(rng.choice(_ALPHABET) for _ in range(length)).strip() or "x"
+
+
+def generate_xml(path, rows, width=10, depth=1, value_size=12, seed=0):
+    """
+    Write an XML file with one row element per record under the root.
+
+    Every row has `width` field elements. With a depth greater than one, the
+    value of each field is wrapped in `depth - 1` nested elements, which makes
+    the parser build and discard more elements per row.
+
+    Args:
+        path (str or Path): Destination file.
+        rows (int): Number of row elements.
+        width (int): Number of fields per row.
+        depth (int): Nesting depth of each field value (at least 1).
+        value_size (int): Number of characters of each text value.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        Path: The path of the generated file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    # A pool of values keeps generation fast while staying deterministic
+    values = [_random_text(rng, value_size) for _ in range(1024)]
+    opening = "".join(f"<v{level}>" for level in range(1, depth))
+    closing = "".join(f"</v{level}>" for level in reversed(range(1, depth)))
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<records>\n')
+        for row in range(rows):
+            fields = "".join(
+                f"<field{column}>{opening}{values[rng.randrange(1024)]}"
+                f"{closing}</field{column}>"
+                for column in range(width)
+            )
+            f.write(f"  <record><id>{row}</id>{fields}</record>\n")
+        f.write("</records>\n")
+
+    return path
+
+
+def generate_zip(path, members, member_size, compression=zipfile.ZIP_DEFLATED, seed=0):
+    """
+    Write a ZIP archive with members of a fixed uncompressed size.
+
+    Args:
+        path (str or Path): Destination file.
+        members (int): Number of members.
+        member_size (int): Uncompressed size in bytes of each member.
+        compression (int): zipfile compression method.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        Path: The path of the generated file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    # Compressible content, similar to the text exports found in real archives
+    line = (_random_text(rng, 79) + "\n").encode("ascii")
+    block = (line * (member_size // len(line) + 1))[:member_size]
+
+    with zipfile.ZipFile(path, "w", compression) as zip_ref:
+        for member in range(members):
+            info = zipfile.ZipInfo(f"data/member{member:06d}.txt", _ZIP_DATE_TIME)
+            info.compress_type = compression
+            zip_ref.writestr(info, block)
+
+    return path
@@ -0,0 +1,358 @@
+"""
+Throughput benchmarks of the parsers.
+
+Each benchmark converts a synthetic corpus in a fresh process and reports its
+wall time, rows per second, MB per second and peak memory. Results are written
+as JSON and can be compared against a stored baseline:
+
+    python -m benchmarks.run_benchmarks --scale medium --output baseline.json
+    python -m benchmarks.run_benchmarks --scale medium --baseline baseline.json
+
+For ZIP benchmarks a row is an extracted member and the processed bytes are the
+uncompressed bytes written.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmarks.generators import generate_xml, generate_zip
+from factory.parser_factory import ParserFactory
+from storage.local_storage import LocalStorageBackend
+from utils.logger import setup_logger
+from utils.metrics import peak_rss_bytes
+
+# Corpus sizes of each scale
+SCALES = {
+    "small": {
+        "xml_rows": 10000,
+        "xml_width": 10,
+        "xml_depth": 1,
+        "zip_members": 200,
+        "zip_member_size": 64 * 1024,
+    },
+    "medium": {
+        "xml_rows": 200000,
+        "xml_width": 10,
+        "xml_depth": 1,
+        "zip_members": 2000,
+        "zip_member_size": 128 * 1024,
+    },
+    "large": {
+        "xml_rows": 2000000,
+        "xml_width": 20,
+        "xml_depth": 2,
+        "zip_members": 10000,
+        "zip_member_size": 256 * 1024,
+    },
+}
+
+# Benchmark name -> parser class name, corpus, parser kwargs and, optionally,
+# the module the benchmark requires
+BENCHMARKS = {
+    "xml_tree": {
+        "classname": "XmlToCsvParser",
+        "corpus": "xml",
+        "kwargs": {"xml_backend": "etree"},
+    },
+    "xml_streaming": {
+        "classname": "XmlToCsvParser",
+        "corpus": "xml",
+        "kwargs": {"streaming": True, "xml_backend": "etree"},
+    },
+    "xml_expat": {
+        "classname": "XmlToCsvParser",
+        "corpus": "xml",
+        "kwargs": {"xml_backend": "expat"},
+    },
+    "xml_lxml": {
+        "classname": "XmlToCsvParser",
+        "corpus": "xml",
+        "kwargs": {"streaming": True, "xml_backend": "lxml"},
+        "requires": "lxml",
+    },
+    "xml_sharded": {
+        "classname": "XmlToCsvParser",
+        "corpus": "xml",
+        "kwargs": {"shard_workers": 4, "min_shard_size": 1024 * 1024},
+    },
+    "zip_sequential": {"classname": "ZipFileParser", "corpus": "zip", "kwargs": {}},
+    "zip_parallel": {
+        "classname": "ZipFileParser",
+        "corpus": "zip",
+        "kwargs": {"extract_workers": 4},
+    },
+}
+
+logger = setup_logger("Benchmarks")
+
+
+def generate_corpus(work_dir, sizes):
+    """
+    Generate the XML and ZIP corpora.
+
+    Args:
+        work_dir (Path): Directory simulating the S3 buckets.
+        sizes (dict): Corpus sizes, with the keys of a SCALES entry.
+
+    Returns:
+        dict: Corpus name -> {"origin", "rows", "bytes"}.
+    """
+    input_dir = Path(work_dir) / "bench" / "input"
+
+    xml_path = generate_xml(
+        input_dir / "corpus.xml",
+        sizes["xml_rows"],
+        width=sizes["xml_width"],
+        depth=sizes["xml_depth"],
+    )
+    zip_path = generate_zip(
+        input_dir / "corpus.zip", sizes["zip_members"], sizes["zip_member_size"]
+    )
+
+    return {
+        "xml": {
+            "origin": "s3://bench/input/corpus.xml",
+            "rows": sizes["xml_rows"],
+            "bytes": xml_path.stat().st_size,
+        },
+        "zip": {
+            "origin": "s3://bench/input/corpus.zip",
+            "rows": sizes["zip_members"],
+            "bytes": sizes["zip_members"] * sizes["zip_member_size"],
+        },
+    }
+
+
+def _run_parser(classname, origin, kwargs, work_dir):
+    """
+    Run one parser and measure it. Executed in a dedicated process.
+
+    Args:
+        classname (str): The parser class name.
+        origin (str): S3 path of the corpus.
+        kwargs (dict): The parser arguments.
+        work_dir (str): Directory simulating the S3 buckets.
+
+    Returns:
+        dict: The success flag, wall time and peak RSS of the run.
+    """
+    logging.disable(logging.CRITICAL)
+
+    baseline_rss = peak_rss_bytes()
+    output = f"s3://bench/output/{os.getpid()}/"
+    parser = ParserFactory().create_parser(
+        classname, origin, output, storage=LocalStorageBackend(work_dir), **kwargs
+    )
+
+    start = time.perf_counter()
+    success = parser.parse()
+    wall_time = time.perf_counter() - start
+
+    shutil.rmtree(parser.local_destiny, ignore_errors=True)
+    return {
+        "success": success,
+        "wall_time_s": wall_time,
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def run_benchmark(name, corpus, work_dir, repeat=3):
+    """
+    Run a benchmark several times and keep its best wall time.
+
+    Args:
+        name (str): The benchmark name, a key of BENCHMARKS.
+        corpus (dict): The generated corpora, as returned by generate_corpus.
+        work_dir (Path): Directory simulating the S3 buckets.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict: The benchmark metrics.
+
+    Raises:
+        RuntimeError: If the parser reports a failure.
+    """
+    definition = BENCHMARKS[name]
+    data = corpus[definition["corpus"]]
+
+    runs = []
+    for _ in range(repeat):
+        # A fresh process per run keeps the peak memory measurements apart
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            run = pool.submit(
+                _run_parser,
+                definition["classname"],
+                data["origin"],
+                definition["kwargs"],
+                str(work_dir),
+            ).result()
+        if not run["success"]:
+            raise RuntimeError(f"Benchmark {name} failed")
+        runs.append(run)
+
+    wall_time = min(run["wall_time_s"] for run in runs)
+    peak_rss = max((run["peak_rss_bytes"] or 0) for run in runs)
+    baseline_rss = min((run["baseline_rss_bytes"] or 0) for run in runs)
+
+    return {
+        "parser": definition["classname"],
+        "kwargs": definition["kwargs"],
+        "rows": data["rows"],
+        "bytes": data["bytes"],
+        "wall_time_s": wall_time,
+        "rows_per_sec": data["rows"] / wall_time,
+        "mb_per_sec": data["bytes"] / (1024 * 1024) / wall_time,
+        "peak_rss_bytes": peak_rss,
+        "peak_rss_delta_bytes": max(peak_rss - baseline_rss, 0),
+    }
+
+
+def compare_results(results, baseline, tolerance=0.1):
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        results (dict): The current results, as written by run_benchmarks.
+        baseline (dict): The baseline results.
+        tolerance (float): Allowed relative degradation (0.1 means 10%).
+
+    Returns:
+        list: Human readable descriptions of the regressions found.
+    """
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            continue
+
+        for metric in ("rows_per_sec", "mb_per_sec"):
+            if current[metric] < previous[metric] * (1 - tolerance):
+                regressions.append(
+                    f"{name}: {metric} dropped from {previous[metric]:.1f} "
+                    f"to {current[metric]:.1f}"
+                )
+
+        if current["peak_rss_delta_bytes"] > previous["peak_rss_delta_bytes"] * (
+            1 + tolerance
+        ) + 1024 * 1024:
+            regressions.append(
+                f"{name}: peak memory grew from {previous['peak_rss_delta_bytes']} "
+                f"to {current['peak_rss_delta_bytes']} bytes"
+            )
+
+    return regressions
+
+
+def run_benchmarks(names, sizes, repeat=3, work_dir=None):
+    """
+    Generate the corpus and run the selected benchmarks.
+
+    Args:
+        names (list): Names of the benchmarks to run.
+        sizes (dict): Corpus sizes, with the keys of a SCALES entry.
+        repeat (int): Number of runs of each benchmark.
+        work_dir (str or Path): Directory for the corpus and outputs
+            (default: a temporary directory removed afterwards).
+
+    Returns:
+        dict: The environment, corpus sizes and metrics of each benchmark.
+    """
+    temp_dir = None
+    if work_dir is None:
+        work_dir = temp_dir = tempfile.mkdtemp(prefix="benchmarks-")
+    work_dir = Path(work_dir)
+
+    try:
+        logger.info("Generating corpus in %s", work_dir)
+        corpus = generate_corpus(work_dir, sizes)
+
+        results = {
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "sizes": sizes,
+            "benchmarks": {},
+        }
+        for name in names:
+            requires = BENCHMARKS[name].get("requires")
+            if requires and importlib.util.find_spec(requires) is None:
+                logger.warning("Skipping %s: %s is not installed", name, requires)
+                continue
+
+            metrics = run_benchmark(name, corpus, work_dir, repeat)
+            results["benchmarks"][name] = metrics
+            logger.info(
+                "%s: %.3f s, %.0f rows/s, %.1f MB/s, peak RSS +%.1f MB",
+                name,
+                metrics["wall_time_s"],
+                metrics["rows_per_sec"],
+                metrics["mb_per_sec"],
+                metrics["peak_rss_delta_bytes"] / (1024 * 1024),
+            )
+        return results
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    """
+    Command line entry point of the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description="Run the parser benchmarks.")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument(
+        "--benchmark",
+        action="append",
+        choices=BENCHMARKS,
+        help="Benchmark to run (repeatable, default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    for key in SCALES["small"]:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, dest=key)
+    parser.add_argument("--work-dir", help="Directory for the generated corpus")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with this results JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    sizes = dict(SCALES[args.scale])
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+
+    results = run_benchmarks(
+        args.benchmark or list(BENCHMARKS), sizes, args.repeat, args.work_dir
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info("Results written to %s", args.output)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for regression in regressions:
+            logger.error("Regression: %s", regression)
+        if regressions:
+            sys.exit(1)
+        logger.info("No regression against %s", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
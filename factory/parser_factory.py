@@ -2,8 +2,7 @@
 Factory for creating parser instances based on the parser type.
 """
 
-from parsers.zip_file_parser import ZipFileParser
-from parsers.xml_to_csv_parser import XmlToCsvParser
+from factory.parser_registry import default_registry
 from utils.logger import setup_logger
 
 
@@ -12,17 +11,36 @@ class ParserFactory:
     Factory class for creating parser instances based on the parser type.
     """
 
-    def __init__(self):
+    def __init__(self, registry=None):
         """
         Initialize the parser factory.
+
+        Args:
+            registry (ParserRegistry): The registry of available parsers
+                (default: the registry shared by the process). Parser modules
+                are only imported when a parser is first requested.
         """
         self.logger = setup_logger("ParserFactory")
+        self.registry = registry if registry is not None else default_registry
+
+    def get_parser_class(self, classname):
+        """
+        Get the parser class registered under the given name.
+
+        Args:
+            classname (str): The name of the parser class.
 
-        # Register available parsers
-        self.parsers = {
-            "ZipFileParser": ZipFileParser,
-            "XmlToCsvParser": XmlToCsvParser,
-        }
+        Returns:
+            type: The parser class.
+
+        Raises:
+            ValueError: If the parser class is not registered.
+        """
+        try:
+            return self.registry.get(classname)
+        except ValueError as e:
+            self.logger.error(str(e))
+            raise
 
     def create_parser(self, classname, origin, destiny, **kwargs):
         """
@@ -40,11 +58,7 @@ class ParserFactory:
         Raises:
             ValueError: If the parser class is not registered.
         """
-        if classname not in self.parsers:
-            self.logger.error("Parser class not found: %s", classname)
-            raise ValueError(f"Unknown parser class: {classname}")
-
-        parser_class = self.parsers[classname]
+        parser_class = self.get_parser_class(classname)
         self.logger.info("Creating parser: %s", classname)
 
         return parser_class(origin, destiny, **kwargs)
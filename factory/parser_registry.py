@@ -0,0 +1,162 @@
+"""
+Registry of the available parsers, imported lazily on first use.
+"""
+
+import importlib
+import threading
+from importlib.metadata import entry_points
+
+from utils.logger import setup_logger
+
+# Entry point group under which installed packages register their parsers,
+# e.g. in pyproject.toml:
+#   [project.entry-points."transformation_engine.parsers"]
+#   CsvToJsonParser = "my_package.parsers:CsvToJsonParser"
+PARSER_ENTRY_POINT_GROUP = "transformation_engine.parsers"
+
+# Parsers shipped with the engine: class name -> "module:attribute"
+BUILTIN_PARSERS = {
+    "ZipFileParser": "parsers.zip_file_parser:ZipFileParser",
+    "XmlToCsvParser": "parsers.xml_to_csv_parser:XmlToCsvParser",
+    "ZipXmlToCsvParser": "parsers.zip_xml_to_csv_parser:ZipXmlToCsvParser",
+}
+
+
+def _parser_entry_points():
+    """
+    List the parsers registered by installed packages.
+
+    Returns:
+        list: The EntryPoint objects of the parser group.
+    """
+    try:
+        return list(entry_points(group=PARSER_ENTRY_POINT_GROUP))
+    except TypeError:  # pragma: no cover - Python < 3.10
+        return list(entry_points().get(PARSER_ENTRY_POINT_GROUP, []))
+
+
+class ParserRegistry:
+    """
+    Registry mapping parser names to parser classes.
+
+    Parsers are recorded as "module:attribute" references and their module is
+    only imported the first time the parser is requested, so a process only
+    pays for the parsers it actually runs. Parsers of installed packages are
+    discovered through the "transformation_engine.parsers" entry point group
+    the first time a name is not found among the registered ones.
+    """
+
+    def __init__(self, discover_entry_points=True):
+        """
+        Initialize the registry with the built-in parsers.
+
+        Args:
+            discover_entry_points (bool): Whether to look up unknown names in
+                the entry points of the installed packages.
+        """
+        self.logger = setup_logger("ParserRegistry")
+        self._references = dict(BUILTIN_PARSERS)
+        self._classes = {}
+        self._entry_points_loaded = not discover_entry_points
+        self._lock = threading.Lock()
+
+    def register(self, name, parser):
+        """
+        Register a parser.
+
+        Args:
+            name (str): The class name used in the job definitions.
+            parser (str or type): A "module:attribute" reference, imported on
+                first use, or the parser class itself.
+        """
+        with self._lock:
+            if isinstance(parser, str):
+                self._references[name] = parser
+                self._classes.pop(name, None)
+            else:
+                self._references[name] = f"{parser.__module__}:{parser.__qualname__}"
+                self._classes[name] = parser
+
+    def names(self):
+        """
+        Get the names of every known parser, including the entry points.
+
+        Returns:
+            list: The sorted parser names.
+        """
+        self._load_entry_points()
+        return sorted(self._references)
+
+    def __contains__(self, name):
+        if name in self._references:
+            return True
+        self._load_entry_points()
+        return name in self._references
+
+    def get(self, name):
+        """
+        Get a parser class, importing its module on first use.
+
+        Args:
+            name (str): The class name used in the job definitions.
+
+        Returns:
+            type: The parser class.
+
+        Raises:
+            ValueError: If the parser is unknown, cannot be imported or is not
+                a BaseParser.
+        """
+        parser_class = self._classes.get(name)
+        if parser_class is not None:
+            return parser_class
+
+        if name not in self:
+            raise ValueError(f"Unknown parser class: {name}")
+
+        with self._lock:
+            parser_class = self._classes.get(name)
+            if parser_class is None:
+                parser_class = self._import(name, self._references[name])
+                self._classes[name] = parser_class
+        return parser_class
+
+    def _import(self, name, reference):
+        # Imported here so that building a registry stays cheap
+        from parsers.base_parser import BaseParser
+
+        module_name, _, attribute = reference.partition(":")
+        try:
+            parser_class = importlib.import_module(module_name)
+            for part in attribute.split("."):
+                parser_class = getattr(parser_class, part)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Cannot load parser {name} from {reference}: {e}") from e
+
+        if not (isinstance(parser_class, type) and issubclass(parser_class, BaseParser)):
+            raise ValueError(f"Parser {name} ({reference}) is not a BaseParser")
+
+        self.logger.debug("Loaded parser %s from %s", name, reference)
+        return parser_class
+
+    def _load_entry_points(self):
+        if self._entry_points_loaded:
+            return
+
+        with self._lock:
+            if self._entry_points_loaded:
+                return
+            for entry_point in _parser_entry_points():
+                if entry_point.name in self._references:
+                    self.logger.warning(
+                        "Ignoring parser entry point %s (%s): name already registered",
+                        entry_point.name,
+                        entry_point.value,
+                    )
+                    continue
+                self._references[entry_point.name] = entry_point.value
+            self._entry_points_loaded = True
+
+
+# Registry shared by the factories of a process
+default_registry = ParserRegistry()
@@ -0,0 +1,54 @@
+"""
+Factory for creating storage backend instances based on the backend name.
+"""
+
+from storage.local_storage import LocalStorageBackend
+from utils.logger import setup_logger
+
+
+class StorageFactory:
+    """
+    Factory class for creating storage backends based on the backend name.
+    """
+
+    def __init__(self):
+        """
+        Initialize the storage factory.
+        """
+        self.logger = setup_logger("StorageFactory")
+
+        # Register available storage backends
+        self.backends = {
+            "local": LocalStorageBackend,
+        }
+
+    def register(self, name, backend_class):
+        """
+        Make a storage backend selectable by name.
+
+        Args:
+            name (str): The backend name used in the "storage" setting.
+            backend_class (type): The StorageBackend subclass.
+        """
+        self.backends[name] = backend_class
+
+    def create_storage(self, backend="local", **options):
+        """
+        Create a storage backend instance based on its name.
+
+        Args:
+            backend (str): The name of the storage backend.
+            **options: Arguments passed to the backend constructor.
+
+        Returns:
+            StorageBackend: An instance of the requested backend.
+
+        Raises:
+            ValueError: If the storage backend is not registered.
+        """
+        if backend not in self.backends:
+            self.logger.error("Storage backend not found: %s", backend)
+            raise ValueError(f"Unknown storage backend: {backend}")
+
+        self.logger.info("Creating storage backend: %s", backend)
+        return self.backends[backend](**options)
@@ -3,12 +3,49 @@ Main script for the transformation engine.
 This script reads job definitions from a JSON file and executes the specified transformations.
 """
 
+import argparse
 import json
+import logging
+import os
+import signal
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from pathlib import Path
 
 from factory.parser_factory import ParserFactory
-from utils.logger import setup_logger
+from factory.storage_factory import StorageFactory
+from orchestrator.cache import TransformationCache
+from orchestrator.daemon import DEFAULT_POLL_INTERVAL, SpoolDaemon
+from orchestrator.dag import JobGraph, ReadyQueue
+from orchestrator.executor import EXECUTOR_KINDS, JobExecutor
+from orchestrator.report import RunReport
+from orchestrator.scheduler import COST_MODEL_FILENAME, SCHEDULES, CostModel
+from storage.local_storage import LocalStorageBackend
+from utils.logger import (
+    LOG_FORMAT_ENV,
+    LOG_FORMATS,
+    configure_logging,
+    init_worker_logging,
+    job_context,
+    setup_logger,
+)
+from utils.metrics import JobMetrics, MemoryProbe, peak_rss_bytes
+
+# Job statuses reported by the engine
+JOB_SUCCEEDED = "succeeded"
+JOB_CACHED = "cached"
+JOB_FAILED = "failed"
+JOB_SKIPPED = "skipped"
+
+# Suffixes of the JSON Lines job definitions, read one transformation at a time
+JOB_STREAM_SUFFIXES = (".jsonl", ".ndjson")
+
+# Maximum number of jobs of a JSON Lines job definition pending or running
+DEFAULT_MAX_PENDING_JOBS = 1024
+
+# Engine instance reused by every job run in a worker process
+_worker_engine = None
 
 
 class TransformationEngine:
@@ -16,26 +53,114 @@ class TransformationEngine:
     Main orchestrator class for the transformation engine.
     """
 
-    def __init__(self, job_definition_path):
+    # Suffixes of the job definition files: JSON, or JSON Lines
+    definition_suffixes = (".json",) + JOB_STREAM_SUFFIXES
+
+    def __init__(
+        self,
+        job_definition_path,
+        max_workers=None,
+        executor=None,
+        cache_dir=None,
+        storage=None,
+        report_path=None,
+        prometheus_path=None,
+        keep_workers=False,
+        schedule=None,
+        memory_budget=None,
+    ):
         """
         Initialize the transformation engine.
 
         Args:
-            job_definition_path (str or Path): Path to the job definition JSON file.
+            job_definition_path (str or Path): Path to the job definition JSON
+                file, or None when every run passes its own.
+            max_workers (int): Number of jobs to run concurrently. Overrides the
+                "max_workers" setting of the job definition (default: 1).
+            executor (str): Executor kind, one of "auto", "thread" or "process".
+                Overrides the "executor" setting of the job definition
+                (default: "auto").
+            cache_dir (str or Path): Directory of the incremental cache manifest.
+                Overrides the "cache_dir" setting of the job definition
+                (default: no caching).
+            storage (StorageBackend): Backend holding the origins and destinies.
+                Overrides the "storage" setting of the job definition
+                (default: the local S3 simulation folder). Process workers
+                cannot use it, so jobs then run on threads.
+            report_path (str or Path): Where to write the JSON run report.
+                Overrides the "report_path" setting of the job definition.
+            prometheus_path (str or Path): Where to write the Prometheus
+                textfile. Overrides the "prometheus_path" setting of the job
+                definition.
+            keep_workers (bool): Keep the worker pools alive between runs that
+                use the same execution settings, until close is called. Used
+                by long-running services to avoid restarting the workers for
+                every job definition.
+            schedule (str): Order of the ready jobs, "fifo" (job definition
+                order) or "largest_first" (longest estimated first). Overrides
+                the "schedule" setting of the job definition (default: "fifo").
+            memory_budget (int): Bytes of estimated memory the running jobs
+                must fit in. Overrides the "memory_budget" setting of the job
+                definition (default: no limit).
         """
         self.logger = setup_logger("TransformationEngine")
-        self.job_definition_path = Path(job_definition_path)
+        self.job_definition_path = (
+            Path(job_definition_path) if job_definition_path is not None else None
+        )
         self.parser_factory = ParserFactory()
+        self.storage_factory = StorageFactory()
+
+        # Execution settings (None means "use the job definition settings")
+        self.max_workers = max_workers
+        self.executor = executor
+        self.cache_dir = cache_dir
+        self.cache = TransformationCache(cache_dir) if cache_dir else None
+        self.storage = storage
+
+        self.report_path = report_path
+        self.prometheus_path = prometheus_path
+
+        # Executor reused between runs, with the settings it was created for
+        self.keep_workers = keep_workers
+        self._job_executor = None
+        self._job_executor_settings = None
+
+        # Storage backend used by the jobs of the current run
+        self.job_storage = storage
+
+        # Result and metrics of each job of the current run. Streamed runs
+        # only keep those of the successful jobs when a report is written,
+        # or when keep_job_results is set
+        self.job_results = []
+        self.keep_job_results = False
+        self._keep_job_results = True
+
+        # Whether ready jobs of the same origin share a single read
+        self.coalesce_reads = True
+
+        # Scheduling settings, the cost model kept between runs, and the
+        # schedule, memory budget and job estimates of the current run
+        self.schedule = schedule
+        self.memory_budget = memory_budget
+        self.cost_model = None
+        self._run_schedule = "fifo"
+        self._run_memory_budget = None
+        self._estimates = {}
 
         # Statistics for tracking job results
         self.total_jobs = 0
         self.successful_jobs = 0
+        self.cached_jobs = 0
         self.failed_jobs = 0
+        self.wall_time = 0.0
 
-        self.logger.info(
-            "Transformation engine initialized with job definition: %s",
-            self.job_definition_path,
-        )
+        if self.job_definition_path is not None:
+            self.logger.info(
+                "Transformation engine initialized with job definition: %s",
+                self.job_definition_path,
+            )
+        else:
+            self.logger.info("Transformation engine initialized")
 
     def load_job_definition(self):
         """
@@ -65,6 +190,87 @@ class TransformationEngine:
             self.logger.error("Error loading job definition: %s", str(e))
             return None
 
+    def is_job_stream(self):
+        """
+        Check whether the job definition is a JSON Lines file.
+
+        Returns:
+            bool: True if the job definition holds one transformation per line.
+        """
+        return self.job_definition_path.suffix.lower() in JOB_STREAM_SUFFIXES
+
+    def load_job_stream(self):
+        """
+        Open a JSON Lines job definition, holding one transformation per line.
+
+        The first line may hold the run settings instead, as
+        {"settings": {...}}. The transformations are read lazily, so the file
+        is never held in memory as a whole.
+
+        Returns:
+            tuple: The settings dict and a generator of the transformations,
+                or None if the file could not be opened.
+        """
+        try:
+            self.logger.info("Streaming job definition from %s", self.job_definition_path)
+
+            if not self.job_definition_path.exists():
+                self.logger.error(
+                    "Job definition file not found: %s", self.job_definition_path
+                )
+                return None
+
+            transformations = self._read_job_stream()
+            settings = next(transformations)
+            return settings, transformations
+        except Exception as e:
+            self.logger.error("Error loading job definition: %s", str(e))
+            return None
+
+    def _read_job_stream(self):
+        """
+        Read a JSON Lines job definition.
+
+        Lines that are not valid JSON objects are logged and produce an empty
+        transformation, which fails when it runs.
+
+        Yields:
+            dict: The run settings, then each transformation.
+        """
+        settings_read = False
+        with open(self.job_definition_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    self.logger.error(
+                        "Invalid JSON on line %d of the job definition: %s",
+                        line_number,
+                        str(e),
+                    )
+                    data = {}
+                if not isinstance(data, dict):
+                    self.logger.error(
+                        "Line %d of the job definition is not a JSON object",
+                        line_number,
+                    )
+                    data = {}
+
+                if not settings_read:
+                    settings_read = True
+                    if "settings" in data and "object" not in data:
+                        yield data["settings"]
+                        continue
+                    yield {}
+                yield data
+
+        if not settings_read:
+            yield {}
+
     def run_transformation(self, transformation):
         """
         Execute a single transformation task.
@@ -75,6 +281,26 @@ class TransformationEngine:
         Returns:
             bool: True if the transformation was successful, False otherwise.
         """
+        return self._run_transformation(transformation)["status"] != JOB_FAILED
+
+    def _run_transformation(self, transformation):
+        """
+        Execute a single transformation task, skipping it when cached, and
+        measure it.
+
+        Args:
+            transformation (dict): The transformation job definition.
+
+        Returns:
+            dict: The job "status" (JOB_SUCCEEDED, JOB_CACHED or JOB_FAILED)
+                and its "metrics".
+        """
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        memory_probe = MemoryProbe()
+        parser = None
+        status = JOB_FAILED
+
         try:
             # Extract job parameters
             obj = transformation.get("object", {})
@@ -87,28 +313,701 @@ class TransformationEngine:
             # Validate required parameters
             if not all([origin, destiny, classname]):
                 self.logger.error("Missing required parameters in job definition")
-                return False
-
-            # Create and run the parser
-            parser = self.parser_factory.create_parser(
-                classname, origin, destiny, **kwargs
-            )
-            return parser.parse()
+            else:
+                # Create the parser
+                parser = self.parser_factory.create_parser(
+                    classname, origin, destiny, storage=self.job_storage, **kwargs
+                )
+                status = self._run_parser(parser, classname, kwargs)
 
         except ValueError as e:
             self.logger.error("Invalid job configuration: %s", str(e))
-            return False
         except Exception as e:
             self.logger.error("Error executing transformation: %s", str(e))
+
+        metrics = parser.metrics if parser is not None else JobMetrics()
+        metrics.add("wall_time_s", time.perf_counter() - start_wall)
+        metrics.add("cpu_time_s", time.thread_time() - start_cpu)
+        peak_rss = peak_rss_bytes()
+        metrics.set("peak_rss_bytes", peak_rss)
+        metrics.set("memory_growth_bytes", memory_probe.growth(peak_rss))
+        metrics.set("memory_growth_max_bytes", memory_probe.growth_bound(peak_rss))
+        return {"status": status, "metrics": metrics.to_dict()}
+
+    def _run_parser(self, parser, classname, kwargs):
+        """
+        Run a parser unless the cache shows its outputs are up to date.
+
+        Args:
+            parser (BaseParser): The parser to run.
+            classname (str): The parser class name.
+            kwargs (dict): The parser arguments.
+
+        Returns:
+            str: JOB_SUCCEEDED, JOB_CACHED or JOB_FAILED.
+        """
+        cache_key = self._check_cache(parser, classname, kwargs)
+        if cache_key == JOB_CACHED:
+            return JOB_CACHED
+
+        if not parser.parse():
+            return JOB_FAILED
+
+        if cache_key is not None:
+            self.cache.record(cache_key, parser)
+        return JOB_SUCCEEDED
+
+    def _check_cache(self, parser, classname, kwargs):
+        """
+        Look up a job in the incremental cache.
+
+        Args:
+            parser (BaseParser): The parser of the job.
+            classname (str): The parser class name.
+            kwargs (dict): The parser arguments.
+
+        Returns:
+            str: JOB_CACHED if the outputs of the job are up to date, otherwise
+                the cache key to record once the job succeeds, or None when
+                caching is disabled.
+        """
+        if self.cache is None:
+            return None
+
+        cache_key = self.cache.make_key(classname, parser.origin, parser.destiny, kwargs)
+        if self.cache.is_up_to_date(cache_key, parser):
+            self.logger.info(
+                "Outputs of %s are up to date, skipping (cached)", parser.origin
+            )
+            return JOB_CACHED
+        return cache_key
+
+    def _run_transformation_group(self, transformations):
+        """
+        Execute transformations that share a read of their origin, skipping
+        the cached ones, and measure them.
+
+        The transformations must all have the same shared_read_key. The CPU
+        time of the shared read is counted in the first job that takes part
+        in it; every job gets the wall time and memory growth of the whole
+        group.
+
+        Args:
+            transformations (list): The transformation job definitions.
+
+        Returns:
+            list: The "status" and "metrics" of each job, see
+                _run_transformation.
+        """
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        memory_probe = MemoryProbe()
+        statuses = [JOB_FAILED] * len(transformations)
+        parsers = [None] * len(transformations)
+        cache_keys = {}
+
+        for index, transformation in enumerate(transformations):
+            obj = transformation["object"]
+            kwargs = transformation.get("kwargs", {})
+            try:
+                parser = self.parser_factory.create_parser(
+                    obj["classname"],
+                    obj["origin"],
+                    obj.get("destiny"),
+                    storage=self.job_storage,
+                    **kwargs,
+                )
+                parsers[index] = parser
+                cache_key = self._check_cache(parser, obj["classname"], kwargs)
+                if cache_key == JOB_CACHED:
+                    statuses[index] = JOB_CACHED
+                else:
+                    cache_keys[index] = cache_key
+            except ValueError as e:
+                self.logger.error("Invalid job configuration: %s", str(e))
+            except Exception as e:
+                self.logger.error("Error executing transformation: %s", str(e))
+
+        shared = list(cache_keys)
+        if shared:
+            try:
+                succeeded = type(parsers[shared[0]]).parse_shared(
+                    [parsers[index] for index in shared]
+                )
+            except Exception as e:
+                self.logger.error("Error executing transformations: %s", str(e))
+                succeeded = [False] * len(shared)
+
+            for index, success in zip(shared, succeeded):
+                if not success:
+                    continue
+                statuses[index] = JOB_SUCCEEDED
+                if cache_keys[index] is not None:
+                    self.cache.record(cache_keys[index], parsers[index])
+
+        wall_time = time.perf_counter() - start_wall
+        peak_rss = peak_rss_bytes()
+        memory_growth = memory_probe.growth(peak_rss)
+        memory_growth_max = memory_probe.growth_bound(peak_rss)
+        cpu_owner = shared[0] if shared else 0
+        results = []
+        for index, parser in enumerate(parsers):
+            metrics = parser.metrics if parser is not None else JobMetrics()
+            metrics.add("wall_time_s", wall_time)
+            if index == cpu_owner:
+                metrics.add("cpu_time_s", time.thread_time() - start_cpu)
+            metrics.set("peak_rss_bytes", peak_rss)
+            metrics.set("memory_growth_bytes", memory_growth)
+            metrics.set("memory_growth_max_bytes", memory_growth_max)
+            results.append({"status": statuses[index], "metrics": metrics.to_dict()})
+        return results
+
+    def create_storage(self, storage_settings):
+        """
+        Create the storage backend described by the "storage" setting.
+
+        Args:
+            storage_settings (dict): The backend name under "backend" plus its
+                constructor arguments, or None.
+
+        Returns:
+            StorageBackend: The backend, or None to use the parsers' default.
+
+        Raises:
+            ValueError: If the storage backend is not registered.
+        """
+        if not storage_settings:
+            return None
+        return self.storage_factory.create_storage(**storage_settings)
+
+    def execute_job(self, job_id, total_jobs, transformation):
+        """
+        Execute a transformation with its log output attributed to the job.
+
+        Args:
+            job_id (int): Position of the job in the job definition.
+            total_jobs (int): Number of jobs in the job definition, or None
+                when it is not known yet.
+            transformation (dict): The transformation job definition.
+
+        Returns:
+            dict: The job result, see job_result.
+        """
+        with job_context(job_id):
+            if total_jobs is None:
+                self.logger.info("Processing job %d", job_id)
+            else:
+                self.logger.info("Processing job %d of %d", job_id, total_jobs)
+            result = self._run_transformation(transformation)
+            self._log_job_summary(result)
+        return self.job_result(job_id, transformation, **result)
+
+    def execute_job_group(self, job_ids, total_jobs, transformations):
+        """
+        Execute transformations that share a read of their origin.
+
+        The log output of the shared work is attributed to the first job.
+
+        Args:
+            job_ids (list): Positions of the jobs in the job definition.
+            total_jobs (int): Number of jobs in the job definition, or None
+                when it is not known yet.
+            transformations (list): The transformation job definitions, which
+                all have the same shared_read_key.
+
+        Returns:
+            list: The result of each job, see job_result.
+        """
+        with job_context(job_ids[0]):
+            self.logger.info(
+                "Processing jobs %s%s with a single read of %s",
+                ", ".join(str(job_id) for job_id in job_ids),
+                "" if total_jobs is None else f" of {total_jobs}",
+                transformations[0]["object"]["origin"],
+            )
+            results = self._run_transformation_group(transformations)
+
+        job_results = []
+        for job_id, transformation, result in zip(job_ids, transformations, results):
+            with job_context(job_id):
+                self._log_job_summary(result)
+            job_results.append(self.job_result(job_id, transformation, **result))
+        return job_results
+
+    def _log_job_summary(self, result):
+        """
+        Log the status and metrics of a finished job.
+
+        Args:
+            result (dict): The "status" and "metrics" of the job.
+        """
+        metrics = result["metrics"]
+        self.logger.info(
+            "Job %s in %.3f s (cpu %.3f s, %d bytes read, %d bytes written, "
+            "%d rows, %d members)",
+            result["status"],
+            metrics["wall_time_s"],
+            metrics["cpu_time_s"],
+            metrics["bytes_read"],
+            metrics["bytes_written"],
+            metrics["rows_emitted"],
+            metrics["members_extracted"],
+        )
+
+    @staticmethod
+    def job_result(job_id, transformation, status, metrics=None):
+        """
+        Build the result record of a job.
+
+        Args:
+            job_id (int): Position of the job in the job definition.
+            transformation (dict): The transformation job definition.
+            status (str): The job status.
+            metrics (dict): The job metrics.
+
+        Returns:
+            dict: The "job_id", "classname", "origin", "destiny", "status" and
+                "metrics" of the job.
+        """
+        obj = transformation.get("object", {})
+        return {
+            "job_id": job_id,
+            "classname": obj.get("classname"),
+            "origin": obj.get("origin"),
+            "destiny": obj.get("destiny"),
+            "status": status,
+            "metrics": metrics or {},
+        }
+
+    def is_cpu_bound(self, transformation):
+        """
+        Check whether a transformation runs a CPU-bound parser.
+
+        Args:
+            transformation (dict): The transformation job definition.
+
+        Returns:
+            bool: True if the parser is CPU-bound, False otherwise or if the
+                parser class is unknown.
+        """
+        classname = transformation.get("object", {}).get("classname")
+        try:
+            return self.parser_factory.get_parser_class(classname).cpu_bound
+        except ValueError:
             return False
 
-    def run(self):
+    def shared_read_key(self, transformation):
+        """
+        Get the key grouping the ready jobs that can share a read of their
+        origin.
+
+        Args:
+            transformation (dict): The transformation job definition.
+
+        Returns:
+            tuple: The parser class name, the origin and the key given by the
+                parser class, or None when the job reads its origin on its own.
+        """
+        if not self.coalesce_reads:
+            return None
+
+        obj = transformation.get("object", {})
+        classname = obj.get("classname")
+        kwargs = transformation.get("kwargs", {})
+        if not all([obj.get("origin"), obj.get("destiny"), classname]) or not isinstance(
+            kwargs, dict
+        ):
+            return None
+        try:
+            key = self.parser_factory.get_parser_class(classname).shared_read_key(
+                kwargs
+            )
+        except (TypeError, ValueError):
+            return None
+        if key is None:
+            return None
+        return classname, obj["origin"], key
+
+    def estimate_job(self, transformation):
+        """
+        Estimate the running time and peak memory of a transformation.
+
+        Args:
+            transformation (dict): The transformation job definition.
+
+        Returns:
+            dict: The estimate, see CostModel.estimate, or None when the
+                parser class is unknown or the job is invalid.
+        """
+        obj = transformation.get("object", {})
+        classname = obj.get("classname")
+        kwargs = transformation.get("kwargs", {})
+        if not obj.get("origin") or not isinstance(kwargs, dict):
+            return None
+        try:
+            parser_class = self.parser_factory.get_parser_class(classname)
+        except ValueError:
+            return None
+
+        storage = self.job_storage
+        if storage is None:
+            storage = LocalStorageBackend()
+        try:
+            input_size = storage.size(obj["origin"])
+        except (OSError, TypeError, ValueError):
+            # Not produced yet or unreadable: the job will fail on its own
+            input_size = 0
+
+        try:
+            return self.cost_model.estimate(classname, parser_class, input_size, kwargs)
+        except (TypeError, ValueError):
+            return None
+
+    def _execute_graph(self, graph, job_executor, max_workers):
+        """
+        Run the jobs of a dependency graph, keeping up to max_workers in flight.
+
+        Ready jobs are dispatched in the order of the schedule, as long as
+        their estimated memory fits in the budget. The dependents of a failed
+        job are not executed and are counted as failed.
+
+        Args:
+            graph (JobGraph): The validated dependency graph.
+            job_executor (JobExecutor): The executor used to run the jobs.
+            max_workers (int): Maximum number of jobs running at the same time.
+        """
+        for job_id in sorted(graph.transformations):
+            if graph.dependencies[job_id]:
+                self.logger.debug(
+                    "Job %d depends on jobs %s",
+                    job_id,
+                    sorted(graph.dependencies[job_id]),
+                )
+
+        ready = ReadyQueue()
+        for job_id in graph.ready_jobs():
+            self._push_ready(graph, ready, job_id)
+        running = {}
+
+        while ready or running:
+            while ready and len(running) < max_workers:
+                job_ids = self._pop_ready(ready, running)
+                if job_ids is None:
+                    break
+                future = self._submit_jobs(graph, job_executor, job_ids, self.total_jobs)
+                running[future] = job_ids
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._complete_jobs(graph, running.pop(future), future, ready)
+
+    def _execute_stream(self, graph, transformations, job_executor, max_workers, window):
+        """
+        Run the jobs of a job definition stream, reading it only as far as
+        needed to keep max_workers jobs in flight.
+
+        Jobs are added to the graph as they are read, so a job can only depend
+        on earlier ones. At most window jobs are pending or running at any
+        time, which bounds the memory used whatever the length of the stream.
+
+        Args:
+            graph (JobGraph): An empty dependency graph.
+            transformations (Iterator): The transformation job definitions.
+            job_executor (JobExecutor): The executor used to run the jobs.
+            max_workers (int): Maximum number of jobs running at the same time.
+            window (int): Maximum number of jobs pending or running.
+        """
+        ready = ReadyQueue()
+        running = {}
+        exhausted = False
+
+        while True:
+            # Read ahead until every worker can be fed or the window is full
+            while (
+                not exhausted
+                and len(running) + len(ready) < max_workers
+                and len(graph) < window
+            ):
+                transformation = next(transformations, None)
+                if transformation is None:
+                    exhausted = True
+                    break
+                self.total_jobs += 1
+                self._add_streamed_job(graph, self.total_jobs, transformation, ready)
+
+            while ready and len(running) < max_workers:
+                job_ids = self._pop_ready(ready, running)
+                if job_ids is None:
+                    break
+                running[self._submit_jobs(graph, job_executor, job_ids)] = job_ids
+
+            if not running:
+                if exhausted:
+                    break
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._complete_jobs(graph, running.pop(future), future, ready)
+
+    def _add_streamed_job(self, graph, job_id, transformation, ready):
+        """
+        Add a job read from a job definition stream to the graph.
+
+        Args:
+            graph (JobGraph): The dependency graph.
+            job_id (int): Position of the job in the job definition.
+            transformation (dict): The transformation job definition.
+            ready (ReadyQueue): The ready jobs, extended if the job is ready.
+        """
+        try:
+            runnable = graph.add_streamed_job(job_id, transformation)
+        except ValueError as e:
+            self.logger.error("Invalid job dependencies: %s", str(e))
+            self._record_result(self.job_result(job_id, transformation, JOB_FAILED))
+            self.failed_jobs += 1
+            return
+
+        if not runnable:
+            self.logger.warning(
+                "Skipping job %d because a job it depends on failed", job_id
+            )
+            self._record_result(self.job_result(job_id, transformation, JOB_SKIPPED))
+            self.failed_jobs += 1
+        elif graph.dependencies[job_id]:
+            self.logger.debug(
+                "Job %d depends on jobs %s", job_id, sorted(graph.dependencies[job_id])
+            )
+        else:
+            self._push_ready(graph, ready, job_id)
+
+    def _push_ready(self, graph, ready, job_id):
+        """
+        Queue a ready job, grouped with the jobs that can share its read.
+
+        Jobs are estimated when they become ready, once the jobs writing
+        their origin have completed.
+
+        Args:
+            graph (JobGraph): The dependency graph.
+            ready (ReadyQueue): The ready jobs.
+            job_id (int): The ready job.
+        """
+        transformation = graph.transformations[job_id]
+        priority = 0
+        if self.cost_model is not None:
+            estimate = self.estimate_job(transformation)
+            if estimate is not None:
+                self._estimates[job_id] = estimate
+                if self._run_schedule == "largest_first":
+                    priority = -estimate["seconds"]
+        ready.push(job_id, self.shared_read_key(transformation), priority)
+
+    def _pop_ready(self, ready, running):
+        """
+        Take the next ready job, or group of jobs sharing a read, whose
+        estimated memory fits in what the running jobs leave of the budget.
+
+        A job estimated above the whole budget runs once nothing else is
+        running, and no other job is admitted until it completes.
+
+        Args:
+            ready (ReadyQueue): The ready jobs.
+            running (dict): Future -> job ids of the running jobs.
+
+        Returns:
+            list: The job ids, or None when none fits.
+        """
+        budget = self._run_memory_budget
+        if budget is None:
+            return ready.pop()
+
+        if not running:
+            job_ids = ready.pop()
+            memory = self._job_memory(job_ids)
+            if memory > budget:
+                self.logger.warning(
+                    "Jobs %s need an estimated %d bytes, above the memory budget "
+                    "of %d bytes: running them alone",
+                    ", ".join(str(job_id) for job_id in job_ids),
+                    memory,
+                    budget,
+                )
+            return job_ids
+
+        available = budget - sum(
+            self._job_memory(job_ids) for job_ids in running.values()
+        )
+        return ready.pop(lambda job_ids: self._job_memory(job_ids) <= available)
+
+    def _job_memory(self, job_ids):
+        """
+        Get the estimated memory of a job, or of a group of jobs sharing a
+        read (the largest of their estimates).
+
+        Args:
+            job_ids (list): The jobs.
+
+        Returns:
+            int: The estimated memory in bytes, 0 when unknown.
+        """
+        return max(
+            self._estimates[job_id]["memory_bytes"] if job_id in self._estimates else 0
+            for job_id in job_ids
+        )
+
+    def _submit_jobs(self, graph, job_executor, job_ids, total_jobs=None):
+        """
+        Dispatch a ready job, or a group of ready jobs sharing a read, to the
+        executor.
+
+        Args:
+            graph (JobGraph): The dependency graph.
+            job_executor (JobExecutor): The executor used to run the jobs.
+            job_ids (list): The ready jobs, as popped from the ReadyQueue.
+            total_jobs (int): Number of jobs in the job definition, or None
+                when it is not known yet.
+
+        Returns:
+            Future: A future holding the job result, or the list of results
+                of a group.
+        """
+        transformations = [graph.transformations[job_id] for job_id in job_ids]
+        if len(job_ids) == 1:
+            return job_executor.submit(
+                self.is_cpu_bound(transformations[0]),
+                self.execute_job,
+                _execute_job_in_worker,
+                job_ids[0],
+                total_jobs,
+                transformations[0],
+            )
+        return job_executor.submit(
+            self.is_cpu_bound(transformations[0]),
+            self.execute_job_group,
+            _execute_job_group_in_worker,
+            job_ids,
+            total_jobs,
+            transformations,
+        )
+
+    def _complete_jobs(self, graph, job_ids, future, ready):
+        """
+        Record the results of a finished job or group of jobs.
+
+        Args:
+            graph (JobGraph): The dependency graph.
+            job_ids (list): The finished jobs.
+            future (Future): The future holding the job result, or the list of
+                results of a group.
+            ready (ReadyQueue): The ready jobs, extended with the jobs that
+                became ready.
+        """
+        try:
+            results = future.result()
+        except Exception as e:
+            self.logger.error(
+                "Job %s crashed: %s", ", ".join(str(job_id) for job_id in job_ids), str(e)
+            )
+            results = [
+                self.job_result(job_id, graph.transformations[job_id], JOB_FAILED)
+                for job_id in job_ids
+            ]
+
+        if isinstance(results, dict):
+            results = [results]
+        for job_id, result in zip(job_ids, results):
+            self._complete_job(graph, job_id, result, ready)
+
+    def _complete_job(self, graph, job_id, result, ready):
+        """
+        Record the result of a finished job and update the graph.
+
+        The dependents of a failed job are not executed and are counted as
+        failed.
+
+        Args:
+            graph (JobGraph): The dependency graph.
+            job_id (int): The finished job.
+            result (dict): The job result, see job_result.
+            ready (ReadyQueue): The ready jobs, extended with the jobs that
+                became ready.
+        """
+        self._record_result(result)
+        status = result["status"]
+        estimate = self._estimates.pop(job_id, None)
+        if estimate is not None and status == JOB_SUCCEEDED:
+            self.cost_model.observe(result["classname"], estimate, result["metrics"])
+        if status != JOB_FAILED:
+            self.successful_jobs += 1
+            if status == JOB_CACHED:
+                self.cached_jobs += 1
+            for ready_id in graph.complete_job(job_id):
+                self._push_ready(graph, ready, ready_id)
+            return
+
+        self.failed_jobs += 1
+        skipped = graph.transitive_dependents(job_id)
+        for skipped_id in skipped:
+            self._record_result(
+                self.job_result(
+                    skipped_id, graph.transformations[skipped_id], JOB_SKIPPED
+                )
+            )
+        graph.fail_job(job_id)
+        if skipped:
+            self.logger.warning(
+                "Skipping jobs %s because job %d failed", skipped, job_id
+            )
+            self.failed_jobs += len(skipped)
+
+    def _record_result(self, result):
+        """
+        Keep the result of a job for the run report.
+
+        Streamed runs without report outputs only keep the results of the
+        failed and skipped jobs, so their memory does not grow with the
+        number of jobs.
+
+        Args:
+            result (dict): The job result, see job_result.
+        """
+        if self._keep_job_results or result["status"] in (JOB_FAILED, JOB_SKIPPED):
+            self.job_results.append(result)
+
+    def run(self, job_definition_path=None):
         """
         Run all transformations defined in the job definition.
 
+        Args:
+            job_definition_path (str or Path): Path to the job definition JSON
+                file to run instead of the current one.
+
         Returns:
             bool: True if all transformations were successful, False otherwise.
         """
+        if job_definition_path is not None:
+            self.job_definition_path = Path(job_definition_path)
+
+        # Forget the previous run
+        self.total_jobs = 0
+        self.successful_jobs = 0
+        self.cached_jobs = 0
+        self.failed_jobs = 0
+        self.job_results = []
+        self.wall_time = 0.0
+
+        # JSON Lines job definitions are read while their jobs run
+        if self.is_job_stream():
+            job_stream = self.load_job_stream()
+            if job_stream is None:
+                return False
+            settings, transformations = job_stream
+            try:
+                return self._run_transformations(settings, transformations, True)
+            finally:
+                transformations.close()
+
         # Load job definition
         job_data = self.load_job_definition()
         if not job_data:
@@ -120,55 +1019,439 @@ class TransformationEngine:
             self.logger.warning("No transformations found in job definition")
             return True
 
-        # Initialize statistics
-        self.total_jobs = len(transformations)
-        self.successful_jobs = 0
-        self.failed_jobs = 0
+        return self._run_transformations(
+            job_data.get("settings", {}), transformations, False
+        )
 
-        self.logger.info(
-            "Starting execution of %d transformation jobs", self.total_jobs
+    def _run_transformations(self, settings, transformations, streamed):
+        """
+        Run the transformations of a job definition with its settings.
+
+        Args:
+            settings (dict): The "settings" of the job definition.
+            transformations (list or Iterator): The transformation job
+                definitions, as a list, or as an iterator when streamed.
+            streamed (bool): Whether the transformations are read while the
+                jobs run.
+
+        Returns:
+            bool: True if all transformations were successful, False otherwise.
+        """
+        # Resolve execution settings
+        max_workers = self.max_workers or settings.get("max_workers", 1)
+        executor_kind = self.executor or settings.get("executor", "auto")
+        cache_dir = self.cache_dir or settings.get("cache_dir")
+        self.cache = TransformationCache(cache_dir) if cache_dir else None
+        self.coalesce_reads = bool(settings.get("coalesce_reads", True))
+        storage_settings = settings.get("storage")
+        try:
+            self.job_storage = self.storage or self.create_storage(storage_settings)
+        except (TypeError, ValueError) as e:
+            self.logger.error("Invalid storage settings: %s", str(e))
+            return False
+
+        report_path = self.report_path or settings.get("report_path")
+        prometheus_path = self.prometheus_path or settings.get("prometheus_path")
+
+        try:
+            self._configure_scheduling(settings, cache_dir)
+        except (TypeError, ValueError) as e:
+            self.logger.error("Invalid scheduling settings: %s", str(e))
+            return False
+
+        # Initialize statistics
+        start_time = time.perf_counter()
+        self._keep_job_results = (
+            not streamed
+            or self.keep_job_results
+            or bool(report_path or prometheus_path)
         )
+        graph = JobGraph(settings.get("infer_dependencies", True))
+
+        if streamed:
+            self.logger.info(
+                "Starting streamed execution of transformation jobs "
+                "(workers: %d, executor: %s)",
+                max_workers,
+                executor_kind,
+            )
+        else:
+            self.total_jobs = len(transformations)
+            self.logger.info(
+                "Starting execution of %d transformation jobs "
+                "(workers: %d, executor: %s)",
+                self.total_jobs,
+                max_workers,
+                executor_kind,
+            )
+
+            # Build the dependency graph between transformations
+            try:
+                for i, transformation in enumerate(transformations, 1):
+                    graph.add_job(i, transformation)
+                graph.validate()
+            except ValueError as e:
+                self.logger.error("Invalid job dependencies: %s", str(e))
+                return False
 
-        # Execute each transformation
-        for i, transformation in enumerate(transformations, 1):
-            self.logger.info("Processing job %d of %d", i, self.total_jobs)
+        # Execute each transformation once its dependencies have completed
+        try:
+            job_executor = self._get_job_executor(
+                max_workers, executor_kind, cache_dir, storage_settings
+            )
+        except ValueError as e:
+            self.logger.error("Invalid execution settings: %s", str(e))
+            return False
 
-            success = self.run_transformation(transformation)
-            if success:
-                self.successful_jobs += 1
+        try:
+            if streamed:
+                window = max(
+                    settings.get("max_pending_jobs", DEFAULT_MAX_PENDING_JOBS),
+                    max_workers,
+                )
+                self._execute_stream(
+                    graph, transformations, job_executor, max_workers, window
+                )
             else:
-                self.failed_jobs += 1
+                self._execute_graph(graph, job_executor, max_workers)
+        finally:
+            if not self.keep_workers:
+                self.close()
+            self._estimates = {}
+            if self.cost_model is not None:
+                self.cost_model.save()
 
         # Log results
         self.logger.info("Transformation execution completed")
         self.logger.info(
-            "Total jobs: %d, Successful: %d, Failed: %d",
+            "Total jobs: %d, Successful: %d (cached: %d), Failed: %d",
             self.total_jobs,
             self.successful_jobs,
+            self.cached_jobs,
             self.failed_jobs,
         )
 
+        if streamed and self.total_jobs == 0:
+            self.logger.warning("No transformations found in job definition")
+
+        self.wall_time = time.perf_counter() - start_time
+        self.write_reports(self.wall_time, report_path, prometheus_path)
+
         return self.failed_jobs == 0
 
+    def _configure_scheduling(self, settings, cache_dir):
+        """
+        Resolve the schedule and memory budget of a run, and load the cost
+        model when either needs the jobs to be estimated.
+
+        The cost model is saved as "cost_model.json" in the cache directory,
+        or in the "cost_model_path" setting, so the ratios it learns carry
+        over to later runs. Without either, they only carry over to the later
+        runs of this engine.
+
+        Args:
+            settings (dict): The "settings" of the job definition.
+            cache_dir (str or Path): Directory of the incremental cache
+                manifest, or None.
+
+        Raises:
+            ValueError: If the schedule or the memory budget is invalid.
+        """
+        schedule = self.schedule or settings.get("schedule", "fifo")
+        if schedule not in SCHEDULES:
+            raise ValueError(
+                f"Unknown schedule: {schedule}. Expected one of {SCHEDULES}"
+            )
+        memory_budget = self.memory_budget or settings.get("memory_budget")
+        if memory_budget is not None:
+            memory_budget = int(memory_budget)
+            if memory_budget < 1:
+                raise ValueError(f"memory_budget must be positive, got {memory_budget}")
+
+        self._run_schedule = schedule
+        self._run_memory_budget = memory_budget
+        self._estimates = {}
+        if schedule == "fifo" and memory_budget is None:
+            self.cost_model = None
+            return
+
+        path = settings.get("cost_model_path")
+        if not path and cache_dir:
+            path = Path(cache_dir) / COST_MODEL_FILENAME
+        path = Path(path) if path else None
+        if self.cost_model is None or self.cost_model.path != path:
+            self.cost_model = CostModel(path)
+
+    def _get_job_executor(self, max_workers, kind, cache_dir, storage_settings):
+        """
+        Get the executor of a run, reusing the one of the previous run when
+        the engine keeps its workers and the execution settings are the same.
+
+        Args:
+            max_workers (int): Maximum number of jobs running at the same time.
+            kind (str): The executor kind.
+            cache_dir (str or Path): Directory of the incremental cache
+                manifest, or None.
+            storage_settings (dict): The "storage" setting of the job definition.
+
+        Returns:
+            JobExecutor: The executor.
+
+        Raises:
+            ValueError: If the executor kind or worker count is invalid, or
+                if process workers are requested with a storage backend object.
+        """
+        if self.storage is not None and max_workers > 1:
+            # Process workers rebuild their backend from the storage settings
+            # and cannot see a backend object given to the engine
+            if kind == "process":
+                raise ValueError(
+                    "A storage backend object cannot be used by process "
+                    'workers; use the "storage" setting or the thread executor'
+                )
+            if kind == "auto":
+                self.logger.info(
+                    "Running every job on threads to share the storage backend"
+                )
+                kind = "thread"
+
+        executor_settings = json.dumps(
+            [max_workers, kind, str(cache_dir), storage_settings],
+            sort_keys=True,
+            default=str,
+        )
+        if self._job_executor is not None:
+            if self._job_executor_settings == executor_settings:
+                return self._job_executor
+            self.close()
+
+        job_definition_path = (
+            str(self.job_definition_path)
+            if self.job_definition_path is not None
+            else None
+        )
+        self._job_executor = JobExecutor(
+            max_workers,
+            kind,
+            process_initializer=_init_worker_engine,
+            initargs=(job_definition_path, cache_dir, storage_settings),
+        )
+        self._job_executor_settings = executor_settings
+        return self._job_executor
+
+    def close(self):
+        """
+        Wait for running jobs and release the worker pools.
+        """
+        if self._job_executor is not None:
+            self._job_executor.shutdown()
+            self._job_executor = None
+            self._job_executor_settings = None
+
+    def make_report(self, wall_time=None):
+        """
+        Build the report of the last run.
+
+        Args:
+            wall_time (float): Wall time of the run in seconds (default: the
+                one measured by the last run).
+
+        Returns:
+            RunReport: The report.
+        """
+        return RunReport(
+            self.job_definition_path,
+            {
+                "total_jobs": self.total_jobs,
+                "successful_jobs": self.successful_jobs,
+                "cached_jobs": self.cached_jobs,
+                "failed_jobs": self.failed_jobs,
+                "wall_time_s": self.wall_time if wall_time is None else wall_time,
+            },
+            self.job_results,
+        )
+
+    def write_reports(self, wall_time, report_path=None, prometheus_path=None):
+        """
+        Export the results and metrics of the last run.
+
+        Args:
+            wall_time (float): Wall time of the run in seconds.
+            report_path (str or Path): Where to write the JSON report, or None.
+            prometheus_path (str or Path): Where to write the Prometheus
+                textfile, or None.
+        """
+        if not report_path and not prometheus_path:
+            return
+
+        report = self.make_report(wall_time)
+
+        try:
+            if report_path:
+                report.write_json(report_path)
+                self.logger.info("Run report written to %s", report_path)
+            if prometheus_path:
+                report.write_prometheus(prometheus_path)
+                self.logger.info("Prometheus metrics written to %s", prometheus_path)
+        except OSError as e:
+            self.logger.error("Could not write run report: %s", str(e))
+
+
+def _init_worker_engine(job_definition_path, cache_dir, storage_settings):
+    """
+    Create the engine used by a worker process of the process pool.
+
+    Args:
+        job_definition_path (str): Path to the job definition JSON file, or None.
+        cache_dir (str): Directory of the incremental cache manifest, or None.
+        storage_settings (dict): The "storage" setting of the job definition.
+    """
+    global _worker_engine
+    init_worker_logging()
+    _worker_engine = TransformationEngine(job_definition_path, cache_dir=cache_dir)
+    _worker_engine.job_storage = _worker_engine.create_storage(storage_settings)
+
+
+def _execute_job_group_in_worker(job_ids, total_jobs, transformations):
+    """
+    Execute transformations sharing a read inside a worker process.
+
+    Args:
+        job_ids (list): Positions of the jobs in the job definition.
+        total_jobs (int): Number of jobs in the job definition.
+        transformations (list): The transformation job definitions.
+
+    Returns:
+        list: The result of each job, see TransformationEngine.job_result.
+    """
+    return _worker_engine.execute_job_group(job_ids, total_jobs, transformations)
+
+
+def _execute_job_in_worker(job_id, total_jobs, transformation):
+    """
+    Execute a transformation inside a worker process.
+
+    Args:
+        job_id (int): Position of the job in the job definition.
+        total_jobs (int): Number of jobs in the job definition.
+        transformation (dict): The transformation job definition.
+
+    Returns:
+        dict: The job result, see TransformationEngine.job_result.
+    """
+    return _worker_engine.execute_job(job_id, total_jobs, transformation)
+
 
 def main():
     """
     Main entry point for the transformation engine.
     """
-    # Default job definition path
-    job_path = "job_definition.json"
+    parser = argparse.ArgumentParser(description="Run a transformation job.")
+    parser.add_argument(
+        "job_path",
+        nargs="?",
+        default="job_definition.json",
+        help="Path to the job definition JSON file",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Number of jobs to run concurrently"
+    )
+    parser.add_argument(
+        "--executor", choices=EXECUTOR_KINDS, help="Executor used for parallel jobs"
+    )
+    parser.add_argument(
+        "--cache-dir", help="Directory of the incremental cache manifest"
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=SCHEDULES,
+        help="Run ready jobs in job definition order or longest estimated first",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        help="Bytes of estimated memory the running jobs must fit in",
+    )
+    parser.add_argument("--report", help="Write a JSON run report to this file")
+    parser.add_argument(
+        "--prometheus-textfile", help="Write Prometheus metrics to this file"
+    )
+    parser.add_argument(
+        "--spool-dir",
+        help="Run as a service executing the job definitions dropped in this "
+        "directory, instead of running job_path once",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds between two scans of an empty spool directory",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+        default="INFO",
+        help="Minimum level of the log records",
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=LOG_FORMATS,
+        help="Write text lines or one JSON object per record",
+    )
+    args = parser.parse_args()
+
+    # Worker processes read the format from the environment
+    if args.log_format:
+        os.environ[LOG_FORMAT_ENV] = args.log_format
+    configure_logging(level=getattr(logging, args.log_level))
 
-    # Allow overriding job definition path from command line
-    if len(sys.argv) > 1:
-        job_path = sys.argv[1]
+    if args.spool_dir:
+        serve(args)
+        return
 
     # Create and run the transformation engine
-    engine = TransformationEngine(job_path)
+    engine = TransformationEngine(
+        args.job_path,
+        max_workers=args.workers,
+        executor=args.executor,
+        cache_dir=args.cache_dir,
+        report_path=args.report,
+        prometheus_path=args.prometheus_textfile,
+        schedule=args.schedule,
+        memory_budget=args.memory_budget,
+    )
     success = engine.run()
 
     # Set exit code based on success
     sys.exit(0 if success else 1)
 
 
+def serve(args):
+    """
+    Run the spool directory service until SIGTERM or SIGINT is received.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+    """
+    engine = TransformationEngine(
+        None,
+        max_workers=args.workers,
+        executor=args.executor,
+        cache_dir=args.cache_dir,
+        keep_workers=True,
+        schedule=args.schedule,
+        memory_budget=args.memory_budget,
+    )
+    daemon = SpoolDaemon(engine, args.spool_dir, poll_interval=args.poll_interval)
+
+    # Finish the current job definition before exiting
+    def handle_signal(signum, frame):
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    daemon.serve()
+
+
 if __name__ == "__main__":
     main()
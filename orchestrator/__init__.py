@@ -0,0 +1,4 @@
+"""
+Orchestrator package initialization file.
+This module contains the building blocks used by the transformation engine to execute jobs.
+"""
@@ -0,0 +1,230 @@
+"""
+Persistent cache used to skip transformations whose inputs and outputs did not change.
+
+The manifest is a directory with one JSON entry per transformation, so jobs
+running in different threads or processes never write to the same file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from utils.logger import setup_logger
+
+# Size of the blocks read when hashing a file (1 MiB)
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        path (str or Path): The file to hash.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TransformationCache:
+    """
+    Manifest of completed transformations keyed by their configuration.
+
+    An entry records the parser version, the size and modification time of
+    the origin, and the size and modification time of every output. A
+    transformation is up to date when its origin still has the same content
+    and all of its outputs are untouched.
+
+    The origin is only hashed when its size and modification time cannot
+    prove it unchanged: a lookup finding the same size but another
+    modification time hashes the origin, and the next record of that
+    transformation stores the digest. A touched origin is therefore
+    converted again once, and recognized as unchanged afterwards.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str or Path): Directory holding the manifest entries.
+        """
+        self.logger = setup_logger("TransformationCache")
+        self.cache_dir = Path(cache_dir)
+
+        # (path, size, modification time) -> digest of the origins hashed by
+        # the lookups, stored by the next record of the same origin
+        self._digests = {}
+
+    @staticmethod
+    def make_key(classname, origin, destiny, kwargs):
+        """
+        Build the key identifying a transformation.
+
+        Args:
+            classname (str): The parser class name.
+            origin (str): S3 path to the source file.
+            destiny (str): S3 path to the destination directory.
+            kwargs (dict): The parser arguments.
+
+        Returns:
+            str: The hexadecimal key.
+        """
+        payload = json.dumps(
+            {
+                "classname": classname,
+                "origin": origin,
+                "destiny": destiny,
+                "kwargs": kwargs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_up_to_date(self, key, parser):
+        """
+        Check whether a transformation can be skipped.
+
+        Args:
+            key (str): The transformation key.
+            parser (BaseParser): The parser that would run the transformation.
+
+        Returns:
+            bool: True if the recorded outputs are still valid for the origin.
+        """
+        # Only transformations reading local files can be fingerprinted
+        if parser.local_origin is None:
+            return False
+
+        entry = self._load_entry(key)
+        if entry is None or entry.get("parser_version") != parser.version:
+            return False
+
+        try:
+            origin = entry["origin"]
+            stat = os.stat(parser.local_origin)
+            if stat.st_size != origin["size"]:
+                return False
+            if stat.st_mtime_ns != origin["mtime_ns"]:
+                # Same size but touched: fall back to comparing the content
+                digest = self._origin_digest(parser.local_origin, stat)
+                if digest != origin.get("sha256"):
+                    return False
+
+            for output in entry["outputs"]:
+                stat = os.stat(output["path"])
+                if (stat.st_size, stat.st_mtime_ns) != (
+                    output["size"],
+                    output["mtime_ns"],
+                ):
+                    return False
+        except (OSError, KeyError, TypeError):
+            return False
+
+        return True
+
+    def record(self, key, parser):
+        """
+        Store the state of a transformation that completed successfully.
+
+        Args:
+            key (str): The transformation key.
+            parser (BaseParser): The parser that ran the transformation.
+        """
+        if parser.local_origin is None:
+            return
+
+        try:
+            stat = os.stat(parser.local_origin)
+            entry = {
+                "parser_version": parser.version,
+                "origin": {
+                    "path": str(parser.local_origin),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": self._known_digest(key, parser.local_origin, stat),
+                },
+                "outputs": [],
+            }
+            for path in parser.outputs:
+                stat = os.stat(path)
+                entry["outputs"].append(
+                    {
+                        "path": str(path),
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                    }
+                )
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entry_path = self._entry_path(key)
+            temp_path = entry_path.with_name(
+                f"{entry_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            # A failed cache write must never fail the transformation itself
+            self.logger.warning("Could not update cache entry %s: %s", key, str(e))
+
+    def _origin_digest(self, path, stat):
+        """
+        Hash an origin, remembering the digest for the next record.
+
+        Args:
+            path (str or Path): The origin file.
+            stat (os.stat_result): The current stat of the origin.
+
+        Returns:
+            str: The hexadecimal digest.
+        """
+        digest = file_sha256(path)
+        self._digests[(str(path), stat.st_size, stat.st_mtime_ns)] = digest
+        return digest
+
+    def _known_digest(self, key, path, stat):
+        """
+        Get the digest of an origin without reading it.
+
+        Args:
+            key (str): The transformation key.
+            path (str or Path): The origin file.
+            stat (os.stat_result): The current stat of the origin.
+
+        Returns:
+            str: The digest hashed by a lookup, or kept from the previous
+                entry if the origin has the same size and modification time,
+                otherwise None.
+        """
+        digest = self._digests.pop((str(path), stat.st_size, stat.st_mtime_ns), None)
+        if digest is not None:
+            return digest
+
+        origin = (self._load_entry(key) or {}).get("origin")
+        if (
+            isinstance(origin, dict)
+            and origin.get("size") == stat.st_size
+            and origin.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            return origin.get("sha256")
+        return None
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def _load_entry(self, key):
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
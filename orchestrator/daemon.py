@@ -0,0 +1,213 @@
+"""
+Long-running service consuming job definitions dropped in a spool directory.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils.logger import setup_logger
+
+# Subdirectories of the spool directory
+SPOOL_INCOMING = "incoming"
+SPOOL_PROCESSING = "processing"
+SPOOL_DONE = "done"
+SPOOL_FAILED = "failed"
+
+# Seconds between two scans of an empty spool directory
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+class SpoolDaemon:
+    """
+    Runs the job definitions dropped in a spool directory with a warm engine.
+
+    The spool directory holds four subdirectories:
+
+        incoming/    job definitions waiting to be run (*.json, *.jsonl,
+                     *.ndjson)
+        processing/  the job definition being run
+        done/        job definitions whose jobs all succeeded
+        failed/      job definitions with at least one failed job
+
+    A job definition is claimed by renaming it into processing/, so several
+    daemons can share a spool directory without running a definition twice.
+    Producers must write the file elsewhere (or under a suffix the engine
+    does not run) and rename it into incoming/ once complete. Definitions
+    are run in modification time order and each one gets its JSON run report,
+    listing every job, written next to it as "<name>.report.json" once it is
+    moved to done/ or failed/. A definition resubmitted under the name of an
+    archived one is archived as "<name>.<n>.json" with "<name>.<n>.report.json",
+    so earlier runs are never overwritten.
+
+    The same engine runs every definition, so the interpreter, the imported
+    parsers and, when the engine keeps its workers, the worker pools are only
+    set up once.
+    """
+
+    def __init__(self, engine, spool_dir, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        Initialize the daemon and create the spool directories.
+
+        Args:
+            engine (TransformationEngine): The engine running the definitions.
+            spool_dir (str or Path): The spool directory.
+            poll_interval (float): Seconds to wait when no definition is queued.
+        """
+        self.logger = setup_logger("SpoolDaemon")
+        self.engine = engine
+        self.patterns = tuple(f"*{suffix}" for suffix in engine.definition_suffixes)
+
+        # Streamed definitions keep the results of their successful jobs too,
+        # as every definition gets its report
+        self.engine.keep_job_results = True
+        self.spool_dir = Path(spool_dir)
+        self.poll_interval = poll_interval
+
+        self.incoming_dir = self.spool_dir / SPOOL_INCOMING
+        self.processing_dir = self.spool_dir / SPOOL_PROCESSING
+        self.done_dir = self.spool_dir / SPOOL_DONE
+        self.failed_dir = self.spool_dir / SPOOL_FAILED
+        for directory in (
+            self.incoming_dir,
+            self.processing_dir,
+            self.done_dir,
+            self.failed_dir,
+        ):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Ask the daemon to stop once the current job definition is finished.
+
+        Safe to call from a signal handler or another thread.
+        """
+        self._stop_event.set()
+
+    def serve(self, max_definitions=None):
+        """
+        Run queued job definitions until stopped.
+
+        Args:
+            max_definitions (int): Stop after running this many definitions,
+                or None to run until stop is called.
+
+        Returns:
+            int: The number of job definitions run.
+        """
+        leftovers = sorted(
+            path
+            for pattern in self.patterns
+            for path in self.processing_dir.glob(pattern)
+        )
+        if leftovers:
+            self.logger.warning(
+                "%d job definitions were left in %s by a previous run: %s",
+                len(leftovers),
+                self.processing_dir,
+                [path.name for path in leftovers],
+            )
+
+        self.logger.info("Watching %s for job definitions", self.incoming_dir)
+        processed = 0
+        try:
+            while not self._stop_event.is_set():
+                if max_definitions is not None and processed >= max_definitions:
+                    break
+                if self.process_next() is None:
+                    self._stop_event.wait(self.poll_interval)
+                    continue
+                processed += 1
+        finally:
+            self.engine.close()
+
+        self.logger.info("Stopped after running %d job definitions", processed)
+        return processed
+
+    def process_next(self):
+        """
+        Claim and run the oldest queued job definition.
+
+        Returns:
+            bool: Whether every job of the definition succeeded, or None if no
+                definition was queued.
+        """
+        path = self._claim_next()
+        if path is None:
+            return None
+
+        start_time = time.perf_counter()
+        try:
+            success = self.engine.run(path)
+        except Exception as e:
+            self.logger.error("Error running job definition %s: %s", path.name, str(e))
+            success = False
+        elapsed = time.perf_counter() - start_time
+
+        target, report_path = self._archive_paths(
+            self.done_dir if success else self.failed_dir, path
+        )
+        os.replace(path, target)
+        try:
+            self.engine.make_report().write_json(report_path)
+        except OSError as e:
+            self.logger.error("Could not write the report of %s: %s", path.name, str(e))
+
+        self.logger.info(
+            "Job definition %s %s in %.3f s (%d jobs, %d failed)",
+            path.name,
+            "succeeded" if success else "failed",
+            elapsed,
+            self.engine.total_jobs,
+            self.engine.failed_jobs,
+        )
+        return success
+
+    def _archive_paths(self, target_dir, path):
+        """
+        Get the paths a run job definition and its report are archived at.
+
+        Args:
+            target_dir (Path): The done or failed directory.
+            path (Path): The job definition, in the processing directory.
+
+        Returns:
+            tuple: The paths of the definition and of its report, numbered
+                when an earlier definition of the same name was archived.
+        """
+        target = target_dir / path.name
+        report_path = target_dir / f"{path.stem}.report.json"
+        number = 0
+        while target.exists() or report_path.exists():
+            number += 1
+            target = target_dir / f"{path.stem}.{number}{path.suffix}"
+            report_path = target_dir / f"{path.stem}.{number}.report.json"
+        return target, report_path
+
+    def _claim_next(self):
+        """
+        Move the oldest queued job definition into the processing directory.
+
+        Returns:
+            Path: The claimed definition, or None if none is queued.
+        """
+        candidates = []
+        for pattern in self.patterns:
+            for path in self.incoming_dir.glob(pattern):
+                try:
+                    candidates.append((path.stat().st_mtime, path.name, path))
+                except FileNotFoundError:
+                    # Claimed by another daemon in the meantime
+                    continue
+
+        for _, name, path in sorted(candidates):
+            claimed = self.processing_dir / name
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            return claimed
+        return None
@@ -0,0 +1,407 @@
+"""
+Dependency graph of the transformations of a job definition.
+
+Dependencies are either declared explicitly, through the "id" and "depends_on"
+keys of a transformation, or inferred from the overlap between the "origin" and
+"destiny" paths of the transformations.
+
+The graph is either built whole and validated before any job runs, or fed one
+job at a time with add_streamed_job while the earlier jobs run.
+"""
+
+import heapq
+from collections import deque
+
+
+def _directory_prefix(path):
+    """
+    Normalize a destination path so it can be matched as a prefix.
+
+    Args:
+        path (str): The S3 path of a destination directory.
+
+    Returns:
+        str: The path with exactly one trailing slash.
+    """
+    return path.rstrip("/") + "/"
+
+
+def _ancestor_prefixes(path):
+    """
+    List every directory prefix of a path.
+
+    Args:
+        path (str): An S3 path, e.g. "s3://bucket/a/b.xml".
+
+    Returns:
+        list: The prefixes ending with a slash, e.g. ["s3://", "s3://bucket/",
+            "s3://bucket/a/"].
+    """
+    return [path[: i + 1] for i, char in enumerate(path) if char == "/"]
+
+
+class JobGraph:
+    """
+    Directed acyclic graph of transformation jobs.
+
+    Jobs are identified by their position in the job definition. A job only
+    becomes ready once every job it depends on has completed successfully; when a
+    job fails, all of its transitive dependents are dropped.
+
+    Completed jobs are forgotten, so a graph fed with add_streamed_job only holds
+    the jobs that are pending or running, plus the failed ones.
+    """
+
+    def __init__(self, infer_dependencies=True):
+        """
+        Initialize an empty job graph.
+
+        Args:
+            infer_dependencies (bool): Whether to add dependencies between jobs
+                whose origin and destiny paths overlap.
+        """
+        self.infer_dependencies = infer_dependencies
+
+        self.transformations = {}
+        self.dependencies = {}
+        self.dependents = {}
+
+        # Declared names ("id" key) and pending declared dependencies
+        self._names = {}
+        self._declared = {}
+
+        # Indexes used to infer dependencies from path overlap
+        self._jobs_by_destiny = {}
+        self._jobs_by_origin_prefix = {}
+
+        # Failed jobs, and streamed jobs that depend on one of them
+        self._failed = set()
+        self._blocked = set()
+
+    def __len__(self):
+        return len(self.transformations)
+
+    def add_job(self, job_id, transformation):
+        """
+        Add a transformation to the graph.
+
+        A transformation depends on every earlier transformation that writes
+        under the path it reads from, or that reads from under the path it
+        writes to.
+
+        Args:
+            job_id (int): Position of the job in the job definition.
+            transformation (dict): The transformation job definition.
+
+        Raises:
+            ValueError: If the declared name of the job is already in use.
+        """
+        name = transformation.get("id")
+        if name is not None:
+            if name in self._names:
+                raise ValueError(f"Duplicate transformation id: {name}")
+            self._names[name] = job_id
+
+        self.transformations[job_id] = transformation
+        self.dependencies[job_id] = set()
+        self.dependents.setdefault(job_id, set())
+        self._declared[job_id] = list(transformation.get("depends_on", []))
+
+        if self.infer_dependencies:
+            self._infer_dependencies(job_id, transformation)
+
+    def validate(self):
+        """
+        Resolve declared dependencies and check that the graph has no cycles.
+
+        Raises:
+            ValueError: If a declared dependency is unknown or the graph
+                contains a cycle.
+        """
+        for job_id, names in self._declared.items():
+            for name in names:
+                if name not in self._names:
+                    raise ValueError(
+                        f"Job {job_id} depends on unknown transformation id: {name}"
+                    )
+                self._add_dependency(job_id, self._names[name])
+        self._declared = {}
+
+        # Kahn's algorithm: every job must be reachable from a root
+        pending = {job_id: len(deps) for job_id, deps in self.dependencies.items()}
+        queue = deque(job_id for job_id, count in pending.items() if count == 0)
+        visited = 0
+        while queue:
+            job_id = queue.popleft()
+            visited += 1
+            for dependent in self.dependents[job_id]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    queue.append(dependent)
+
+        if visited != len(self.transformations):
+            cyclic = sorted(job_id for job_id, count in pending.items() if count)
+            raise ValueError(f"Dependency cycle between jobs: {cyclic}")
+
+    def add_streamed_job(self, job_id, transformation):
+        """
+        Add a transformation while the earlier ones are running or done.
+
+        Declared dependencies are resolved at once, so they must name earlier
+        transformations, which also keeps the graph acyclic. Dependencies on
+        completed jobs are dropped, and a job depending on a failed job is
+        failed as well.
+
+        Args:
+            job_id (int): Position of the job in the job definition.
+            transformation (dict): The transformation job definition.
+
+        Returns:
+            bool: True if the job can run, False if it depends on a failed job.
+
+        Raises:
+            ValueError: If the declared name of the job is already in use or a
+                declared dependency does not name an earlier transformation.
+                The job is failed.
+        """
+        self.add_job(job_id, transformation)
+
+        for name in self._declared.pop(job_id):
+            dependency_id = self._names.get(name)
+            if dependency_id is None or dependency_id >= job_id:
+                self.fail_job(job_id)
+                raise ValueError(
+                    f"Job {job_id} depends on unknown or later transformation id: "
+                    f"{name}"
+                )
+            self._add_dependency(job_id, dependency_id)
+
+        if job_id in self._blocked:
+            self._blocked.discard(job_id)
+            self.fail_job(job_id)
+            return False
+        return True
+
+    def ready_jobs(self):
+        """
+        Get the jobs that have no pending dependencies.
+
+        Returns:
+            list: The ids of the ready jobs, in job definition order.
+        """
+        return sorted(
+            job_id for job_id, deps in self.dependencies.items() if not deps
+        )
+
+    def complete_job(self, job_id):
+        """
+        Remove a successfully completed job from the graph.
+
+        Args:
+            job_id (int): The completed job.
+
+        Returns:
+            list: The ids of the jobs that became ready.
+        """
+        self._unindex(job_id)
+
+        ready = []
+        for dependent in self.dependents.pop(job_id, ()):
+            deps = self.dependencies[dependent]
+            deps.discard(job_id)
+            if not deps:
+                ready.append(dependent)
+
+        self._remove(job_id)
+        return sorted(ready)
+
+    def transitive_dependents(self, job_id):
+        """
+        Get every job that directly or indirectly depends on a job.
+
+        Args:
+            job_id (int): The job.
+
+        Returns:
+            list: The ids of the dependent jobs.
+        """
+        seen = set()
+        queue = deque(self.dependents.get(job_id, ()))
+        while queue:
+            dependent = queue.popleft()
+            if dependent in seen:
+                continue
+            seen.add(dependent)
+            queue.extend(self.dependents.get(dependent, ()))
+        return sorted(seen)
+
+    def fail_job(self, job_id):
+        """
+        Remove a failed job and all of its transitive dependents from the graph.
+
+        Args:
+            job_id (int): The failed job.
+
+        Returns:
+            list: The ids of the dependent jobs that will not run.
+        """
+        skipped = self.transitive_dependents(job_id)
+        self._failed.add(job_id)
+        self._failed.update(skipped)
+        for removed_id in [job_id] + skipped:
+            self.dependents.pop(removed_id, None)
+            self._remove(removed_id)
+        return skipped
+
+    def _add_dependency(self, job_id, dependency_id):
+        if dependency_id == job_id:
+            return
+        if dependency_id in self._failed:
+            self._blocked.add(job_id)
+            return
+        if dependency_id not in self.transformations:
+            # Already completed
+            return
+        self.dependencies[job_id].add(dependency_id)
+        self.dependents.setdefault(dependency_id, set()).add(job_id)
+
+    def _infer_dependencies(self, job_id, transformation):
+        obj = transformation.get("object", {})
+        origin = obj.get("origin")
+        destiny = obj.get("destiny")
+
+        # Read after write: an earlier job writes where this job reads
+        if origin:
+            for prefix in _ancestor_prefixes(origin):
+                for other_id in self._jobs_by_destiny.get(prefix, ()):
+                    self._add_dependency(job_id, other_id)
+
+        # Write after read: an earlier job reads where this job writes
+        if destiny:
+            prefix = _directory_prefix(destiny)
+            for other_id in self._jobs_by_origin_prefix.get(prefix, ()):
+                self._add_dependency(job_id, other_id)
+            self._jobs_by_destiny.setdefault(prefix, set()).add(job_id)
+
+        if origin:
+            for prefix in _ancestor_prefixes(origin):
+                self._jobs_by_origin_prefix.setdefault(prefix, set()).add(job_id)
+
+    def _unindex(self, job_id):
+        # Completed jobs are no longer dependencies of the jobs added later
+        if not self.infer_dependencies or job_id not in self.transformations:
+            return
+
+        obj = self.transformations[job_id].get("object", {})
+        origin = obj.get("origin")
+        destiny = obj.get("destiny")
+        entries = []
+        if destiny:
+            entries.append((self._jobs_by_destiny, _directory_prefix(destiny)))
+        if origin:
+            entries.extend(
+                (self._jobs_by_origin_prefix, prefix)
+                for prefix in _ancestor_prefixes(origin)
+            )
+
+        for index, prefix in entries:
+            jobs = index.get(prefix)
+            if jobs is not None:
+                jobs.discard(job_id)
+                if not jobs:
+                    del index[prefix]
+
+    def _remove(self, job_id):
+        self.transformations.pop(job_id, None)
+        for dependency_id in self.dependencies.pop(job_id, ()):
+            self.dependents.get(dependency_id, set()).discard(job_id)
+
+
+class ReadyQueue:
+    """
+    Jobs ready to run, popped by priority, then in job definition order.
+
+    Jobs pushed with the same group key are popped together, with the first
+    of them, so jobs that can share a read of their origin run as one.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty queue.
+        """
+        # (priority, job id) of the ready jobs
+        self._heap = []
+
+        # Group key of each grouped job, and grouped jobs of each key
+        self._keys = {}
+        self._groups = {}
+
+        # Jobs left in the heap after being popped with their group
+        self._popped = set()
+
+    def __len__(self):
+        return len(self._heap) - len(self._popped)
+
+    def push(self, job_id, group_key=None, priority=0):
+        """
+        Add a ready job.
+
+        Args:
+            job_id (int): The ready job.
+            group_key (Hashable): Key of the jobs to pop together, or None to
+                pop the job on its own.
+            priority (float): Jobs with a lower priority are popped first.
+        """
+        heapq.heappush(self._heap, (priority, job_id))
+        if group_key is not None:
+            self._keys[job_id] = group_key
+            self._groups.setdefault(group_key, []).append(job_id)
+
+    def pop(self, admit=None):
+        """
+        Remove the first ready job and the jobs of its group.
+
+        Args:
+            admit (callable): Called with the job ids of a group, in job
+                definition order. When given, the first group it returns True
+                for is popped instead of the first job.
+
+        Returns:
+            list: The job ids, in job definition order, or None when admit
+                rejected every group.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        self._drop_popped()
+        if not self._heap:
+            raise IndexError("pop from an empty ReadyQueue")
+
+        if admit is None:
+            return self._take(self._heap[0][1])
+
+        for _, job_id in sorted(self._heap):
+            if job_id not in self._popped and admit(self._group(job_id)):
+                return self._take(job_id)
+        return None
+
+    def _group(self, job_id):
+        group_key = self._keys.get(job_id)
+        if group_key is None:
+            return [job_id]
+        return sorted(self._groups[group_key])
+
+    def _take(self, job_id):
+        group = self._group(job_id)
+        group_key = self._keys.get(job_id)
+        if group_key is not None:
+            del self._groups[group_key]
+            for other_id in group:
+                del self._keys[other_id]
+        self._popped.update(group)
+        self._drop_popped()
+        return group
+
+    def _drop_popped(self):
+        while self._heap and self._heap[0][1] in self._popped:
+            self._popped.discard(heapq.heappop(self._heap)[1])
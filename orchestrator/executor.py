@@ -0,0 +1,127 @@
+"""
+Executors used by the transformation engine to run jobs concurrently.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Supported executor kinds
+EXECUTOR_KINDS = ("auto", "thread", "process")
+
+
+class JobExecutor:
+    """
+    Dispatches transformation jobs to a thread pool or a process pool.
+
+    With a single worker every job runs inline in the calling thread, which keeps
+    the historical sequential behaviour. With more workers, the ``auto`` kind
+    sends CPU-bound parsers to a process pool and I/O-bound ones to a thread pool.
+    """
+
+    def __init__(
+        self, max_workers=1, kind="auto", process_initializer=None, initargs=()
+    ):
+        """
+        Initialize the job executor.
+
+        Args:
+            max_workers (int): Maximum number of jobs running at the same time.
+            kind (str): One of "auto", "thread" or "process".
+            process_initializer (callable): Function run once in each worker process.
+            initargs (tuple): Arguments passed to the process initializer.
+
+        Raises:
+            ValueError: If the executor kind or worker count is invalid.
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Unknown executor kind: {kind}. Expected one of {EXECUTOR_KINDS}"
+            )
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+        self.max_workers = max_workers
+        self.kind = kind
+        self.process_initializer = process_initializer
+        self.initargs = initargs
+
+        # Pools are created lazily, only when a job needs them
+        self._thread_pool = None
+        self._process_pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def resolve_kind(self, cpu_bound):
+        """
+        Determine which kind of worker a job should run on.
+
+        Args:
+            cpu_bound (bool): Whether the job is dominated by CPU work.
+
+        Returns:
+            str: "inline", "thread" or "process".
+        """
+        if self.max_workers == 1:
+            return "inline"
+        if self.kind == "auto":
+            return "process" if cpu_bound else "thread"
+        return self.kind
+
+    def submit(self, cpu_bound, thread_fn, process_fn, *args):
+        """
+        Schedule a job on the appropriate worker.
+
+        Args:
+            cpu_bound (bool): Whether the job is dominated by CPU work.
+            thread_fn (callable): Callable used for inline and thread execution.
+            process_fn (callable): Picklable, module-level callable used for
+                process execution.
+            *args: Arguments passed to the selected callable.
+
+        Returns:
+            Future: A future holding the job result.
+        """
+        kind = self.resolve_kind(cpu_bound)
+
+        if kind == "inline":
+            future = Future()
+            try:
+                future.set_result(thread_fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if kind == "process":
+            return self._get_process_pool().submit(process_fn, *args)
+
+        return self._get_thread_pool().submit(thread_fn, *args)
+
+    def shutdown(self):
+        """
+        Wait for running jobs and release the worker pools.
+        """
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+
+    def _get_thread_pool(self):
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="transformation"
+            )
+        return self._thread_pool
+
+    def _get_process_pool(self):
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=self.process_initializer,
+                initargs=self.initargs,
+            )
+        return self._process_pool
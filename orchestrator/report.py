@@ -0,0 +1,157 @@
+"""
+Machine-readable reports of a transformation run, as JSON and as a Prometheus textfile.
+"""
+
+import json
+import os
+from pathlib import Path
+
+# Per-job metrics exported to Prometheus: metric suffix -> (metric key, help text)
+PROMETHEUS_JOB_METRICS = {
+    "wall_seconds": ("wall_time_s", "Wall time of the transformation job."),
+    "cpu_seconds": ("cpu_time_s", "CPU time of the transformation job."),
+    "read_bytes": ("bytes_read", "Bytes read by the transformation job."),
+    "written_bytes": ("bytes_written", "Bytes written by the transformation job."),
+    "rows_emitted": ("rows_emitted", "Rows emitted by the transformation job."),
+    "members_extracted": (
+        "members_extracted",
+        "Archive members extracted by the transformation job.",
+    ),
+    "peak_rss_bytes": (
+        "peak_rss_bytes",
+        "Peak resident memory of the worker process when the job finished.",
+    ),
+    "memory_growth_bytes": (
+        "memory_growth_bytes",
+        "Resident memory added by the job, when it raised the peak of its "
+        "worker process.",
+    ),
+    "memory_growth_max_bytes": (
+        "memory_growth_max_bytes",
+        "Most resident memory the job can have added, when it stayed under the "
+        "peak of its worker process.",
+    ),
+}
+
+
+def _write_atomically(path, content):
+    """
+    Write a text file through a temporary file, so readers never see it half written.
+
+    Args:
+        path (str or Path): Destination file.
+        content (str): The file content.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def _escape_label(value):
+    """
+    Escape a Prometheus label value.
+
+    Args:
+        value: The label value.
+
+    Returns:
+        str: The escaped value.
+    """
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+class RunReport:
+    """
+    Summary of a transformation run and the metrics of each of its jobs.
+    """
+
+    def __init__(self, job_definition, summary, jobs):
+        """
+        Initialize the report.
+
+        Args:
+            job_definition (str): Path of the job definition that was run.
+            summary (dict): Run level values (counters, wall time, ...).
+            jobs (list): One dict per job with its "job_id", "classname",
+                "origin", "destiny", "status" and "metrics".
+        """
+        self.job_definition = str(job_definition)
+        self.summary = summary
+        self.jobs = sorted(jobs, key=lambda job: job["job_id"])
+
+    def to_dict(self):
+        """
+        Get the report as a JSON serializable dict.
+
+        Returns:
+            dict: The report.
+        """
+        return {
+            "job_definition": self.job_definition,
+            "summary": self.summary,
+            "jobs": self.jobs,
+        }
+
+    def write_json(self, path):
+        """
+        Write the report as a JSON file.
+
+        Args:
+            path (str or Path): Destination file.
+        """
+        _write_atomically(path, json.dumps(self.to_dict(), indent=2, default=str))
+
+    def to_prometheus(self):
+        """
+        Render the report in the Prometheus text exposition format.
+
+        Returns:
+            str: The textfile content.
+        """
+        lines = []
+
+        # Run level metrics
+        lines.append("# HELP transformation_run_jobs Jobs of the run by status.")
+        lines.append("# TYPE transformation_run_jobs gauge")
+        for status in ("successful", "cached", "failed"):
+            lines.append(
+                f'transformation_run_jobs{{status="{status}"}} '
+                f"{self.summary.get(f'{status}_jobs', 0)}"
+            )
+        lines.append("# HELP transformation_run_wall_seconds Wall time of the run.")
+        lines.append("# TYPE transformation_run_wall_seconds gauge")
+        lines.append(
+            f"transformation_run_wall_seconds {self.summary.get('wall_time_s', 0)}"
+        )
+
+        # Job level metrics
+        for suffix, (key, help_text) in PROMETHEUS_JOB_METRICS.items():
+            name = f"transformation_job_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for job in self.jobs:
+                value = job.get("metrics", {}).get(key)
+                if value is None:
+                    continue
+                labels = ",".join(
+                    f'{label}="{_escape_label(job.get(label, ""))}"'
+                    for label in ("job_id", "classname", "origin", "status")
+                )
+                lines.append(f"{name}{{{labels}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Write the report as a Prometheus textfile (for the node exporter
+        textfile collector).
+
+        Args:
+            path (str or Path): Destination file, usually ending with ".prom".
+        """
+        _write_atomically(path, self.to_prometheus())
@@ -0,0 +1,159 @@
+"""
+Cost estimates used to order the ready jobs and to admit them under a memory budget.
+
+A job is estimated from the size of its origin and its parser class. Its
+running time is the size times the seconds per byte of the class, and its
+peak memory is the estimate_memory of the class scaled by a factor. Both
+ratios start from a prior. They follow the metrics of the jobs of the class
+that ran, and they can be saved to a JSON file so later runs start from them.
+
+The memory of a job is only measured when it raises the peak RSS of its
+process, which favors the largest jobs; the other jobs only give an upper
+bound of their memory, used to lower a factor that overestimates them.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from utils.logger import setup_logger
+
+# Orders of the ready jobs: job definition order, or longest estimated first
+SCHEDULES = ("fifo", "largest_first")
+
+# Seconds per input byte of the parser classes without measured jobs
+# (50 MiB/s)
+DEFAULT_SECONDS_PER_BYTE = 1 / (50 * 1024 * 1024)
+
+# Weight of the last measured job in the learned ratios
+LEARNING_RATE = 0.3
+
+# Name of the file saving the learned ratios in the cache directory
+COST_MODEL_FILENAME = "cost_model.json"
+
+
+class CostModel:
+    """
+    Learned cost of the jobs of each parser class.
+
+    The ratios of a class are kept under its name as "seconds_per_byte",
+    "memory_factor" and "samples" (the number of measured jobs).
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the model, loading the ratios saved by previous runs.
+
+        Args:
+            path (str or Path): JSON file holding the ratios, or None to keep
+                them in memory only.
+        """
+        self.logger = setup_logger("CostModel")
+        self.path = Path(path) if path else None
+        self.ratios = {}
+        if self.path is not None:
+            self.load()
+
+    def load(self):
+        """
+        Read the ratios from the file. A missing or invalid file leaves the
+        model with its priors.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                ratios = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning("Could not read cost model %s: %s", self.path, str(e))
+            return
+
+        if not isinstance(ratios, dict) or not all(
+            isinstance(entry, dict) for entry in ratios.values()
+        ):
+            self.logger.warning("Ignoring invalid cost model %s", self.path)
+            return
+        self.ratios = ratios
+
+    def save(self):
+        """
+        Write the ratios to the file, if the model has one.
+        """
+        if self.path is None:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.ratios, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            # A failed save only loses what this run learned
+            self.logger.warning("Could not save cost model %s: %s", self.path, str(e))
+
+    def estimate(self, classname, parser_class, input_size, kwargs):
+        """
+        Estimate the cost of a job.
+
+        Args:
+            classname (str): The parser class name.
+            parser_class (type): The parser class.
+            input_size (int): Size of the origin in bytes.
+            kwargs (dict): The parser arguments.
+
+        Returns:
+            dict: The "input_size", the estimated "seconds" and "memory_bytes",
+                and the "prior_memory_bytes" given by the parser class.
+        """
+        ratios = self.ratios.get(classname, {})
+        prior_memory = max(int(parser_class.estimate_memory(input_size, kwargs)), 0)
+        return {
+            "input_size": input_size,
+            "seconds": input_size
+            * ratios.get("seconds_per_byte", DEFAULT_SECONDS_PER_BYTE),
+            "memory_bytes": int(prior_memory * ratios.get("memory_factor", 1.0)),
+            "prior_memory_bytes": prior_memory,
+        }
+
+    def observe(self, classname, estimate, metrics):
+        """
+        Update the ratios of a parser class with the metrics of a finished job.
+
+        Args:
+            classname (str): The parser class name.
+            estimate (dict): The estimate of the job, see estimate.
+            metrics (dict): The metrics of the job.
+        """
+        input_size = estimate["input_size"]
+        if not input_size:
+            return
+
+        ratios = self.ratios.setdefault(classname, {})
+        wall_time = metrics.get("wall_time_s")
+        if wall_time:
+            self._learn(ratios, "seconds_per_byte", wall_time / input_size)
+
+        # Only the jobs raising the peak RSS of their process are measured.
+        # Learning from them alone would only move the factor upward, so the
+        # bound of the other jobs lowers a factor estimating more than they
+        # can have used
+        prior_memory = estimate["prior_memory_bytes"]
+        memory = metrics.get("memory_growth_bytes")
+        memory_max = metrics.get("memory_growth_max_bytes")
+        if prior_memory and memory is not None:
+            self._learn(ratios, "memory_factor", memory / prior_memory)
+        elif prior_memory and memory_max is not None:
+            factor_max = memory_max / prior_memory
+            if ratios.get("memory_factor", 1.0) > factor_max:
+                self._learn(ratios, "memory_factor", factor_max)
+
+        ratios["samples"] = ratios.get("samples", 0) + 1
+
+    @staticmethod
+    def _learn(ratios, name, value):
+        previous = ratios.get(name)
+        if previous is None:
+            ratios[name] = value
+        else:
+            ratios[name] = previous + LEARNING_RATE * (value - previous)
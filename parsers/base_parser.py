@@ -2,10 +2,16 @@
 Base abstract parser class that all parser implementations should inherit from.
 """
 
+import io
+import posixpath
 from abc import ABC, abstractmethod
 
+from storage.local_storage import AtomicFileWriter, LocalStorageBackend
+from utils.checkpoint import DEFAULT_CHECKPOINT_INTERVAL, Checkpoint
 from utils.logger import setup_logger
-from utils.path_utils import s3_to_local_path, ensure_directory_exists
+from utils.mapped_file import MMAP_MIN_SIZE, MappedFile
+from utils.metrics import CountingStream, JobMetrics
+from utils.path_utils import ensure_directory_exists, get_filename_from_path
 
 
 class BaseParser(ABC):
@@ -13,33 +19,107 @@ class BaseParser(ABC):
     Abstract base class for all parsers.
 
     All parsers must implement the parse method.
+
+    Attributes:
+        cpu_bound (bool): Whether the parser is dominated by CPU work rather than
+            I/O. Used by the engine to pick a process or a thread worker.
+        version (str): Version of the parser output. Bump it whenever a change
+            alters the files a parser produces, so cached results are discarded.
     """
 
-    def __init__(self, origin, destiny, **kwargs):
+    cpu_bound = False
+    version = "1"
+
+    def __init__(self, origin, destiny, storage=None, **kwargs):
         """
         Initialize the base parser with common attributes.
 
         Args:
             origin (str): S3 path to the source file.
             destiny (str): S3 path to the destination directory.
+            storage (StorageBackend): Backend holding the origin and destiny
+                (default: the local S3 simulation folder).
             **kwargs: Additional arguments required by specific parsers.
         """
         self.logger = setup_logger(self.__class__.__name__)
         self.origin = origin
         self.destiny = destiny
+        self.storage = storage if storage is not None else LocalStorageBackend()
 
-        # Convert S3 paths to local paths
-        self.local_origin = s3_to_local_path(origin)
-        self.local_destiny = s3_to_local_path(destiny)
+        # Resolve the local files backing the S3 paths (None for remote backends)
+        self.local_origin = self.storage.local_path(origin)
+        self.local_destiny = self.storage.local_path(destiny)
 
         # Store any additional arguments
         self.kwargs = kwargs
 
+        # Paths of the files written by the last parse
+        self.outputs = []
+
+        # Performance counters of the parse (bytes, rows, members, ...)
+        self.metrics = JobMetrics()
+
         # Log initialization
         self.logger.info(
-            f"Initialized {self.__class__.__name__} with origin: {origin}, destiny: {destiny}"
+            "Initialized %s with origin: %s, destiny: %s",
+            self.__class__.__name__,
+            origin,
+            destiny,
         )
 
+    @classmethod
+    def shared_read_key(cls, kwargs):
+        """
+        Get the key under which jobs of the same origin can share one read.
+
+        Jobs of this class reading the same origin whose kwargs give the same
+        key are run together through parse_shared, which reads the origin
+        once for all of them.
+
+        Args:
+            kwargs (dict): The parser arguments of a job.
+
+        Returns:
+            Hashable: The key, or None when the job must read the origin on
+                its own (the default).
+        """
+        return None
+
+    @classmethod
+    def parse_shared(cls, parsers):
+        """
+        Run several parsers of the same origin, reading it once.
+
+        Only called with parsers whose kwargs have the same non-None
+        shared_read_key. The default runs each parser on its own.
+
+        Args:
+            parsers (list): The parsers, all of this class and origin.
+
+        Returns:
+            list: Whether each parser succeeded, in the same order.
+        """
+        return [parser.parse() for parser in parsers]
+
+    @classmethod
+    def estimate_memory(cls, input_size, kwargs):
+        """
+        Estimate the peak memory of a job, for the engine's memory budget.
+
+        The engine scales the estimate by a factor learned from the jobs of
+        this class that ran, so it only has to tell whether the memory follows
+        the size of the input or stays bounded. The default assumes the input
+        is held in memory once.
+
+        Args:
+            input_size (int): Size of the origin in bytes.
+            kwargs (dict): The parser arguments of a job.
+
+        Returns:
+            int: The estimated memory in bytes.
+        """
+        return input_size
+
     @abstractmethod
     def parse(self):
         """
@@ -59,11 +139,17 @@ class BaseParser(ABC):
         Returns:
             bool: True if the input file is valid, False otherwise.
         """
+        if self.local_origin is None:
+            if not self.storage.exists(self.origin):
+                self.logger.error("Input object does not exist: %s", self.origin)
+                return False
+            return True
+
         if not self.local_origin.exists():
-            self.logger.error(f"Input file does not exist: {self.local_origin}")
+            self.logger.error("Input file does not exist: %s", self.local_origin)
             return False
 
-        self.logger.debug(f"Input file validated: {self.local_origin}")
+        self.logger.debug("Input file validated: %s", self.local_origin)
         return True
 
     def ensure_output_directory(self):
@@ -71,6 +157,166 @@ class BaseParser(ABC):
         Ensure the output directory exists, creating it if necessary.
 
         Returns:
-            Path: The path to the output directory.
+            Path: The path to the output directory, or None when the destiny
+                is not backed by a local directory.
         """
+        if self.local_destiny is None:
+            return None
         return ensure_directory_exists(self.local_destiny)
+
+    @property
+    def input_name(self):
+        """
+        str: The file name of the origin.
+        """
+        if self.local_origin is not None:
+            return get_filename_from_path(self.local_origin)
+        return self.origin.rstrip("/").rsplit("/", 1)[-1]
+
+    def open_input(self):
+        """
+        Open the origin for streaming reads.
+
+        Local origins can be memory-mapped, see open_local_input.
+
+        Returns:
+            io.BufferedIOBase: A readable binary stream.
+        """
+        if self.local_origin is not None:
+            return self.open_local_input()
+        stream = self.storage.open_read(self.origin)
+        return CountingStream(stream, self.metrics, "bytes_read")
+
+    def open_seekable_input(self):
+        """
+        Open the origin as a seekable stream, using ranged reads for remote
+        backends so the object never needs to be downloaded as a whole.
+
+        Local origins can be memory-mapped, see open_local_input.
+
+        Returns:
+            io.BufferedIOBase: A readable, seekable binary stream.
+        """
+        if self.local_origin is not None:
+            return self.open_local_input()
+        stream = self.storage.open_range_reader(self.origin)
+        return CountingStream(stream, self.metrics, "bytes_read")
+
+    def open_local_input(self):
+        """
+        Open the local file backing the origin.
+
+        With the "mmap" kwarg, files of at least MMAP_MIN_SIZE bytes are
+        memory-mapped: reads are served from the page cache without a system
+        call, and the returned MappedFile can hand out memoryview slices of
+        the file that copy nothing at all. It is off by default, as the
+        mapped pages add to the resident memory of the job.
+
+        Returns:
+            MappedFile or io.BufferedIOBase: A readable, seekable binary stream.
+        """
+        if (
+            self.kwargs.get("mmap")
+            and self.local_origin.stat().st_size >= MMAP_MIN_SIZE
+        ):
+            return MappedFile(self.local_origin, self.metrics, "bytes_read")
+        return CountingStream(open(self.local_origin, "rb"), self.metrics, "bytes_read")
+
+    def output_location(self, relative_path):
+        """
+        Get the location of an output file inside the destiny.
+
+        Args:
+            relative_path (str): Path of the output relative to the destiny,
+                using "/" as separator.
+
+        Returns:
+            Path or str: The local path, or the S3 path for remote backends.
+        """
+        if self.local_destiny is not None:
+            return self.local_destiny / relative_path
+        return self.destiny.rstrip("/") + "/" + relative_path
+
+    def open_checkpoint(self, relative_path):
+        """
+        Get the checkpoint of an output, when the "checkpoint" kwarg is set.
+
+        The checkpoint is a hidden sidecar file next to the output. It is tied
+        to the parser version, the size and modification time of the origin
+        and the kwargs, so it is ignored once any of them changes. Checkpoints
+        are saved at most every "checkpoint_interval" seconds (default: 30).
+
+        Args:
+            relative_path (str): Path of the output relative to the destiny,
+                using "/" as separator.
+
+        Returns:
+            Checkpoint: The checkpoint, or None when checkpoints are disabled or
+                the origin or destiny is not a local file.
+        """
+        if not self.kwargs.get("checkpoint"):
+            return None
+        if self.local_origin is None or self.local_destiny is None:
+            self.logger.info(
+                "Checkpoints require a local origin and destiny, %s will not be "
+                "resumable",
+                self.origin,
+            )
+            return None
+
+        stat = self.local_origin.stat()
+        directory, name = posixpath.split(relative_path)
+        return Checkpoint(
+            self.output_location(posixpath.join(directory, f".{name}.checkpoint")),
+            {
+                "parser": self.__class__.__name__,
+                "version": self.version,
+                "origin": self.origin,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "kwargs": {
+                    key: value
+                    for key, value in self.kwargs.items()
+                    if key != "checkpoint_interval"
+                },
+            },
+            float(self.kwargs.get("checkpoint_interval", DEFAULT_CHECKPOINT_INTERVAL)),
+        )
+
+    def open_output(self, relative_path, text=False, offset=None, in_place=False):
+        """
+        Open an output file inside the destiny for streaming writes.
+
+        The output is registered in the parser outputs. It only appears once
+        the stream is closed: a stream left by an exception in a with block,
+        or aborted, leaves no output behind.
+
+        Args:
+            relative_path (str): Path of the output relative to the destiny,
+                using "/" as separator.
+            text (bool): Return a UTF-8 text stream suitable for the csv module
+                instead of a binary one.
+            offset (int): Keep the first offset bytes of an existing local
+                output and append after them, to resume an interrupted write.
+            in_place (bool): Write a local output at its final path from the
+                start, so an interrupted write can be resumed with offset.
+
+        Returns:
+            io.IOBase: A writable stream.
+        """
+        location = self.output_location(relative_path)
+        if offset is not None:
+            stream = open(location, "r+b")
+            stream.truncate(offset)
+            stream.seek(offset)
+        elif self.local_destiny is not None:
+            location.parent.mkdir(parents=True, exist_ok=True)
+            stream = open(location, "wb") if in_place else AtomicFileWriter(location)
+        else:
+            stream = self.storage.open_write(location)
+        stream = CountingStream(stream, self.metrics, "bytes_written")
+
+        self.outputs.append(location)
+        if text:
+            return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        return stream
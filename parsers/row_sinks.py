@@ -0,0 +1,416 @@
+"""
+Row sinks writing the records produced by the XML conversion in several formats.
+"""
+
+import csv
+import io
+from abc import ABC, abstractmethod
+
+from utils.compression import (
+    COMPRESSION_EXTENSIONS,
+    CompressingWriter,
+    check_compression,
+)
+
+# Default number of rows per Parquet row group / Arrow record batch
+DEFAULT_BATCH_SIZE = 65536
+
+# Rows encoded together by one writerows call of the CSV sink
+CSV_BATCH_ROWS = 1024
+
+# Size of the write buffer between the CSV encoder and the output (1 MiB)
+CSV_BUFFER_SIZE = 1024 * 1024
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow, which is only needed by the columnar output formats.
+
+    Returns:
+        module: The pyarrow module.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "The parquet and arrow output formats require pyarrow "
+            "(pip install pyarrow)"
+        ) from None
+    return pyarrow
+
+
+class RowSink(ABC):
+    """
+    Abstract base class for the writers of converted rows.
+
+    Rows are dicts mapping a column name to its value (None for missing text).
+    Like csv.DictWriter, a sink rejects rows holding columns that are not part
+    of its field names. Used as a context manager, a sink is closed when the
+    block succeeds and aborted when it raises.
+
+    Attributes:
+        extension (str): File extension of the output.
+        resumable (bool): Whether flush leaves whole rows in the stream, so an
+            output truncated at a flushed position can be continued by a new
+            sink without header.
+    """
+
+    extension = None
+    resumable = False
+
+    def __init__(
+        self,
+        stream,
+        field_names,
+        batch_size=DEFAULT_BATCH_SIZE,
+        compression=None,
+        compression_level=None,
+        compression_threads=1,
+    ):
+        """
+        Initialize the sink.
+
+        Args:
+            stream (io.IOBase): Writable binary stream receiving the output.
+            field_names (list): The column names.
+            batch_size (int): Number of rows buffered before they are written.
+            compression (str): Format specific compression codec, or None.
+            compression_level (int): Level of the codec, or None for its default.
+            compression_threads (int): Threads compressing the output, for the
+                formats compressed as a whole.
+        """
+        self.stream = stream
+        self.field_names = list(field_names)
+        self.batch_size = batch_size
+        self.compression = compression
+        self.compression_level = compression_level
+        self.compression_threads = compression_threads
+
+    @classmethod
+    def output_extension(cls, compression=None):
+        """
+        Get the file extension of the output.
+
+        Args:
+            compression (str): The compression codec, or None.
+
+        Returns:
+            str: The extension, including the leading dot.
+        """
+        return cls.extension
+
+    @classmethod
+    def check_options(cls, compression=None):
+        """
+        Check that the sink can be created, before its output is opened.
+
+        Args:
+            compression (str): The compression codec, or None.
+
+        Raises:
+            ValueError: If the codec is not supported.
+            ImportError: If a package needed by the sink is not installed.
+        """
+        cls.output_extension(compression)
+
+    @abstractmethod
+    def write_row(self, row):
+        """
+        Write a single row.
+
+        Args:
+            row (dict): Mapping of column name to value.
+
+        Raises:
+            ValueError: If the row holds columns missing from the field names.
+        """
+        pass
+
+    def write_fields(self, fields):
+        """
+        Write a single row given as (column name, value) pairs.
+
+        A column appearing several times takes its last value, as in a dict.
+
+        Args:
+            fields (Iterable): The (column name, value) pairs.
+
+        Raises:
+            ValueError: If the row holds columns missing from the field names.
+        """
+        self.write_row(dict(fields))
+
+    def flush(self):
+        """
+        Write the buffered rows to the stream, for the resumable sinks.
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        """
+        Flush buffered rows and finish the output. The stream is left open.
+        """
+        pass
+
+    def abort(self):
+        """
+        Release the resources of a failed output without finishing it. The
+        stream is left open.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class CsvRowSink(RowSink):
+    """
+    Sink writing rows as UTF-8 CSV with a header line.
+
+    The CSV can be compressed as it is written with "gzip", "bz2" or "zstd"
+    (the latter requires zstandard). Compression runs on compression_threads
+    background threads, overlapping with the production of the rows; with 0
+    threads it runs on the writing thread.
+
+    Rows given as (column name, value) pairs are placed by column index into
+    preallocated lists and encoded in batches by writerows, avoiding a dict
+    and a DictWriter call per row. The output is the same as with DictWriter.
+    """
+
+    extension = ".csv"
+    resumable = True
+
+    def __init__(self, stream, field_names, write_header=True, **options):
+        """
+        Initialize the sink.
+
+        Args:
+            stream (io.IOBase): Writable binary stream receiving the output.
+            field_names (list): The column names.
+            write_header (bool): Whether to start with the header line.
+            **options: The options of RowSink.
+
+        Raises:
+            ValueError: If the compression codec is not supported.
+        """
+        super().__init__(stream, field_names, **options)
+        self._compressor = None
+        if self.compression is not None:
+            self._compressor = CompressingWriter(
+                stream,
+                self.compression,
+                level=self.compression_level,
+                threads=self.compression_threads,
+            )
+            stream = self._compressor
+
+        self._buffer = io.BufferedWriter(stream, buffer_size=CSV_BUFFER_SIZE)
+        self._text = io.TextIOWrapper(self._buffer, encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._text, fieldnames=self.field_names)
+        self._row_writer = csv.writer(self._text)
+        if write_header:
+            self._writer.writeheader()
+
+        # Column index of each field, unless a field name is repeated, in which
+        # case only DictWriter fills every copy of the column
+        self._positions = {name: index for index, name in enumerate(self.field_names)}
+        if len(self._positions) != len(self.field_names):
+            self._positions = None
+
+        self._blank_row = [None] * len(self.field_names)
+        self._rows = [list(self._blank_row) for _ in range(CSV_BATCH_ROWS)]
+        self._pending = 0
+
+    @classmethod
+    def output_extension(cls, compression=None):
+        if compression is None:
+            return cls.extension
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        return cls.extension + COMPRESSION_EXTENSIONS[compression]
+
+    @classmethod
+    def check_options(cls, compression=None):
+        super().check_options(compression)
+        if compression is not None:
+            check_compression(compression)
+
+    def write_row(self, row):
+        self._flush_rows()
+        self._writer.writerow(row)
+
+    def write_fields(self, fields):
+        positions = self._positions
+        if positions is None:
+            self.write_row(dict(fields))
+            return
+
+        row = self._rows[self._pending]
+        row[:] = self._blank_row
+        for name, value in fields:
+            try:
+                row[positions[name]] = value
+            except KeyError:
+                raise ValueError(
+                    f"dict contains fields not in fieldnames: {name!r}"
+                ) from None
+
+        self._pending += 1
+        if self._pending == CSV_BATCH_ROWS:
+            self._flush_rows()
+
+    def flush(self):
+        self._flush_rows()
+        self._text.flush()
+        if self._compressor is not None:
+            self._compressor.flush()
+
+    def close(self):
+        self._flush_rows()
+        self._text.flush()
+        # Leave the underlying stream to its owner
+        self._text.detach()
+        self._buffer.detach()
+        if self._compressor is not None:
+            self._compressor.close()
+
+    def abort(self):
+        # The rows still buffered are dropped with the output
+        self._pending = 0
+        if self._compressor is not None:
+            self._compressor.abort()
+
+    def _flush_rows(self):
+        if self._pending:
+            self._row_writer.writerows(self._rows[: self._pending])
+            self._pending = 0
+
+
+class ArrowBatchRowSink(RowSink):
+    """
+    Base class of the sinks buffering rows into Arrow record batches.
+
+    Every column is written as a nullable string, matching the CSV output.
+    """
+
+    @classmethod
+    def check_options(cls, compression=None):
+        super().check_options(compression)
+        _import_pyarrow()
+
+    def __init__(self, stream, field_names, **options):
+        super().__init__(stream, field_names, **options)
+        self.pa = _import_pyarrow()
+        self.schema = self.pa.schema(
+            [(name, self.pa.string()) for name in self.field_names]
+        )
+        self._columns = {name: [] for name in self.field_names}
+        self._pending = 0
+
+    def write_row(self, row):
+        if len(row) > len(self._columns) or not row.keys() <= self._columns.keys():
+            extra = sorted(set(row) - set(self._columns))
+            raise ValueError(f"dict contains fields not in fieldnames: {extra}")
+
+        for name, column in self._columns.items():
+            column.append(row.get(name))
+
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._close_writer()
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        arrays = [
+            self.pa.array(self._columns[name], type=self.pa.string())
+            for name in self.field_names
+        ]
+        self._write_batch(self.pa.record_batch(arrays, schema=self.schema))
+
+        for column in self._columns.values():
+            column.clear()
+        self._pending = 0
+
+    @abstractmethod
+    def _write_batch(self, batch):
+        pass
+
+    @abstractmethod
+    def _close_writer(self):
+        pass
+
+
+class ParquetRowSink(ArrowBatchRowSink):
+    """
+    Sink writing rows as a Parquet file, one row group per batch.
+
+    The compression defaults to snappy; any codec supported by pyarrow
+    ("gzip", "zstd", "brotli", "lz4", "none") can be selected.
+    """
+
+    extension = ".parquet"
+
+    def __init__(self, stream, field_names, **options):
+        super().__init__(stream, field_names, **options)
+        import pyarrow.parquet as pq
+
+        self._writer = pq.ParquetWriter(
+            stream,
+            self.schema,
+            compression=self.compression or "snappy",
+            compression_level=self.compression_level,
+        )
+
+    def _write_batch(self, batch):
+        self._writer.write_table(self.pa.Table.from_batches([batch]))
+
+    def _close_writer(self):
+        self._writer.close()
+
+
+class ArrowRowSink(ArrowBatchRowSink):
+    """
+    Sink writing rows as an Arrow IPC file, one record batch per batch.
+
+    The compression can be "lz4" or "zstd" (default: uncompressed).
+    """
+
+    extension = ".arrow"
+
+    def __init__(self, stream, field_names, **options):
+        super().__init__(stream, field_names, **options)
+        compression = self.compression
+        if compression is not None and self.compression_level is not None:
+            compression = self.pa.Codec(compression, self.compression_level)
+        ipc_options = self.pa.ipc.IpcWriteOptions(compression=compression)
+        self._writer = self.pa.ipc.new_file(stream, self.schema, options=ipc_options)
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+
+    def _close_writer(self):
+        self._writer.close()
+
+
+# Output format name -> sink class
+ROW_SINKS = {
+    "csv": CsvRowSink,
+    "parquet": ParquetRowSink,
+    "arrow": ArrowRowSink,
+}
@@ -0,0 +1,350 @@
+"""
+XML parsing backends of the XML conversion.
+
+A backend turns the bytes of an XML document into rows, a row being the list of
+(tag, text) pairs of the children of a direct child of the root element. Tags
+use the "{namespace}local" notation of ElementTree and a child without text has
+None as text, so every backend produces the same rows.
+"""
+
+import xml.etree.ElementTree as ET
+import xml.parsers.expat
+from abc import ABC, abstractmethod
+
+# Backends tried, in order, when none is pinned. etree is always available,
+# so expat, which always parses incrementally and is not faster, is only
+# used when pinned
+AUTO_BACKEND_ORDER = ("lxml", "etree", "expat")
+
+
+def _iter_row_elements(events):
+    """
+    Yield the direct children of the root element from ("start", "end") events.
+
+    Each row is detached from the root once the consumer asks for the next
+    one, so only a single row is held in memory at any time.
+
+    Args:
+        events (Iterable): (event, element) pairs, as produced by iterparse.
+
+    Yields:
+        Element: The next direct child of the root element.
+    """
+    root = None
+    depth = 0
+
+    for event, element in events:
+        if event == "start":
+            if root is None:
+                root = element
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 1:
+            yield element
+            # Drop the finished row so the tree never grows
+            root.clear()
+
+
+def _pull_events(parser, blocks):
+    """
+    Feed blocks to a pull parser and yield its events.
+
+    Args:
+        parser: An ElementTree or lxml XMLPullParser.
+        blocks (Iterable): The bytes of the document.
+
+    Yields:
+        tuple: The (event, element) pairs.
+    """
+    for block in blocks:
+        parser.feed(block)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+class XmlBackend(ABC):
+    """
+    Abstract base class for the XML parsing backends.
+
+    Attributes:
+        name (str): Name used to pin the backend in the job kwargs.
+        accepts_views (bool): Whether the blocks given to iter_rows can be
+            memoryview slices instead of bytes.
+        always_streams (bool): Whether iter_rows parses incrementally even
+            when streaming is not asked for.
+    """
+
+    name = None
+    accepts_views = True
+    always_streams = False
+
+    @classmethod
+    def available(cls):
+        """
+        Check whether the libraries needed by the backend are installed.
+
+        Returns:
+            bool: True if the backend can be used.
+        """
+        return True
+
+    @abstractmethod
+    def iter_rows(self, blocks, streaming=True):
+        """
+        Parse a document and yield its rows.
+
+        Args:
+            blocks (Iterable): The bytes of the document, in blocks (bytes, or
+                memoryview slices when accepts_views is set).
+            streaming (bool): Whether to parse incrementally, holding a single
+                row in memory, instead of building the whole tree first.
+
+        Yields:
+            list: The (tag, text) pairs of the next row.
+        """
+        pass
+
+    def iter_records(self, blocks, selection):
+        """
+        Parse a document incrementally and yield the rows of the selected
+        records. No element is built: the parser events go straight to the
+        matcher of the selection.
+
+        Args:
+            blocks (Iterable): The bytes of the document, in blocks.
+            selection (RecordSelection): The record path, columns and filters.
+
+        Yields:
+            list: The (column name, value) pairs of the next selected record.
+        """
+        matcher = selection.matcher()
+        parser = ET.XMLParser(target=matcher)
+        for block in blocks:
+            parser.feed(block)
+            if matcher.rows:
+                yield from matcher.rows
+                matcher.rows.clear()
+        parser.close()
+        yield from matcher.rows
+
+
+class EtreeBackend(XmlBackend):
+    """
+    Backend using the standard library ElementTree.
+    """
+
+    name = "etree"
+
+    def iter_rows(self, blocks, streaming=True):
+        if streaming:
+            parser = ET.XMLPullParser(events=("start", "end"))
+            elements = _iter_row_elements(_pull_events(parser, blocks))
+        else:
+            parser = ET.XMLParser()
+            for block in blocks:
+                parser.feed(block)
+            elements = iter(parser.close())
+
+        for element in elements:
+            yield [(child.tag, child.text) for child in element]
+
+
+class LxmlBackend(XmlBackend):
+    """
+    Backend using lxml, whose iterparse and tree building run in C.
+    """
+
+    name = "lxml"
+
+    # lxml only parses bytes and str
+    accepts_views = False
+
+    @classmethod
+    def available(cls):
+        try:
+            import lxml.etree  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def iter_rows(self, blocks, streaming=True):
+        from lxml import etree
+
+        options = {"remove_comments": True, "remove_pis": True, "huge_tree": True}
+        if streaming:
+            parser = etree.XMLPullParser(events=("start", "end"), **options)
+            elements = _iter_row_elements(_pull_events(parser, blocks))
+        else:
+            parser = etree.XMLParser(**options)
+            for block in blocks:
+                parser.feed(block)
+            elements = iter(parser.close())
+
+        for element in elements:
+            # Unresolved entity references are nodes without a string tag
+            yield [
+                (child.tag, child.text)
+                for child in element
+                if isinstance(child.tag, str)
+            ]
+
+    def iter_records(self, blocks, selection):
+        from lxml import etree
+
+        matcher = selection.matcher()
+        parser = etree.XMLParser(target=matcher, huge_tree=True)
+        for block in blocks:
+            parser.feed(block)
+            if matcher.rows:
+                yield from matcher.rows
+                matcher.rows.clear()
+        parser.close()
+        yield from matcher.rows
+
+
+class ExpatBackend(XmlBackend):
+    """
+    Backend driving expat directly with SAX style handlers.
+
+    No element object is built: the handlers collect the text of the row
+    fields straight into the (tag, text) pairs. The document is always parsed
+    incrementally.
+    """
+
+    name = "expat"
+    always_streams = True
+
+    def iter_rows(self, blocks, streaming=True):
+        # Namespaced names are reported as "uri}local"
+        parser = xml.parsers.expat.ParserCreate(namespace_separator="}")
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+
+        rows = []
+        row = None
+        tag = None
+        depth = 0
+
+        # Character data is appended by expat itself, without a Python call;
+        # the text of a field is the data received since its start tag
+        chunks = []
+        text_start = None
+
+        def start_element(name, attributes):
+            nonlocal depth, row, tag, text_start
+            depth += 1
+            if depth == 3:
+                tag = "{" + name if "}" in name else name
+                chunks.clear()
+                text_start = 0
+            elif depth == 2:
+                row = []
+            elif text_start is not None:
+                # The text of a field ends at its first child element
+                row.append((tag, "".join(chunks) if chunks else None))
+                text_start = None
+
+        def end_element(name):
+            nonlocal depth, row, text_start
+            if depth == 3:
+                if text_start is not None:
+                    row.append((tag, "".join(chunks) if chunks else None))
+                    text_start = None
+            elif depth == 2:
+                rows.append(row)
+                row = None
+            depth -= 1
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = chunks.append
+
+        for block in blocks:
+            parser.Parse(block, False)
+            if rows:
+                yield from rows
+                rows.clear()
+        parser.Parse(b"", True)
+        yield from rows
+
+    def iter_records(self, blocks, selection):
+        parser = xml.parsers.expat.ParserCreate(namespace_separator="}")
+        parser.buffer_text = True
+        matcher = selection.matcher()
+        start, end = matcher.start, matcher.end
+
+        def start_element(name, attributes):
+            # Namespaced names are reported as "uri}local"
+            if "}" in name:
+                name = "{" + name
+            if attributes and any("}" in key for key in attributes):
+                attributes = {
+                    "{" + key if "}" in key else key: value
+                    for key, value in attributes.items()
+                }
+            start(name, attributes)
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = matcher.data
+
+        for block in blocks:
+            parser.Parse(block, False)
+            if matcher.rows:
+                yield from matcher.rows
+                matcher.rows.clear()
+        parser.Parse(b"", True)
+        yield from matcher.rows
+
+
+# Backend name -> backend class
+XML_BACKENDS = {
+    backend.name: backend for backend in (EtreeBackend, LxmlBackend, ExpatBackend)
+}
+
+# Exceptions raised by the backends on malformed documents
+PARSE_ERRORS = (ET.ParseError, xml.parsers.expat.ExpatError)
+try:
+    from lxml.etree import LxmlSyntaxError
+
+    PARSE_ERRORS += (LxmlSyntaxError,)
+except ImportError:
+    pass
+
+
+def available_backends():
+    """
+    List the backends that can be used in this environment.
+
+    Returns:
+        list: The backend names, in auto selection order.
+    """
+    return [name for name in AUTO_BACKEND_ORDER if XML_BACKENDS[name].available()]
+
+
+def get_backend(name="auto"):
+    """
+    Create an XML backend.
+
+    Args:
+        name (str): The backend name, or "auto" for the fastest available one.
+
+    Returns:
+        XmlBackend: The backend.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If the backend needs a library that is not installed.
+    """
+    if name == "auto":
+        name = available_backends()[0]
+
+    backend_class = XML_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown XML backend: {name}")
+    if not backend_class.available():
+        raise ImportError(f"The {name} XML backend requires {name} (pip install {name})")
+    return backend_class()
@@ -0,0 +1,355 @@
+"""
+Selection of the records and columns converted from an XML document.
+
+A RecordSelection is compiled from the "record_path", "columns" and "filters"
+kwargs into a tree of the element paths it needs. The XML backends drive a
+RecordMatcher with SAX style events (it follows the parser target interface
+of ElementTree and lxml), so elements outside the selected records and the
+subtrees of a record no column or filter refers to are skipped without being
+built.
+
+Paths are made of element names separated by "/". A name matches elements
+with that local name in any namespace, or a single namespace when written as
+"{uri}name". In the record path, "*" matches any element. A column or filter
+path may end with "@attribute" to select an attribute instead of the text of
+the element; attribute names match the same way as element names.
+"""
+
+# Record path used when only columns or filters are given: the children of
+# the root element, as without selection
+DEFAULT_RECORD_PATH = "*/*"
+
+# Comparison operators of the filters, longest first
+FILTER_OPERATORS = ("!=", "=")
+
+
+def _split_path(path, what):
+    """
+    Split a path into its element names.
+
+    Args:
+        path (str): The path, e.g. "address/city" or "price/@currency".
+        what (str): Description of the path for error messages.
+
+    Returns:
+        list: The steps, without empty and "." ones.
+
+    Raises:
+        ValueError: If the path is not a string, or is empty for a record path.
+    """
+    if not isinstance(path, str):
+        raise ValueError(f"Invalid {what}: {path!r}")
+    steps = [step for step in path.strip().split("/") if step and step != "."]
+    if not steps and what == "record path":
+        raise ValueError(f"Invalid {what}: {path!r}")
+    return steps
+
+
+def _local_name(tag):
+    """
+    Strip the namespace of a "{uri}name" tag.
+    """
+    return tag.rpartition("}")[2]
+
+
+def _attribute_value(attrib, name):
+    """
+    Get an attribute by name, or by local name when it has a namespace.
+    """
+    value = attrib.get(name)
+    if value is None and name[:1] != "{":
+        for key, other in attrib.items():
+            if key[:1] == "{" and _local_name(key) == name:
+                return other
+    return value
+
+
+class _PathNode:
+    """
+    Element of the record tree needed by the selection.
+
+    Attributes:
+        children (dict): Element name -> _PathNode of the needed children.
+        text_slots (list): Slots receiving the text of the element.
+        attribute_slots (dict): Attribute name -> slots receiving its value.
+    """
+
+    __slots__ = ("children", "text_slots", "attribute_slots")
+
+    def __init__(self):
+        self.children = {}
+        self.text_slots = []
+        self.attribute_slots = {}
+
+    def child(self, tag):
+        """
+        Get the node of a child element, or None when it is not needed.
+        """
+        node = self.children.get(tag)
+        if node is None and tag[:1] == "{":
+            node = self.children.get(_local_name(tag))
+        return node
+
+
+class RecordSelection:
+    """
+    Compiled record path, columns and filters of a conversion.
+
+    The values read from a record go to numbered slots: one per column,
+    followed by one per filter path that is not also a column.
+    """
+
+    def __init__(self, record_path=None, columns=None, filters=None):
+        """
+        Compile the selection.
+
+        Args:
+            record_path (str): Path from the root element (included) to the
+                record elements, e.g. "feed/entries/entry" (default: "*/*",
+                the children of the root).
+            columns (list or dict): Paths of the values to output, relative
+                to the record, e.g. ["id", "@type", "address/city"]. Column
+                names are the paths, unless given as a dict of column name to
+                path. An empty path selects the text of the record itself.
+                When None, every child element of the record is output, as
+                without selection.
+            filters (list): Conditions a record must meet to be output, as
+                "path=value", "path!=value", or "path" for a non-empty value.
+
+        Raises:
+            ValueError: If a path or filter is invalid.
+        """
+        self.record_steps = _split_path(record_path or DEFAULT_RECORD_PATH, "record path")
+        self.root = _PathNode()
+
+        if columns is None:
+            self.field_names = None
+            column_paths = []
+        elif isinstance(columns, dict):
+            self.field_names = list(columns)
+            column_paths = list(columns.values())
+        elif isinstance(columns, list) and columns:
+            self.field_names = list(columns)
+            column_paths = list(columns)
+        else:
+            raise ValueError(f"Invalid columns: {columns!r}")
+
+        # Normalized path -> slot, so filters reuse the slots of the columns
+        slots = {}
+        for slot, path in enumerate(column_paths):
+            slots.setdefault(self._add_path(path, slot, "column path"), slot)
+        self.slot_count = len(column_paths)
+
+        # (slot, operator, value) of each filter
+        self.filters = []
+        for condition in filters or []:
+            if not isinstance(condition, str):
+                raise ValueError(f"Invalid filter: {condition!r}")
+            for operator in FILTER_OPERATORS:
+                path, found, value = condition.partition(operator)
+                if found:
+                    break
+            else:
+                path, operator, value = condition, None, None
+
+            key = "/".join(_split_path(path, "filter path"))
+            slot = slots.get(key)
+            if slot is None:
+                slot = slots[key] = self.slot_count
+                self.slot_count += 1
+                self._add_path(path, slot, "filter path")
+            self.filters.append((slot, operator, value))
+
+    def _add_path(self, path, slot, what):
+        """
+        Add the path of a column or filter to the record tree.
+
+        Args:
+            path (str): The path, relative to the record.
+            slot (int): The slot receiving the value of the path.
+            what (str): Description of the path for error messages.
+
+        Returns:
+            str: The normalized path.
+
+        Raises:
+            ValueError: If the path is invalid.
+        """
+        steps = _split_path(path, what)
+        elements = list(steps)
+        attribute = None
+        if elements and elements[-1].startswith("@"):
+            attribute = elements.pop()[1:]
+            if not attribute:
+                raise ValueError(f"Invalid {what}: {path!r}")
+        if any(step.startswith("@") or step == "*" for step in elements):
+            raise ValueError(f"Invalid {what}: {path!r}")
+
+        node = self.root
+        for step in elements:
+            node = node.children.setdefault(step, _PathNode())
+        if attribute is None:
+            node.text_slots.append(slot)
+        else:
+            node.attribute_slots.setdefault(attribute, []).append(slot)
+        return "/".join(steps)
+
+    def matcher(self):
+        """
+        Create the parser target collecting the rows of one document.
+
+        Returns:
+            RecordMatcher: The matcher.
+        """
+        return RecordMatcher(self)
+
+    def accepts(self, values):
+        """
+        Check the filters against the values of a record.
+
+        Args:
+            values (list): The slot values of the record.
+
+        Returns:
+            bool: True if the record is output.
+        """
+        for slot, operator, expected in self.filters:
+            value = values[slot]
+            if operator is None:
+                if not value:
+                    return False
+            elif (value == expected) != (operator == "="):
+                return False
+        return True
+
+
+class RecordMatcher:
+    """
+    Parser target turning the events of a document into the selected rows.
+
+    The rows are the (column name, value) pairs of each selected record, or
+    the (tag, text) pairs of its children when no columns are selected. They
+    are collected in the rows list, which the caller empties after feeding
+    each block.
+    """
+
+    def __init__(self, selection):
+        """
+        Initialize the matcher.
+
+        Args:
+            selection (RecordSelection): The compiled selection.
+        """
+        self.selection = selection
+        self.rows = []
+
+        # Depth of the current element (the root is 1), and of the element
+        # whose subtree is skipped
+        self._depth = 0
+        self._skip_depth = None
+
+        # Depth of the current record, its slot values, child fields and the
+        # nodes of the open elements inside it
+        self._record_depth = None
+        self._values = None
+        self._fields = None
+        self._nodes = []
+
+        # Text being collected: the slots and child field it goes to
+        self._text_slots = None
+        self._text_field = None
+        self._chunks = []
+
+    def start(self, tag, attrib):
+        self._depth += 1
+        if self._skip_depth is not None:
+            return
+        if self._text_slots is not None:
+            # The text of an element ends at its first child
+            self._end_text()
+
+        selection = self.selection
+        if self._record_depth is None:
+            step = selection.record_steps[self._depth - 1]
+            if step != "*" and step != tag and step != _local_name(tag):
+                self._skip_depth = self._depth
+            elif self._depth == len(selection.record_steps):
+                self._start_record(attrib)
+            return
+
+        parent = self._nodes[-1]
+        node = parent.child(tag) if parent is not None else None
+        child_field = (
+            selection.field_names is None and self._depth == self._record_depth + 1
+        )
+        if node is None and not child_field:
+            self._skip_depth = self._depth
+            return
+
+        self._nodes.append(node)
+        if node is not None:
+            for name, slots in node.attribute_slots.items():
+                value = _attribute_value(attrib, name)
+                for slot in slots:
+                    self._values[slot] = value
+        if child_field or (node is not None and node.text_slots):
+            self._text_slots = node.text_slots if node is not None else ()
+            self._text_field = tag if child_field else None
+
+    def _start_record(self, attrib):
+        self._record_depth = self._depth
+        self._values = [None] * self.selection.slot_count
+        self._fields = [] if self.selection.field_names is None else None
+        root = self.selection.root
+        self._nodes = [root]
+        for name, slots in root.attribute_slots.items():
+            value = _attribute_value(attrib, name)
+            for slot in slots:
+                self._values[slot] = value
+        if root.text_slots:
+            self._text_slots = root.text_slots
+            self._text_field = None
+
+    def data(self, text):
+        if self._text_slots is not None:
+            self._chunks.append(text)
+
+    def _end_text(self):
+        text = "".join(self._chunks) if self._chunks else None
+        self._chunks.clear()
+        for slot in self._text_slots:
+            self._values[slot] = text
+        if self._text_field is not None:
+            self._fields.append((self._text_field, text))
+        self._text_slots = None
+        self._text_field = None
+
+    def end(self, tag):
+        depth = self._depth
+        self._depth -= 1
+        if self._skip_depth is not None:
+            if self._skip_depth == depth:
+                self._skip_depth = None
+            return
+        if self._record_depth is None:
+            return
+
+        if self._text_slots is not None:
+            self._end_text()
+        if depth > self._record_depth:
+            self._nodes.pop()
+            return
+
+        # End of the record
+        self._record_depth = None
+        selection = self.selection
+        values = self._values
+        if selection.filters and not selection.accepts(values):
+            return
+        if selection.field_names is None:
+            self.rows.append(self._fields)
+        else:
+            self.rows.append(list(zip(selection.field_names, values)))
+
+    def close(self):
+        return None
@@ -2,18 +2,450 @@
 Parser for converting XML files to CSV format.
 """
 
-import csv
+import contextlib
+import functools
+import itertools
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
 import xml.etree.ElementTree as ET
+import xml.parsers.expat
+from concurrent.futures import ProcessPoolExecutor
 
 from parsers.base_parser import BaseParser
-from utils.path_utils import get_filename_from_path
+from parsers.row_sinks import DEFAULT_BATCH_SIZE, ROW_SINKS, CsvRowSink
+from parsers.xml_backends import PARSE_ERRORS, get_backend
+from parsers.xml_selection import DEFAULT_RECORD_PATH, RecordSelection
+from utils.logger import init_worker_logging
+from utils.mapped_file import MappedFile
+
+# Size of the blocks scanned for the first row and of the parts copies
+SHARD_READ_SIZE = 1024 * 1024
+
+# Size of the blocks fed to the XML backends. Small blocks keep the data
+# produced between two reads in the CPU caches, as iterparse does.
+XML_FEED_SIZE = 16 * 1024
+
+# Smallest byte range converted in its own process (16 MiB)
+DEFAULT_MIN_SHARD_SIZE = 16 * 1024 * 1024
+
+# Rows converted between two checks of the checkpoint interval
+CHECKPOINT_CHECK_ROWS = 4096
+
+# Number of rows pickled together in the spill file of the union schema mode
+SPILL_BATCH_SIZE = 1024
+
+# Ways of determining the output columns
+SCHEMA_MODES = ("first_row", "union")
+
+# Peak memory of a conversion per byte of XML when the whole element tree is
+# built (about 8.7 with ElementTree)
+TREE_MEMORY_RATIO = 8
+
+# Peak memory of an incremental conversion, rows buffered for the output
+# included (64 MiB)
+STREAMING_MEMORY_ESTIMATE = 64 * 1024 * 1024
+
+# Kwargs selecting the records and columns converted
+SELECTION_KWARGS = ("record_path", "columns", "filters")
+
+# Bytes that can follow the element name in a start tag
+_TAG_NAME_END = b" \t\r\n/>"
+
+# Whitespace bytes of XML
+_XML_WHITESPACE = b" \t\r\n"
+
+# Markup that can follow the root element: comments and processing
+# instructions, as (opening, closing) delimiters
+_TRAILING_MARKUP = ((b"<!--", b"-->"), (b"<?", b"?>"))
+
+
+class _RowFound(Exception):
+    """
+    Raised by the expat handlers to stop scanning at the first row.
+    """
+
+
+def _scan_first_row(mapped):
+    """
+    Locate the start tag of the first row element of an XML file.
+
+    Args:
+        mapped (MappedFile): The XML file.
+
+    Returns:
+        tuple: The byte offset of the start tag, the raw (prefixed) element
+            name and the raw name of the root element, both as bytes, or None
+            when the root element has no children.
+    """
+    parser = xml.parsers.expat.ParserCreate()
+    depth = 0
+    root_name = None
+
+    def start_element(name, attributes):
+        nonlocal depth, root_name
+        depth += 1
+        if depth == 1:
+            root_name = name.encode("utf-8")
+        elif depth == 2:
+            raise _RowFound(parser.CurrentByteIndex, name.encode("utf-8"), root_name)
+
+    def end_element(name):
+        nonlocal depth
+        depth -= 1
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+
+    try:
+        for block in mapped.iter_views(0, None, SHARD_READ_SIZE):
+            parser.Parse(block, False)
+        parser.Parse(b"", True)
+    except _RowFound as found:
+        return found.args
+    return None
+
+
+def _find_rows_end(mapped, root_name):
+    """
+    Locate the closing tag of the root element, which ends the last row.
+
+    The file is scanned backwards past the whitespace, comments and
+    processing instructions following the root element.
+
+    Args:
+        mapped (MappedFile): The XML file.
+        root_name (bytes): The raw name of the root element.
+
+    Returns:
+        int: The byte offset of the closing tag.
+
+    Raises:
+        ET.ParseError: If the file does not end with the closing root tag.
+    """
+    end = mapped.size
+    while True:
+        while end > 0 and mapped.byte_at(end - 1) in _XML_WHITESPACE:
+            end -= 1
+        for opening, closing in _TRAILING_MARKUP:
+            start = end - len(closing)
+            if start >= 0 and mapped.find(closing, start, end) == start:
+                end = mapped.rfind(opening, 0, start)
+                if end == -1:
+                    raise ET.ParseError(f"Unterminated markup in {mapped.name}")
+                break
+        else:
+            break
+
+    # The closing tag is "</name" followed by optional whitespace and ">"
+    index = mapped.rfind(b"</" + root_name, 0, end)
+    name_end = index + 2 + len(root_name)
+    if (
+        index == -1
+        or mapped.byte_at(end - 1) != ord(">")
+        or any(
+            mapped.byte_at(offset) not in _XML_WHITESPACE
+            for offset in range(name_end, end - 1)
+        )
+    ):
+        raise ET.ParseError(f"No closing root tag in {mapped.name}")
+    return index
+
+
+def _find_row_start(mapped, offset, limit, name):
+    """
+    Find the first row start tag at or after a byte offset.
+
+    The search runs over the memory map, so no block is copied.
+
+    Args:
+        mapped (MappedFile): The XML file.
+        offset (int): Where the search starts.
+        limit (int): Where the search stops (the end of the rows).
+        name (bytes): The raw name of the row elements.
+
+    Returns:
+        int: The offset of the start tag, or limit when there is none.
+    """
+    pattern = b"<" + name
+    index = mapped.find(pattern, offset, limit)
+    while index != -1:
+        after = index + len(pattern)
+        if after < limit and mapped.byte_at(after) in _TAG_NAME_END:
+            return index
+        index = mapped.find(pattern, index + 1, limit)
+    return limit
+
+
+def _convert_shard(
+    path,
+    rows_start,
+    rows_end,
+    start,
+    end,
+    field_names,
+    part_path,
+    sink_options,
+    backend_name,
+):
+    """
+    Convert the rows of a byte range of an XML file into a CSV part without
+    header. Executed in a worker process.
+
+    The range is parsed as a document made of the file prolog (everything
+    before the first row, including namespace declarations), the rows of the
+    range and the closing tag of the root.
+
+    Args:
+        path (str): The XML file.
+        rows_start (int): Offset of the first row of the file.
+        rows_end (int): Offset of the closing tag of the root.
+        start (int): Offset of the first row of the shard.
+        end (int): Offset where the rows of the shard end.
+        field_names (list): The CSV columns.
+        part_path (str): The CSV part to write.
+        sink_options (dict): Options of the CsvRowSink writing the part. A
+            compressed part is made of complete compressed blocks, so the
+            parts can be concatenated as they are.
+        backend_name (str): The XML backend parsing the range.
+
+    Returns:
+        tuple: The number of rows written and the CPU time spent.
+    """
+    start_cpu = time.process_time()
+    backend = get_backend(backend_name)
+
+    def blocks(source):
+        for byte_range in ((0, rows_start), (start, end), (rows_end, None)):
+            for view in source.iter_views(*byte_range, XML_FEED_SIZE):
+                yield view if backend.accepts_views else view.tobytes()
+
+    rows = 0
+    with MappedFile(path) as source, open(part_path, "wb") as part:
+        with CsvRowSink(part, field_names, write_header=False, **sink_options) as sink:
+            for fields in backend.iter_rows(blocks(source)):
+                sink.write_fields(fields)
+                rows += 1
+
+    return rows, time.process_time() - start_cpu
 
 
 class XmlToCsvParser(BaseParser):
     """
     Parser for converting XML files to CSV format.
+
+    Supported kwargs:
+        streaming (bool): Parse the XML incrementally instead of building the
+            whole tree in memory (default: False). The expat backend always
+            parses incrementally.
+        xml_backend (str): "lxml", "etree" (the standard library
+            ElementTree) or "expat". The default, "auto", picks lxml when
+            available and etree otherwise; lxml requires the lxml package.
+        output_format (str): "csv" (default), "parquet" or "arrow". The
+            columnar formats require pyarrow.
+        batch_size (int): Rows per Parquet row group or Arrow record batch
+            (default: 65536).
+        compression (str): Codec of the output: "gzip", "bz2" or "zstd" for
+            CSV (zstd requires zstandard), e.g. "snappy" (default), "gzip" or
+            "zstd" for Parquet, and "lz4" or "zstd" for Arrow. Compressed CSV
+            files take the extension of the codec (".csv.gz", ...).
+        compression_level (int): Level of the codec (default: codec default).
+        compression_threads (int): Threads compressing the CSV output in
+            blocks while rows are produced (default: 1; 0 compresses on the
+            parsing thread).
+        schema (str): "first_row" (default) takes the columns from the first
+            row and fails on rows with other fields. "union" outputs every
+            field seen in any row, in order of first appearance; rows are
+            spilled to a temporary file during the single pass over the input
+            and rewritten once behind the full header.
+        shard_workers (int): Number of processes converting byte ranges of the
+            file in parallel (default: 1). Requires a local origin, CSV
+            output and the "first_row" schema; the row elements must not
+            contain elements of the same name, nor comments or CDATA sections
+            holding their start tag.
+        min_shard_size (int): Smallest byte range converted by its own process
+            (default: 16 MiB).
+        checkpoint (bool): Periodically save the number of rows converted and
+            the matching output size next to the output (default: False). A
+            conversion restarted after a crash truncates the output to the
+            saved size and continues after the saved rows, which are parsed
+            again but not rewritten. Requires a local origin and destiny, CSV
+            output and the "first_row" schema, and disables sharding.
+        checkpoint_interval (float): Seconds between two checkpoints
+            (default: 30).
+        mmap (bool): Memory-map local origins of 1 MiB or more instead of
+            reading them through a buffered file (default: False).
+        record_path (str): Path of the record elements from the root element,
+            e.g. "feed/entries/entry", where "*" matches any element (default:
+            the children of the root).
+        columns (list or dict): Paths of the values to output, relative to
+            the record, e.g. ["id", "@type", "address/city"], or a dict of
+            column name to path (default: every child of the record).
+        filters (list): Conditions the records must meet, as "path=value",
+            "path!=value" or "path" (non-empty value). With any of
+            record_path, columns or filters, the XML is parsed incrementally,
+            the elements no path refers to are skipped without being built,
+            and sharding is disabled.
     """
 
+    cpu_bound = True
+
+    # Whether rows are parsed incrementally when the "streaming" kwarg is unset
+    streaming_default = False
+
+    # XML backend, selected when the conversion starts
+    backend = None
+
+    # Compiled record_path, columns and filters, or None to convert every
+    # child of the root
+    selection = None
+
+    @property
+    def streaming(self):
+        """
+        bool: Whether the XML is parsed incrementally.
+        """
+        return bool(self.kwargs.get("streaming", self.streaming_default))
+
+    @classmethod
+    def shared_read_key(cls, kwargs):
+        """
+        Jobs converting the whole XML with the columns of its first row share
+        the read when they use the same XML backend. Their outputs can differ
+        in destiny, format and compression.
+        """
+        if (
+            kwargs.get("schema", "first_row") != "first_row"
+            or kwargs.get("checkpoint")
+            or int(kwargs.get("shard_workers", 1)) > 1
+        ):
+            return None
+        return json.dumps(
+            [kwargs.get("xml_backend", "auto")]
+            + [kwargs.get(name) for name in SELECTION_KWARGS],
+            sort_keys=True,
+            default=str,
+        )
+
+    @classmethod
+    def estimate_memory(cls, input_size, kwargs):
+        """
+        The element tree of the whole XML is built unless it is parsed
+        incrementally, in which case the memory is bounded by the rows
+        buffered for the output.
+        """
+        if kwargs.get("streaming", cls.streaming_default) or any(
+            kwargs.get(name) is not None for name in SELECTION_KWARGS
+        ):
+            return min(input_size, STREAMING_MEMORY_ESTIMATE)
+        return input_size * TREE_MEMORY_RATIO
+
+    @classmethod
+    def parse_shared(cls, parsers):
+        """
+        Parse the XML once and write its rows to the output of every parser.
+
+        The XML is parsed incrementally if any of the parsers asks for it. A
+        parser with invalid options, or whose output cannot be opened, fails
+        on its own, while a parse or write error fails every parser sharing
+        the read.
+        """
+        results = [False] * len(parsers)
+        conversions = []
+        for index, parser in enumerate(parsers):
+            if not parser.validate_input():
+                continue
+            parser.ensure_output_directory()
+            sink_class = parser._prepare_conversion(
+                parser.kwargs.get("output_format", "csv")
+            )
+            if sink_class is not None:
+                conversions.append((index, parser, sink_class))
+        if not conversions:
+            return results
+
+        reader = conversions[0][1]
+        streaming = any(parser.streaming for _, parser, _ in conversions)
+        reader.logger.info(
+            "Starting XML conversion from %s to %d outputs with a single read "
+            "(backend: %s, streaming: %s)",
+            reader.origin,
+            len(conversions),
+            reader.backend.name,
+            reader._parses_incrementally(streaming),
+        )
+
+        try:
+            rows_fields = reader._iter_rows(reader.open_input, streaming)
+            first_fields = next(rows_fields, None)
+            if first_fields is not None:
+                field_names = [tag for tag, _ in first_fields]
+                rows_fields = itertools.chain([first_fields], rows_fields)
+            elif reader.selection is not None and reader.selection.field_names:
+                # The jobs sharing the read select the same columns
+                field_names = reader.selection.field_names
+            else:
+                for _, parser, _ in conversions:
+                    parser.logger.warning("XML file has %s", parser._no_rows_reason())
+                return results
+
+            output_stem = reader.input_name.rsplit(".", 1)[0]
+            with contextlib.ExitStack() as stack:
+                sinks = []
+                opened = []
+                for index, parser, sink_class in conversions:
+                    output_filename = output_stem + sink_class.output_extension(
+                        parser.kwargs.get("compression")
+                    )
+                    try:
+                        # A sink failing to open removes its own output only
+                        with contextlib.ExitStack() as job_stack:
+                            output = job_stack.enter_context(
+                                parser.open_output(output_filename)
+                            )
+                            sink = job_stack.enter_context(
+                                parser._open_sink(sink_class, output, field_names)
+                            )
+                            stack.enter_context(job_stack.pop_all())
+                    except Exception as e:
+                        parser.logger.error(
+                            "Could not open the output of %s: %s", parser.origin, str(e)
+                        )
+                        continue
+                    sinks.append(sink)
+                    opened.append((index, parser, output_filename))
+                if not opened:
+                    return results
+
+                rows = 0
+                for fields in rows_fields:
+                    for sink in sinks:
+                        sink.write_fields(fields)
+                    rows += 1
+
+        except PARSE_ERRORS:
+            for _, parser, _ in conversions:
+                parser.logger.error("Failed to parse XML file %s", parser.origin)
+            return results
+        except Exception as e:
+            for _, parser, _ in conversions:
+                parser.logger.error(
+                    "Error during shared XML conversion of %s: %s", parser.origin, str(e)
+                )
+            return results
+
+        for index, parser, output_filename in opened:
+            parser.metrics.add("rows_emitted", rows)
+            parser.logger.info(
+                "XML conversion completed successfully to %s",
+                parser.output_location(output_filename),
+            )
+            results[index] = True
+        return results
+
     def parse(self):
         """
         Convert an XML file to CSV format.
@@ -30,52 +462,542 @@ class XmlToCsvParser(BaseParser):
             return False
 
         # Ensure output directory exists
-        output_dir = self.ensure_output_directory()
+        self.ensure_output_directory()
+
+        output_format = self.kwargs.get("output_format", "csv")
+        sink_class = self._prepare_conversion(output_format)
+        if sink_class is None:
+            return False
 
         try:
             self.logger.info(
-                "Starting XML to CSV conversion from %s", self.local_origin
+                "Starting XML to %s conversion from %s (backend: %s, streaming: %s)",
+                output_format,
+                self.origin,
+                self.backend.name,
+                self._parses_incrementally(self.streaming),
             )
 
-            # Parse XML
-            tree = ET.parse(self.local_origin)
-            root = tree.getroot()
-
-            # Get the first child element to determine column names
-            if len(root) == 0:
-                self.logger.warning("XML file has no child elements under root")
+            # Determine output filename (replace .xml extension with the format's)
+            output_stem = self.input_name.rsplit(".", 1)[0]
+            if int(self.kwargs.get("shard_workers", 1)) > 1 and self._can_shard(
+                output_format
+            ):
+                output_filename = self._convert_sharded(output_stem)
+            else:
+                output_filename = self._convert(
+                    self.open_input, output_stem, sink_class
+                )
+            if output_filename is None:
+                self.logger.warning("XML file has %s", self._no_rows_reason())
                 return False
 
-            # Determine output filename (replace .xml extension with .csv)
-            input_filename = get_filename_from_path(self.local_origin)
-            output_filename = input_filename.rsplit(".", 1)[0] + ".csv"
-            output_path = output_dir / output_filename
-
-            # Extract field names from the first child element
-            first_element = root[0]
-            field_names = [child.tag for child in first_element]
-
-            # Open CSV file for writing
-            with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=field_names)
-                writer.writeheader()
-
-                # Process all child elements
-                for element in root:
-                    row = {child.tag: child.text for child in element}
-                    writer.writerow(row)
-
             self.logger.info(
-                "XML to CSV conversion completed successfully to %s", output_path
+                "XML to %s conversion completed successfully to %s",
+                output_format,
+                self.output_location(output_filename),
             )
             return True
 
-        except ET.ParseError:
-            self.logger.error("Failed to parse XML file %s", self.local_origin)
+        except PARSE_ERRORS:
+            self.logger.error("Failed to parse XML file %s", self.origin)
             return False
         except (IOError, PermissionError) as e:
             self.logger.error("File I/O error: %s", str(e))
             return False
+        except ImportError as e:
+            self.logger.error(str(e))
+            return False
         except Exception as e:
             self.logger.error("Error during XML to CSV conversion: %s", str(e))
             return False
+
+    def _convert(self, open_source, output_stem, sink_class):
+        """
+        Convert one XML document into one output file.
+
+        Args:
+            open_source (callable): Returns a readable binary stream over the XML.
+            output_stem (str): Path of the output relative to the destiny,
+                without extension.
+            sink_class (type): The RowSink writing the output.
+
+        Returns:
+            str: Relative path of the written output, or None when the XML has
+                no rows and nothing was written. Selected columns are written
+                as a header-only output when no record is selected.
+        """
+        # Iterate over the rows (direct children of the root)
+        rows_fields = self._iter_rows(open_source)
+
+        # Get the first row to determine column names
+        first_fields = next(rows_fields, None)
+        if first_fields is None and (
+            self.selection is None or not self.selection.field_names
+        ):
+            return None
+
+        output_filename = output_stem + sink_class.output_extension(
+            self.kwargs.get("compression")
+        )
+
+        if first_fields is None:
+            with self.open_output(output_filename) as output:
+                self._open_sink(sink_class, output, self.selection.field_names).close()
+            self.logger.info("No record of %s is selected", self.origin)
+            self.metrics.add("rows_emitted", 0)
+            return output_filename
+
+        # Only CSV written with the columns of the first row can be resumed
+        schema = self.kwargs.get("schema", "first_row")
+        checkpoint = None
+        if self.kwargs.get("checkpoint"):
+            if sink_class.resumable and schema == "first_row":
+                checkpoint = self.open_checkpoint(output_filename)
+            else:
+                self.logger.info(
+                    "Checkpoints require CSV output and the first_row schema, "
+                    "%s will not be resumable",
+                    self.origin,
+                )
+
+        if schema == "union":
+            rows = self._write_union(
+                itertools.chain([first_fields], rows_fields), output_filename, sink_class
+            )
+            self.metrics.add("rows_emitted", rows)
+            return output_filename
+
+        if checkpoint is not None:
+            rows = self._write_checkpointed(
+                first_fields, rows_fields, output_filename, sink_class, checkpoint
+            )
+            self.metrics.add("rows_emitted", rows)
+            return output_filename
+
+        # Extract field names from the first row
+        field_names = [tag for tag, _ in first_fields]
+
+        # Open output file for writing
+        with self.open_output(output_filename) as output:
+            with self._open_sink(sink_class, output, field_names) as sink:
+                sink.write_fields(first_fields)
+                rows = 1
+
+                # Process the remaining rows
+                for fields in rows_fields:
+                    sink.write_fields(fields)
+                    rows += 1
+
+        self.metrics.add("rows_emitted", rows)
+        return output_filename
+
+    def _write_checkpointed(
+        self, first_fields, rows_fields, output_filename, sink_class, checkpoint
+    ):
+        """
+        Write rows with the columns of the first row, saving checkpoints and
+        resuming from the last one.
+
+        A checkpoint records the number of rows written and the size of the
+        output once they are flushed. When resuming, the output is truncated
+        to that size and the rows already written are skipped.
+
+        Args:
+            first_fields (list): The (tag, text) pairs of the first row.
+            rows_fields (Iterator[list]): The (tag, text) pairs of the other rows.
+            output_filename (str): Path of the output relative to the destiny.
+            sink_class (type): The resumable RowSink writing the output.
+            checkpoint (Checkpoint): The checkpoint of the output.
+
+        Returns:
+            int: The number of rows of the output.
+        """
+        field_names = [tag for tag, _ in first_fields]
+        location = self.output_location(output_filename)
+
+        state = checkpoint.load()
+        if state is not None and (
+            state.get("field_names") != field_names
+            or not location.exists()
+            or location.stat().st_size < state["output_bytes"]
+        ):
+            self.logger.warning(
+                "Ignoring the checkpoint of %s, which does not match the output",
+                location,
+            )
+            state = None
+
+        if state is None:
+            # Kept at its path on failure, for the next run to resume
+            output = self.open_output(output_filename, in_place=True)
+            sink = self._open_sink(sink_class, output, field_names)
+            sink.write_fields(first_fields)
+            rows = 1
+        else:
+            rows = state["rows"]
+            self.logger.info(
+                "Resuming conversion of %s after row %d (%d bytes of output)",
+                self.origin,
+                rows,
+                state["output_bytes"],
+            )
+            # The first row is already consumed
+            for _ in itertools.islice(rows_fields, rows - 1):
+                pass
+            output = self.open_output(output_filename, offset=state["output_bytes"])
+            sink = self._open_sink(sink_class, output, field_names, write_header=False)
+
+        with output, sink:
+            while True:
+                written = 0
+                for fields in itertools.islice(rows_fields, CHECKPOINT_CHECK_ROWS):
+                    sink.write_fields(fields)
+                    written += 1
+                rows += written
+                if written < CHECKPOINT_CHECK_ROWS:
+                    break
+
+                if checkpoint.due():
+                    sink.flush()
+                    output.flush()
+                    os.fsync(output.fileno())
+                    checkpoint.save(
+                        {
+                            "rows": rows,
+                            "output_bytes": output.tell(),
+                            "field_names": field_names,
+                        }
+                    )
+
+        checkpoint.clear()
+        return rows
+
+    def _write_union(self, rows_fields, output_filename, sink_class):
+        """
+        Write rows with the union of the fields of every row as columns.
+
+        Rows are spilled, as lists of values in order of first appearance of
+        their fields, to a temporary file while the input is read. The output
+        is then written in one sequential pass over the spill file, once the
+        full header is known.
+
+        Args:
+            rows_fields (Iterator[list]): The (tag, text) pairs of each row.
+            output_filename (str): Path of the output relative to the destiny.
+            sink_class (type): The RowSink writing the output.
+
+        Returns:
+            int: The number of rows written.
+        """
+        field_names = []
+        positions = {}
+        rows = 0
+        first_row_fields = 0
+
+        with tempfile.TemporaryFile(prefix="xml-spill-") as spill:
+            batch = []
+            for fields in rows_fields:
+                values = [None] * len(field_names)
+                for tag, text in fields:
+                    position = positions.get(tag)
+                    if position is None:
+                        position = positions[tag] = len(field_names)
+                        field_names.append(tag)
+                        values.append(None)
+                    values[position] = text
+                batch.append(values)
+                rows += 1
+                if rows == 1:
+                    first_row_fields = len(field_names)
+
+                if len(batch) >= SPILL_BATCH_SIZE:
+                    pickle.dump(batch, spill, pickle.HIGHEST_PROTOCOL)
+                    batch = []
+            if batch:
+                pickle.dump(batch, spill, pickle.HIGHEST_PROTOCOL)
+
+            if len(field_names) > first_row_fields:
+                self.logger.info(
+                    "Rows of %s have %d fields, %d more than the first row",
+                    self.origin,
+                    len(field_names),
+                    len(field_names) - first_row_fields,
+                )
+
+            spill.seek(0)
+            with self.open_output(output_filename) as output:
+                with self._open_sink(sink_class, output, field_names) as sink:
+                    while True:
+                        try:
+                            batch = pickle.load(spill)
+                        except EOFError:
+                            break
+                        for values in batch:
+                            # Shorter rows lack the fields that appeared later
+                            sink.write_fields(zip(field_names, values))
+
+        return rows
+
+    def _sink_options(self):
+        """
+        Get the options of the sinks from the kwargs.
+
+        Returns:
+            dict: Keyword arguments of the RowSink classes.
+        """
+        level = self.kwargs.get("compression_level")
+        return {
+            "batch_size": int(self.kwargs.get("batch_size", DEFAULT_BATCH_SIZE)),
+            "compression": self.kwargs.get("compression"),
+            "compression_level": None if level is None else int(level),
+            "compression_threads": int(self.kwargs.get("compression_threads", 1)),
+        }
+
+    def _open_sink(self, sink_class, output, field_names, **options):
+        """
+        Create the sink writing the rows, configured from the kwargs.
+
+        Args:
+            sink_class (type): The RowSink class.
+            output (io.IOBase): The binary output stream.
+            field_names (list): The output columns.
+            **options: Additional sink options, e.g. write_header for CSV.
+
+        Returns:
+            RowSink: The sink.
+        """
+        return sink_class(output, field_names, **self._sink_options(), **options)
+
+    def _prepare_conversion(self, output_format):
+        """
+        Check the conversion options, select the XML backend and get the sink
+        class of the output format.
+
+        Args:
+            output_format (str): The selected output format.
+
+        Returns:
+            type: The RowSink class, or None when the options are invalid.
+        """
+        try:
+            self.backend = get_backend(self.kwargs.get("xml_backend", "auto"))
+            if any(self.kwargs.get(name) is not None for name in SELECTION_KWARGS):
+                self.selection = RecordSelection(
+                    *(self.kwargs.get(name) for name in SELECTION_KWARGS)
+                )
+        except (ValueError, ImportError) as e:
+            self.logger.error(str(e))
+            return None
+
+        schema = self.kwargs.get("schema", "first_row")
+        if schema not in SCHEMA_MODES:
+            self.logger.error("Unsupported schema mode: %s", schema)
+            return None
+
+        sink_class = ROW_SINKS.get(output_format)
+        if sink_class is None:
+            self.logger.error("Unsupported output format: %s", output_format)
+            return None
+
+        try:
+            sink_class.check_options(self.kwargs.get("compression"))
+        except (ValueError, ImportError) as e:
+            self.logger.error(str(e))
+            return None
+        return sink_class
+
+    def _can_shard(self, output_format):
+        """
+        Check whether the sharded conversion can be used.
+
+        Args:
+            output_format (str): The selected output format.
+
+        Returns:
+            bool: True if the origin is a local file, the output is CSV, the
+                columns come from the first row and checkpoints are disabled.
+        """
+        if (
+            self.local_origin is None
+            or output_format != "csv"
+            or self.kwargs.get("schema", "first_row") != "first_row"
+        ):
+            self.logger.info(
+                "Sharding requires a local origin, CSV output and the first_row "
+                "schema, converting %s sequentially",
+                self.origin,
+            )
+            return False
+        if self.kwargs.get("checkpoint"):
+            self.logger.info(
+                "Checkpoints are saved by the sequential conversion, converting "
+                "%s sequentially",
+                self.origin,
+            )
+            return False
+        if self.selection is not None:
+            self.logger.info(
+                "Shards are split on the children of the root, converting the "
+                "selected records of %s sequentially",
+                self.origin,
+            )
+            return False
+        return True
+
+    def _convert_sharded(self, output_stem):
+        """
+        Convert the XML file in parallel byte ranges aligned on row boundaries.
+
+        Each range is converted to a CSV part by a worker process, then the
+        parts are concatenated in order after a single header. The output is
+        identical to the sequential conversion.
+
+        Args:
+            output_stem (str): Path of the output relative to the destiny,
+                without extension.
+
+        Returns:
+            str: Relative path of the written output, or None when the XML has
+                no rows and nothing was written.
+        """
+        path = self.local_origin
+        size = path.stat().st_size
+        workers = int(self.kwargs.get("shard_workers", 1))
+        min_shard_size = int(self.kwargs.get("min_shard_size", DEFAULT_MIN_SHARD_SIZE))
+
+        shards = min(workers, size // max(min_shard_size, 1))
+        if shards < 2:
+            return self._convert(self.open_input, output_stem, CsvRowSink)
+
+        with MappedFile(path) as mapped:
+            first_row = _scan_first_row(mapped)
+            if first_row is None:
+                return None
+            rows_start, row_name, root_name = first_row
+            rows_end = _find_rows_end(mapped, root_name)
+
+            # Split the rows at the first row start tag after evenly spaced
+            # offsets
+            step = (rows_end - rows_start) // shards
+            boundaries = sorted(
+                {rows_start, rows_end}
+                | {
+                    _find_row_start(mapped, rows_start + i * step, rows_end, row_name)
+                    for i in range(1, shards)
+                }
+            )
+        ranges = list(zip(boundaries, boundaries[1:]))
+
+        # Field names of the first row
+        rows_fields = self._iter_rows(self.open_input)
+        field_names = [tag for tag, _ in next(rows_fields)]
+        rows_fields.close()
+
+        self.logger.info(
+            "Converting %s in %d shards of about %d bytes",
+            self.origin,
+            len(ranges),
+            step,
+        )
+
+        # The worker processes already compress in parallel
+        sink_options = dict(self._sink_options(), compression_threads=0)
+
+        output_filename = output_stem + CsvRowSink.output_extension(
+            sink_options["compression"]
+        )
+        with tempfile.TemporaryDirectory(prefix="xml-shards-") as parts_dir:
+            part_paths = [
+                os.path.join(parts_dir, f"part-{index:05d}.csv")
+                for index in range(len(ranges))
+            ]
+            with ProcessPoolExecutor(
+                max_workers=len(ranges), initializer=init_worker_logging
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _convert_shard,
+                        str(path),
+                        rows_start,
+                        rows_end,
+                        start,
+                        end,
+                        field_names,
+                        part_path,
+                        sink_options,
+                        self.backend.name,
+                    )
+                    for (start, end), part_path in zip(ranges, part_paths)
+                ]
+                results = [future.result() for future in futures]
+
+            with self.open_output(output_filename) as output:
+                # Header only, the rows come from the parts
+                CsvRowSink(output, field_names, **sink_options).close()
+                for part_path in part_paths:
+                    with open(part_path, "rb") as part:
+                        shutil.copyfileobj(part, output, SHARD_READ_SIZE)
+
+        # Worker processes are not seen by the counters of this process
+        prolog_size = rows_start + size - rows_end
+        self.metrics.add(
+            "bytes_read", sum(end - start + prolog_size for start, end in ranges)
+        )
+        self.metrics.add("cpu_time_s", sum(cpu for _, cpu in results))
+        self.metrics.add("rows_emitted", sum(rows for rows, _ in results))
+        return output_filename
+
+    def _no_rows_reason(self):
+        """
+        Describe why the XML converted to no rows, for the logs.
+
+        Returns:
+            str: The reason, e.g. "no child elements under root".
+        """
+        if self.selection is None:
+            return "no child elements under root"
+        return "no record matching the record path {} and filters {}".format(
+            self.kwargs.get("record_path") or DEFAULT_RECORD_PATH,
+            self.kwargs.get("filters") or [],
+        )
+
+    def _parses_incrementally(self, streaming):
+        """
+        Tell whether the XML is actually parsed incrementally: selected
+        records and some backends are never parsed into a whole tree.
+
+        Args:
+            streaming (bool): Whether incremental parsing was asked for.
+
+        Returns:
+            bool: True if no tree of the whole XML is built.
+        """
+        return bool(
+            streaming or self.selection is not None or self.backend.always_streams
+        )
+
+    def _iter_rows(self, open_source, streaming=None):
+        """
+        Parse the XML with the selected backend and yield its rows.
+
+        Args:
+            open_source (callable): Returns a readable binary stream over the XML.
+            streaming (bool): Whether to parse incrementally (default: the
+                streaming property).
+
+        Yields:
+            list: The (tag, text) pairs of the children of the next row.
+        """
+        with open_source() as source:
+            # Memory-mapped inputs are fed as slices of the map, without copies
+            read = source.read
+            if self.backend.accepts_views and isinstance(source, MappedFile):
+                read = source.read_view
+            blocks = iter(functools.partial(read, XML_FEED_SIZE), b"")
+            if self.selection is not None:
+                yield from self.backend.iter_records(blocks, self.selection)
+                return
+            yield from self.backend.iter_rows(
+                blocks, streaming=self.streaming if streaming is None else streaming
+            )
@@ -2,16 +2,197 @@
 Parser for extracting ZIP files.
 """
 
+import fnmatch
+import hashlib
+import os
+import shutil
+import threading
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 from parsers.base_parser import BaseParser
+from utils.checkpoint import DEFAULT_CHECKPOINT_INTERVAL, Checkpoint
+
+# Default size of the chunks members are streamed in (1 MiB)
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class MemberCheckpoint:
+    """
+    Set of the archive members already processed, saved to a checkpoint so
+    that a restarted job skips them.
+
+    Members can be reported from several threads at once.
+    """
+
+    def __init__(self, checkpoint):
+        """
+        Initialize the set from the last saved checkpoint.
+
+        Args:
+            checkpoint (Checkpoint): The checkpoint of the archive, or None
+                when checkpoints are disabled.
+        """
+        self.checkpoint = checkpoint
+        self.completed = set()
+        self._lock = threading.Lock()
+
+        state = checkpoint.load() if checkpoint is not None else None
+        if state is not None:
+            self.completed.update(state["members"])
+
+    def __contains__(self, name):
+        return name in self.completed
+
+    def __len__(self):
+        return len(self.completed)
+
+    def add(self, name):
+        """
+        Record a processed member, saving the checkpoint if it is due.
+
+        Args:
+            name (str): The member name stored in the archive.
+        """
+        if self.checkpoint is None:
+            return
+        with self._lock:
+            self.completed.add(name)
+            if self.checkpoint.due():
+                self.checkpoint.save({"members": sorted(self.completed)})
+
+    def clear(self):
+        """
+        Remove the checkpoint, once every member has been processed.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+
+class ExtractionIndex:
+    """
+    CRC32 and size of the members extracted by previous runs, saved to a
+    sidecar file in the destination directory. The sidecar is named after
+    the archive and a hash of its origin URI.
+
+    Each entry also records the modification time of the extracted file, so a
+    member is known to be unchanged from the central directory and a stat of
+    the existing file, without reading either of them. A file modified or
+    removed since it was extracted is extracted again.
+
+    Members can be reported from several threads at once.
+    """
+
+    def __init__(self, checkpoint, local_destiny):
+        """
+        Initialize the index from the sidecar file.
+
+        Args:
+            checkpoint (Checkpoint): The sidecar file of the index.
+            local_destiny (Path): The destination directory.
+        """
+        self.checkpoint = checkpoint
+        self.local_destiny = local_destiny
+        self._lock = threading.Lock()
+        self._changed = False
+
+        # relative path -> [CRC32, size, mtime_ns of the extracted file]
+        state = checkpoint.load()
+        self.entries = state["members"] if state is not None else {}
+
+    def unchanged(self, relative_path, member):
+        """
+        Check whether a member is already extracted with the same content.
+
+        Args:
+            relative_path (str): Path of the extracted file in the destination.
+            member (ZipInfo): The member in the archive.
+
+        Returns:
+            bool: True if the existing file can be kept.
+        """
+        entry = self.entries.get(relative_path)
+        if entry is None or entry[:2] != [member.CRC, member.file_size]:
+            return False
+        try:
+            stat = (self.local_destiny / relative_path).stat()
+        except OSError:
+            return False
+        return stat.st_size == member.file_size and stat.st_mtime_ns == entry[2]
+
+    def add(self, relative_path, member):
+        """
+        Record an extracted member, saving the index if it is due.
+
+        Args:
+            relative_path (str): Path of the extracted file in the destination.
+            member (ZipInfo): The member in the archive.
+        """
+        mtime_ns = (self.local_destiny / relative_path).stat().st_mtime_ns
+        with self._lock:
+            self.entries[relative_path] = [member.CRC, member.file_size, mtime_ns]
+            self._changed = True
+            if self.checkpoint.due():
+                self._save()
+
+    def save(self):
+        """
+        Save the index if members were recorded since the last save.
+        """
+        with self._lock:
+            if self._changed:
+                self._save()
+
+    def _save(self):
+        self.checkpoint.save({"members": self.entries})
+        self._changed = False
 
 
 class ZipFileParser(BaseParser):
     """
     Parser for extracting ZIP files to a specified destination.
+
+    Supported kwargs:
+        extract_workers (int): Number of threads extracting members in parallel
+            (default: 1). Each thread opens its own handle on the archive;
+            decompression releases the GIL, so throughput scales with cores.
+        chunk_size (int): Size in bytes of the chunks members are streamed in,
+            which bounds the memory used per member (default: 1 MiB).
+        checkpoint (bool): Periodically save the list of extracted members
+            next to the output (default: False), so an extraction restarted
+            after a crash skips them. Requires a local origin and destiny.
+        checkpoint_interval (float): Seconds between two checkpoints
+            (default: 30).
+        incremental (bool): Only extract the members whose CRC32 or size
+            differ from the file extracted by a previous run (default: False).
+            The CRC32 and size of the extracted members are kept in a sidecar
+            index next to the output, so existing files are never re-read.
+            Requires a local destiny.
+        include (str or list): Globs the member names must match to be
+            extracted (default: every member).
+        exclude (str or list): Globs of the member names never extracted
+            (default: none). Filtered members are never decompressed.
+        mmap (bool): Memory-map local archives of 1 MiB or more instead of
+            reading them through a buffered file (default: False).
     """
 
+    # Members extracted so far, when checkpoints are enabled
+    completed_members = None
+
+    # CRC32 and size of the extracted members, in incremental mode
+    extraction_index = None
+
+    @classmethod
+    def estimate_memory(cls, input_size, kwargs):
+        """
+        Members are streamed in chunks, so the memory does not follow the
+        size of the archive.
+        """
+        return int(kwargs.get("extract_workers", 1)) * int(
+            kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE)
+        )
+
     def parse(self):
         """
         Extract all contents of the ZIP file to the destination directory.
@@ -24,25 +205,278 @@ class ZipFileParser(BaseParser):
             return False
 
         # Ensure output directory exists
-        output_dir = self.ensure_output_directory()
+        self.ensure_output_directory()
 
         try:
+            workers = int(self.kwargs.get("extract_workers", 1))
+            chunk_size = int(self.kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE))
+
             self.logger.info(
-                "Starting ZIP extraction from %s to %s", self.local_origin, output_dir
+                "Starting ZIP extraction from %s to %s", self.origin, self.destiny
+            )
+
+            self.completed_members = MemberCheckpoint(
+                self.open_checkpoint(self.input_name)
             )
+            self.extraction_index = self._open_index()
 
             # Extract the zip file
-            with zipfile.ZipFile(self.local_origin, "r") as zip_ref:
-                zip_ref.extractall(output_dir)
+            with self.open_seekable_input() as source, zipfile.ZipFile(
+                source, "r"
+            ) as zip_ref:
+                members = self._filter_members(zip_ref.infolist())
+                if self.completed_members:
+                    self.logger.info(
+                        "Resuming extraction of %s, skipping %d extracted members",
+                        self.origin,
+                        len(self.completed_members),
+                    )
+                    members = self._skip_completed(members)
+                if self.extraction_index is not None:
+                    members = self._skip_unchanged(members)
+                if workers <= 1 or len(members) <= 1:
+                    for member in members:
+                        self._extract_member(zip_ref, member, chunk_size)
 
+            if workers > 1 and len(members) > 1:
+                self._extract_parallel(members, workers, chunk_size)
+
+            self.completed_members.clear()
             self.logger.info("ZIP extraction completed successfully")
             return True
         except zipfile.BadZipFile:
-            self.logger.error("The file %s is not a valid ZIP file", self.local_origin)
+            self.logger.error("The file %s is not a valid ZIP file", self.origin)
             return False
         except PermissionError:
-            self.logger.error("Permission denied when extracting to %s", output_dir)
+            self.logger.error("Permission denied when extracting to %s", self.destiny)
             return False
         except Exception as e:
             self.logger.error("Error during ZIP extraction: %s", str(e))
             return False
+        finally:
+            # Keep the members extracted before a failure
+            if self.extraction_index is not None:
+                self.extraction_index.save()
+
+    def _open_index(self):
+        """
+        Get the extraction index, when the "incremental" kwarg is set.
+
+        Returns:
+            ExtractionIndex: The index, or None when incremental extraction is
+                disabled or the destiny is not a local directory.
+        """
+        if not self.kwargs.get("incremental"):
+            return None
+        if self.local_destiny is None:
+            self.logger.info(
+                "Incremental extraction requires a local destiny, every member "
+                "of %s will be extracted",
+                self.origin,
+            )
+            return None
+
+        # Archives of the same name from other origins keep their own index
+        origin_hash = hashlib.sha256(self.origin.encode("utf-8")).hexdigest()[:16]
+        checkpoint = Checkpoint(
+            self.output_location(f".{self.input_name}.{origin_hash}.index"),
+            {
+                "parser": self.__class__.__name__,
+                "version": self.version,
+                "origin": self.origin,
+            },
+            float(self.kwargs.get("checkpoint_interval", DEFAULT_CHECKPOINT_INTERVAL)),
+        )
+        return ExtractionIndex(checkpoint, self.local_destiny)
+
+    def _filter_members(self, members):
+        """
+        Keep the members selected by the "include" and "exclude" kwargs.
+
+        Args:
+            members (list): The ZipInfo objects of the archive.
+
+        Returns:
+            list: The ZipInfo objects to extract.
+        """
+        include = self.kwargs.get("include")
+        exclude = self.kwargs.get("exclude") or []
+        if isinstance(include, str):
+            include = [include]
+        if isinstance(exclude, str):
+            exclude = [exclude]
+        if not include and not exclude:
+            return members
+
+        return [
+            member
+            for member in members
+            if (
+                not include
+                or any(fnmatch.fnmatch(member.filename, glob) for glob in include)
+            )
+            and not any(fnmatch.fnmatch(member.filename, glob) for glob in exclude)
+        ]
+
+    def _skip_completed(self, members):
+        """
+        Drop the members extracted before the checkpoint was saved.
+
+        Args:
+            members (list): The ZipInfo objects to extract.
+
+        Returns:
+            list: The ZipInfo objects not extracted yet.
+        """
+        remaining = []
+        for member in members:
+            if member.filename not in self.completed_members:
+                remaining.append(member)
+            elif not member.is_dir():
+                # Files extracted by the interrupted run are still outputs
+                self.outputs.append(
+                    self.output_location(self._member_path(member.filename))
+                )
+        return remaining
+
+    def _skip_unchanged(self, members):
+        """
+        Drop the members already extracted with the same CRC32 and size.
+
+        Args:
+            members (list): The ZipInfo objects to extract.
+
+        Returns:
+            list: The ZipInfo objects that are new or changed.
+        """
+        changed = []
+        for member in members:
+            relative_path = self._member_path(member.filename)
+            if member.is_dir() or not self.extraction_index.unchanged(
+                relative_path, member
+            ):
+                changed.append(member)
+            else:
+                # Unchanged files are still outputs of the job
+                self.outputs.append(self.output_location(relative_path))
+
+        skipped = len(members) - len(changed)
+        if skipped:
+            self.metrics.add("members_skipped", skipped)
+            self.logger.info(
+                "Skipping %d unchanged members of %s", skipped, self.origin
+            )
+        return changed
+
+    def _extract_parallel(self, members, workers, chunk_size):
+        """
+        Extract members using a pool of threads, each with its own archive handle.
+
+        Args:
+            members (list): The ZipInfo objects to extract.
+            workers (int): Number of extraction threads.
+            chunk_size (int): Size in bytes of the streamed chunks.
+        """
+        batches = self._split_members(members, workers)
+        self.logger.info(
+            "Extracting %d members with %d workers", len(members), len(batches)
+        )
+
+        with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+            futures = [
+                pool.submit(self._extract_batch, batch, chunk_size)
+                for batch in batches
+            ]
+            for future in futures:
+                future.result()
+
+    def _extract_batch(self, members, chunk_size):
+        """
+        Extract a batch of members through a dedicated handle on the archive.
+
+        Args:
+            members (list): The ZipInfo objects to extract.
+            chunk_size (int): Size in bytes of the streamed chunks.
+        """
+        start_cpu = time.thread_time()
+        try:
+            with self.open_seekable_input() as source, zipfile.ZipFile(
+                source, "r"
+            ) as zip_ref:
+                for member in members:
+                    self._extract_member(zip_ref, member, chunk_size)
+        finally:
+            # CPU time of helper threads is not seen by the job's own thread
+            self.metrics.add("cpu_time_s", time.thread_time() - start_cpu)
+
+    def _extract_member(self, zip_ref, member, chunk_size):
+        """
+        Stream a single member to the destination.
+
+        Args:
+            zip_ref (ZipFile): An open handle on the archive.
+            member (ZipInfo): The member to extract.
+            chunk_size (int): Size in bytes of the streamed chunks.
+        """
+        relative_path = self._member_path(member.filename)
+
+        if member.is_dir():
+            # Object stores have no directories, only local ones are created
+            if self.local_destiny is not None:
+                (self.local_destiny / relative_path).mkdir(parents=True, exist_ok=True)
+            return
+
+        with zip_ref.open(member) as source, self.open_output(
+            relative_path
+        ) as destination:
+            shutil.copyfileobj(source, destination, chunk_size)
+        self.metrics.add("members_extracted", 1)
+        if self.extraction_index is not None:
+            self.extraction_index.add(relative_path, member)
+        if self.completed_members is not None:
+            self.completed_members.add(member.filename)
+
+    @staticmethod
+    def _member_path(filename):
+        """
+        Convert a member name into a relative path that stays inside the
+        destination directory, following the rules of ZipFile.extract.
+
+        Args:
+            filename (str): The member name stored in the archive.
+
+        Returns:
+            str: The sanitized relative path, using "/" as separator.
+        """
+        arcname = filename.replace("/", os.path.sep)
+        if os.path.altsep:
+            arcname = arcname.replace(os.path.altsep, os.path.sep)
+        arcname = os.path.splitdrive(arcname)[1]
+
+        invalid_parts = ("", os.path.curdir, os.path.pardir)
+        return "/".join(
+            part for part in arcname.split(os.path.sep) if part not in invalid_parts
+        )
+
+    @staticmethod
+    def _split_members(members, workers):
+        """
+        Split members into batches of similar uncompressed size.
+
+        Args:
+            members (list): The ZipInfo objects to split.
+            workers (int): Maximum number of batches.
+
+        Returns:
+            list: Non-empty lists of ZipInfo objects.
+        """
+        batches = [[] for _ in range(min(workers, len(members)))]
+        loads = [0] * len(batches)
+
+        # Largest members first, each to the least loaded batch
+        for member in sorted(members, key=lambda m: m.file_size, reverse=True):
+            index = loads.index(min(loads))
+            batches[index].append(member)
+            loads[index] += member.file_size
+
+        return [batch for batch in batches if batch]
@@ -0,0 +1,146 @@
+"""
+Parser converting the XML members of a ZIP archive to CSV without extracting them.
+"""
+
+import fnmatch
+import zipfile
+
+from parsers.xml_backends import PARSE_ERRORS
+from parsers.xml_to_csv_parser import XmlToCsvParser
+from parsers.zip_file_parser import MemberCheckpoint, ZipFileParser
+
+
+class ZipXmlToCsvParser(XmlToCsvParser):
+    """
+    Parser streaming each matching member of a ZIP archive straight into the
+    XML to CSV conversion.
+
+    Members are decompressed on the fly through ZipFile.open, so the XML files
+    are never written to the destination or read back from it. Each member
+    "dir/name.xml" produces "dir/name.csv" (or the extension of the selected
+    output format) inside the destiny.
+
+    Supported kwargs:
+        pattern (str): Glob the member names must match (default: "*.xml").
+        streaming (bool): Parse each member incrementally (default: True).
+        checkpoint (bool): Periodically save the list of converted members
+            and the progress of the member being converted (default: False),
+            so a conversion restarted after a crash skips the converted
+            members and resumes the interrupted one.
+        xml_backend, output_format, batch_size, compression,
+            compression_level, compression_threads, schema,
+            checkpoint_interval, mmap: As for XmlToCsvParser.
+    """
+
+    streaming_default = True
+
+    @classmethod
+    def shared_read_key(cls, kwargs):
+        # Each job converts its own selection of members
+        return None
+
+    def parse(self):
+        """
+        Convert every matching member of the ZIP archive.
+
+        Members without rows are skipped with a warning.
+
+        Returns:
+            bool: True if at least one member matched and all of them were
+                converted, False otherwise.
+        """
+        # Validate input file
+        if not self.validate_input():
+            return False
+
+        # Ensure output directory exists
+        self.ensure_output_directory()
+
+        output_format = self.kwargs.get("output_format", "csv")
+        sink_class = self._prepare_conversion(output_format)
+        if sink_class is None:
+            return False
+
+        pattern = self.kwargs.get("pattern", "*.xml")
+
+        try:
+            self.logger.info(
+                "Starting conversion of the %s members of %s to %s",
+                pattern,
+                self.origin,
+                output_format,
+            )
+
+            completed_members = MemberCheckpoint(self.open_checkpoint(self.input_name))
+            if completed_members:
+                self.logger.info(
+                    "Resuming conversion of %s, skipping %d converted members",
+                    self.origin,
+                    len(completed_members),
+                )
+
+            converted = len(completed_members)
+            output_extension = sink_class.output_extension(
+                self.kwargs.get("compression")
+            )
+            with self.open_seekable_input() as source, zipfile.ZipFile(
+                source, "r"
+            ) as zip_ref:
+                for member in zip_ref.infolist():
+                    if member.is_dir() or not fnmatch.fnmatch(member.filename, pattern):
+                        continue
+                    relative_path = ZipFileParser._member_path(member.filename)
+                    output_stem = relative_path.rsplit(".", 1)[0]
+                    if member.filename in completed_members:
+                        # Converted by the interrupted run, still an output
+                        output_filename = output_stem + output_extension
+                        self.outputs.append(self.output_location(output_filename))
+                        continue
+
+                    output_filename = self._convert(
+                        lambda: zip_ref.open(member), output_stem, sink_class
+                    )
+                    if output_filename is None:
+                        self.logger.warning(
+                            "Member %s has %s",
+                            member.filename,
+                            self._no_rows_reason(),
+                        )
+                        continue
+
+                    converted += 1
+                    self.metrics.add("members_extracted", 1)
+                    completed_members.add(member.filename)
+                    self.logger.debug(
+                        "Converted member %s to %s",
+                        member.filename,
+                        self.output_location(output_filename),
+                    )
+
+            if converted == 0:
+                self.logger.warning(
+                    "No member of %s matching %s was converted", self.origin, pattern
+                )
+                return False
+
+            completed_members.clear()
+            self.logger.info(
+                "Converted %d members of %s to %s", converted, self.origin, self.destiny
+            )
+            return True
+
+        except zipfile.BadZipFile:
+            self.logger.error("The file %s is not a valid ZIP file", self.origin)
+            return False
+        except PARSE_ERRORS as e:
+            self.logger.error("Failed to parse an XML member of %s: %s", self.origin, e)
+            return False
+        except (IOError, PermissionError) as e:
+            self.logger.error("File I/O error: %s", str(e))
+            return False
+        except ImportError as e:
+            self.logger.error(str(e))
+            return False
+        except Exception as e:
+            self.logger.error("Error during ZIP XML to CSV conversion: %s", str(e))
+            return False
@@ -0,0 +1,4 @@
+"""
+Storage package initialization file.
+This module contains the storage backends parsers read from and write to.
+"""
@@ -0,0 +1,302 @@
+"""
+Base abstract storage backend that all storage implementations should inherit from.
+"""
+
+import io
+from abc import ABC, abstractmethod
+
+# Default size of the parts sent by multipart uploads (8 MiB)
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+# Default size of the buffer used on top of ranged reads (1 MiB)
+DEFAULT_RANGE_BUFFER_SIZE = 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """
+    Abstract base class for all storage backends.
+
+    Paths are S3 URIs ("s3://bucket/key"). Backends offer streaming reads and
+    writes, ranged reads, listing and multipart uploads, so parsers never need a
+    fully materialized local copy of their inputs.
+    """
+
+    @abstractmethod
+    def exists(self, path):
+        """
+        Check whether an object exists.
+
+        Args:
+            path (str): S3 path of the object.
+
+        Returns:
+            bool: True if the object exists, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    def size(self, path):
+        """
+        Get the size of an object.
+
+        Args:
+            path (str): S3 path of the object.
+
+        Returns:
+            int: The size of the object in bytes.
+
+        Raises:
+            FileNotFoundError: If the object does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def open_read(self, path):
+        """
+        Open an object for streaming reads.
+
+        Args:
+            path (str): S3 path of the object.
+
+        Returns:
+            io.BufferedIOBase: A readable binary stream.
+
+        Raises:
+            FileNotFoundError: If the object does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def read_range(self, path, start, length):
+        """
+        Read a range of bytes from an object.
+
+        Args:
+            path (str): S3 path of the object.
+            start (int): Offset of the first byte to read.
+            length (int): Maximum number of bytes to read.
+
+        Returns:
+            bytes: The bytes read, shorter than length at the end of the object.
+        """
+        pass
+
+    @abstractmethod
+    def list(self, prefix):
+        """
+        List the objects under a prefix.
+
+        Args:
+            prefix (str): S3 path prefix.
+
+        Returns:
+            list: The S3 paths of the objects, sorted.
+        """
+        pass
+
+    @abstractmethod
+    def create_multipart_upload(self, path):
+        """
+        Start a multipart upload.
+
+        Args:
+            path (str): S3 path of the object to create.
+
+        Returns:
+            str: The upload identifier.
+        """
+        pass
+
+    @abstractmethod
+    def upload_part(self, upload_id, part_number, data):
+        """
+        Upload one part of a multipart upload.
+
+        Args:
+            upload_id (str): The upload identifier.
+            part_number (int): Position of the part, starting at 1.
+            data (bytes): The content of the part.
+        """
+        pass
+
+    @abstractmethod
+    def complete_multipart_upload(self, upload_id):
+        """
+        Assemble the uploaded parts into the final object.
+
+        Args:
+            upload_id (str): The upload identifier.
+        """
+        pass
+
+    @abstractmethod
+    def abort_multipart_upload(self, upload_id):
+        """
+        Discard a multipart upload and its parts.
+
+        Args:
+            upload_id (str): The upload identifier.
+        """
+        pass
+
+    def open_write(self, path, part_size=DEFAULT_PART_SIZE):
+        """
+        Open an object for streaming writes.
+
+        The default implementation buffers part_size bytes at a time and sends
+        them as parts of a multipart upload. The object becomes visible when
+        the stream is closed.
+
+        Args:
+            path (str): S3 path of the object to create.
+            part_size (int): Size in bytes of each uploaded part.
+
+        Returns:
+            io.RawIOBase: A writable binary stream.
+        """
+        return MultipartWriter(self, path, part_size)
+
+    def open_range_reader(self, path, buffer_size=DEFAULT_RANGE_BUFFER_SIZE):
+        """
+        Open an object as a seekable stream backed by ranged reads.
+
+        Args:
+            path (str): S3 path of the object.
+            buffer_size (int): Size in bytes of each ranged read.
+
+        Returns:
+            io.BufferedReader: A readable, seekable binary stream.
+        """
+        return io.BufferedReader(RangeReader(self, path), buffer_size)
+
+    def local_path(self, path):
+        """
+        Get the local file backing an object, if any.
+
+        Args:
+            path (str): S3 path of the object.
+
+        Returns:
+            Path: The local path, or None when the backend is not file based.
+        """
+        return None
+
+
+class MultipartWriter(io.RawIOBase):
+    """
+    Writable stream that uploads its content as a multipart upload.
+    """
+
+    def __init__(self, storage, path, part_size=DEFAULT_PART_SIZE):
+        """
+        Initialize the writer and start the upload.
+
+        Args:
+            storage (StorageBackend): The backend receiving the parts.
+            path (str): S3 path of the object to create.
+            part_size (int): Size in bytes of each uploaded part.
+        """
+        super().__init__()
+        self.storage = storage
+        self.path = path
+        self.part_size = part_size
+        self.upload_id = storage.create_multipart_upload(path)
+
+        self._buffer = bytearray()
+        self._part_number = 0
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            if self._buffer or self._part_number == 0:
+                self._upload(self._buffer)
+                self._buffer = bytearray()
+            self.storage.complete_multipart_upload(self.upload_id)
+        super().close()
+
+    def abort(self):
+        """
+        Discard everything written so far.
+        """
+        if not self.closed:
+            self.storage.abort_multipart_upload(self.upload_id)
+            super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Never publish a partially written object
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def _upload(self, data):
+        self._part_number += 1
+        self.storage.upload_part(self.upload_id, self._part_number, bytes(data))
+
+
+class RangeReader(io.RawIOBase):
+    """
+    Seekable readable stream that fetches bytes with ranged reads.
+    """
+
+    def __init__(self, storage, path):
+        """
+        Initialize the reader.
+
+        Args:
+            storage (StorageBackend): The backend holding the object.
+            path (str): S3 path of the object.
+        """
+        super().__init__()
+        self.storage = storage
+        self.path = path
+        self._size = storage.size(path)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self._size - self._position)
+        if length <= 0:
+            return 0
+
+        data = self.storage.read_range(self.path, self._position, length)
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
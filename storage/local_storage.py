@@ -0,0 +1,169 @@
+"""
+Storage backend that maps S3 paths to a local directory.
+"""
+
+import io
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from storage.base_storage import DEFAULT_PART_SIZE, StorageBackend
+from utils.path_utils import DEFAULT_S3_SIMULATION_DIR, s3_to_local_path
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Storage backend simulating S3 with a local folder.
+
+    "s3://bucket/key" is stored as "<base_dir>/bucket/key". This is the default
+    backend of every parser.
+    """
+
+    def __init__(self, base_dir=DEFAULT_S3_SIMULATION_DIR):
+        """
+        Initialize the local storage backend.
+
+        Args:
+            base_dir (str or Path): Directory simulating the S3 buckets.
+        """
+        self.base_dir = Path(base_dir)
+
+        # Upload id -> (destination path, {part number: part file})
+        self._uploads = {}
+
+    def local_path(self, path):
+        return s3_to_local_path(path, self.base_dir)
+
+    def exists(self, path):
+        return self.local_path(path).is_file()
+
+    def size(self, path):
+        return self.local_path(path).stat().st_size
+
+    def open_read(self, path):
+        return open(self.local_path(path), "rb")
+
+    def read_range(self, path, start, length):
+        with open(self.local_path(path), "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    def open_write(self, path, part_size=DEFAULT_PART_SIZE):
+        # Local files can be streamed directly, no multipart staging needed
+        target = self.local_path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return AtomicFileWriter(target)
+
+    def list(self, prefix):
+        base = self.local_path(prefix)
+        search_root = base if prefix.endswith("/") else base.parent
+        if not search_root.is_dir():
+            return []
+
+        paths = []
+        for root, _, files in os.walk(search_root):
+            for filename in files:
+                relative = Path(root, filename).relative_to(self.base_dir)
+                uri = "s3://" + relative.as_posix()
+                if uri.startswith(prefix):
+                    paths.append(uri)
+        return sorted(paths)
+
+    def create_multipart_upload(self, path):
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = (self.local_path(path), {})
+        return upload_id
+
+    def upload_part(self, upload_id, part_number, data):
+        target, parts = self._uploads[upload_id]
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        part_path = target.with_name(f".{target.name}.{upload_id}.part{part_number}")
+        with open(part_path, "wb") as f:
+            f.write(data)
+        parts[part_number] = part_path
+
+    def complete_multipart_upload(self, upload_id):
+        target, parts = self._uploads.pop(upload_id)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # Assemble the parts next to the target, then publish atomically
+        temp_path = target.with_name(f".{target.name}.{upload_id}.tmp")
+        with open(temp_path, "wb") as destination:
+            for part_number in sorted(parts):
+                with open(parts[part_number], "rb") as source:
+                    shutil.copyfileobj(source, destination)
+                os.remove(parts[part_number])
+        os.replace(temp_path, target)
+
+    def abort_multipart_upload(self, upload_id):
+        _, parts = self._uploads.pop(upload_id, (None, {}))
+        for part_path in parts.values():
+            if part_path.exists():
+                os.remove(part_path)
+
+
+class AtomicFileWriter(io.RawIOBase):
+    """
+    Writable stream creating a local file atomically.
+
+    The data goes to a hidden temporary file next to the target, which
+    replaces the target when the stream is closed. Like MultipartWriter, a
+    stream left by an exception in a with block is aborted, so a partially
+    written file is never published.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the writer and create the temporary file.
+
+        Args:
+            path (str or Path): The file to create.
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.temp_path = self.path.with_name(
+            f".{self.path.name}.{uuid.uuid4().hex}.tmp"
+        )
+        self._file = open(self.temp_path, "wb")
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._file.tell()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._file.close()
+                os.replace(self.temp_path, self.path)
+            finally:
+                super().close()
+
+    def abort(self):
+        """
+        Discard everything written so far.
+        """
+        if not self.closed:
+            self._file.close()
+            self.temp_path.unlink(missing_ok=True)
+            super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Never publish a partially written file
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
@@ -0,0 +1,73 @@
+"""
+In-memory object store, used as a stand-in for a remote object store.
+"""
+
+import io
+import threading
+import uuid
+
+from storage.base_storage import StorageBackend
+
+
+class MemoryStorageBackend(StorageBackend):
+    """
+    Storage backend keeping objects in memory.
+
+    It behaves like a remote object store: objects are only reachable through
+    the storage API (there is no local file backing them) and writes are sent
+    as multipart uploads that become visible once completed.
+
+    Objects only live in the process that created them and are lost when it
+    exits, so the backend is not selectable in job settings: tests pass it to
+    the parsers or the engine directly.
+    """
+
+    def __init__(self, objects=None):
+        """
+        Initialize the in-memory store.
+
+        Args:
+            objects (dict): Optional initial content, mapping S3 paths to bytes.
+        """
+        self.objects = dict(objects or {})
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def exists(self, path):
+        return path in self.objects
+
+    def size(self, path):
+        return len(self._get(path))
+
+    def open_read(self, path):
+        return io.BytesIO(self._get(path))
+
+    def read_range(self, path, start, length):
+        return self._get(path)[start : start + length]
+
+    def list(self, prefix):
+        return sorted(path for path in self.objects if path.startswith(prefix))
+
+    def create_multipart_upload(self, path):
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = (path, {})
+        return upload_id
+
+    def upload_part(self, upload_id, part_number, data):
+        self._uploads[upload_id][1][part_number] = bytes(data)
+
+    def complete_multipart_upload(self, upload_id):
+        with self._lock:
+            path, parts = self._uploads.pop(upload_id)
+            self.objects[path] = b"".join(parts[n] for n in sorted(parts))
+
+    def abort_multipart_upload(self, upload_id):
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+
+    def _get(self, path):
+        try:
+            return self.objects[path]
+        except KeyError:
+            raise FileNotFoundError(f"Object not found: {path}") from None
@@ -0,0 +1,106 @@
+"""
+Tests for the benchmark suite and its corpus generators.
+"""
+
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+
+from benchmarks.generators import generate_xml, generate_zip
+from benchmarks.run_benchmarks import compare_results, run_benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Test cases for the benchmark suite.
+    """
+
+    def setUp(self):
+        """
+        Set up test environment before each test case.
+        """
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def test_generate_xml(self):
+        """
+        Test that the XML generator is deterministic and honours its sizes.
+        """
+        first = generate_xml(self.temp_dir / "a.xml", 5, width=3, depth=2, seed=7)
+        second = generate_xml(self.temp_dir / "b.xml", 5, width=3, depth=2, seed=7)
+        self.assertEqual(first.read_bytes(), second.read_bytes())
+
+        root = ET.parse(first).getroot()
+        self.assertEqual(len(root), 5)
+        self.assertEqual([child.tag for child in root[0]][:2], ["id", "field0"])
+        self.assertEqual(len(root[0]), 4)
+        self.assertEqual(len(root[0][1]), 1)
+
+    def test_generate_zip(self):
+        """
+        Test that the ZIP generator is deterministic and honours its sizes.
+        """
+        first = generate_zip(self.temp_dir / "a.zip", 3, 1000, seed=7)
+        second = generate_zip(self.temp_dir / "b.zip", 3, 1000, seed=7)
+        self.assertEqual(first.read_bytes(), second.read_bytes())
+
+        with zipfile.ZipFile(first) as zip_ref:
+            sizes = [info.file_size for info in zip_ref.infolist()]
+        self.assertEqual(sizes, [1000, 1000, 1000])
+
+    def test_run_benchmarks(self):
+        """
+        Test running the benchmarks on a tiny corpus.
+        """
+        sizes = {
+            "xml_rows": 20,
+            "xml_width": 3,
+            "xml_depth": 1,
+            "zip_members": 4,
+            "zip_member_size": 100,
+        }
+        results = run_benchmarks(
+            ["xml_streaming", "xml_expat", "zip_parallel"],
+            sizes,
+            repeat=1,
+            work_dir=self.temp_dir,
+        )
+
+        metrics = results["benchmarks"]["xml_streaming"]
+        self.assertEqual(metrics["rows"], 20)
+        for key in ("wall_time_s", "rows_per_sec", "mb_per_sec", "peak_rss_bytes"):
+            self.assertIn(key, metrics)
+        self.assertEqual(results["benchmarks"]["zip_parallel"]["rows"], 4)
+
+    def test_compare_results(self):
+        """
+        Test detecting throughput and memory regressions.
+        """
+        baseline = {
+            "benchmarks": {
+                "xml_tree": {
+                    "rows_per_sec": 100.0,
+                    "mb_per_sec": 10.0,
+                    "peak_rss_delta_bytes": 10 * 1024 * 1024,
+                }
+            }
+        }
+        current = {"benchmarks": {"xml_tree": dict(baseline["benchmarks"]["xml_tree"])}}
+        self.assertEqual(compare_results(current, baseline), [])
+
+        current["benchmarks"]["xml_tree"]["rows_per_sec"] = 50.0
+        current["benchmarks"]["xml_tree"]["peak_rss_delta_bytes"] = 50 * 1024 * 1024
+        regressions = compare_results(current, baseline)
+        self.assertEqual(len(regressions), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
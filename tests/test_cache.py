@@ -0,0 +1,135 @@
+"""
+Tests for the TransformationCache class.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from orchestrator.cache import TransformationCache, file_sha256
+from parsers.xml_to_csv_parser import XmlToCsvParser
+
+
+class TestTransformationCache(unittest.TestCase):
+    """
+    Test cases for the TransformationCache class.
+    """
+
+    def setUp(self):
+        """
+        Set up test environment before each test case.
+        """
+        # Create temporary directories
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.source_dir = self.temp_dir / "source"
+        self.dest_dir = self.temp_dir / "dest"
+        self.source_dir.mkdir()
+
+        # Create a test XML file
+        self.xml_file = self.source_dir / "test.xml"
+        self.xml_file.write_text(
+            "<rows><row><id>1</id></row><row><id>2</id></row></rows>"
+        )
+
+        self.cache = TransformationCache(self.temp_dir / "cache")
+        self.key = self.cache.make_key(
+            "XmlToCsvParser", "s3://b/source/test.xml", "s3://b/dest/", {}
+        )
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def _run_parser(self):
+        """
+        Convert the test XML file and return the parser.
+        """
+        parser = XmlToCsvParser("s3://b/source/test.xml", "s3://b/dest/")
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertTrue(parser.parse())
+        return parser
+
+    def test_up_to_date_after_record(self):
+        """
+        Test that a recorded transformation is reported as up to date.
+        """
+        parser = self._run_parser()
+        self.assertFalse(self.cache.is_up_to_date(self.key, parser))
+
+        self.cache.record(self.key, parser)
+        self.assertTrue(self.cache.is_up_to_date(self.key, parser))
+
+    def test_touched_origin_with_same_content(self):
+        """
+        Test that a touched but unchanged origin is hashed once, then up to
+        date when touched again.
+        """
+        parser = self._run_parser()
+        with mock.patch(
+            "orchestrator.cache.file_sha256", wraps=file_sha256
+        ) as hash_file:
+            self.cache.record(self.key, parser)
+            self.assertFalse(hash_file.called)
+
+            # Assert a touched origin without a recorded digest is converted again
+            stat = self.xml_file.stat()
+            os.utime(self.xml_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertFalse(self.cache.is_up_to_date(self.key, parser))
+            self.assertEqual(hash_file.call_count, 1)
+
+            # Assert the record reuses the digest of the lookup
+            parser = self._run_parser()
+            self.cache.record(self.key, parser)
+            self.assertEqual(hash_file.call_count, 1)
+
+        stat = self.xml_file.stat()
+        os.utime(self.xml_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertTrue(self.cache.is_up_to_date(self.key, parser))
+
+    def test_changed_origin_or_output(self):
+        """
+        Test that modified origins and missing outputs invalidate the entry.
+        """
+        parser = self._run_parser()
+        self.cache.record(self.key, parser)
+
+        # Same size, different content
+        self.xml_file.write_text(
+            "<rows><row><id>3</id></row><row><id>4</id></row></rows>"
+        )
+        self.assertFalse(self.cache.is_up_to_date(self.key, parser))
+
+        # Re-record, then remove the output
+        parser = self._run_parser()
+        self.cache.record(self.key, parser)
+        (self.dest_dir / "test.csv").unlink()
+        self.assertFalse(self.cache.is_up_to_date(self.key, parser))
+
+    def test_parser_version_change(self):
+        """
+        Test that a new parser version invalidates the entry.
+        """
+        parser = self._run_parser()
+        self.cache.record(self.key, parser)
+
+        parser.version = "2"
+        self.assertFalse(self.cache.is_up_to_date(self.key, parser))
+
+    def test_key_depends_on_kwargs(self):
+        """
+        Test that different parser arguments produce different keys.
+        """
+        other_key = self.cache.make_key(
+            "XmlToCsvParser", "s3://b/source/test.xml", "s3://b/dest/", {"a": 1}
+        )
+        self.assertNotEqual(self.key, other_key)
+
+
+if __name__ == "__main__":
+    unittest.main()
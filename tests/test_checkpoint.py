@@ -0,0 +1,68 @@
+"""
+Tests for the Checkpoint class.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.checkpoint import Checkpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    Test cases for the Checkpoint class.
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary directory for the sidecar files.
+        """
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / ".out.csv.checkpoint"
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_and_load(self):
+        """
+        Test that the saved state is loaded back for the same fingerprint only.
+        """
+        checkpoint = Checkpoint(self.path, {"size": 10, "kwargs": {"a": 1}})
+        self.assertIsNone(checkpoint.load())
+
+        checkpoint.save({"rows": 5})
+        self.assertEqual(checkpoint.load(), {"rows": 5})
+        self.assertEqual(list(self.temp_dir.iterdir()), [self.path])
+
+        # Assert another input or configuration ignores the checkpoint
+        self.assertIsNone(Checkpoint(self.path, {"size": 11, "kwargs": {"a": 1}}).load())
+        self.assertEqual(
+            Checkpoint(self.path, {"size": 10, "kwargs": {"a": 1}}).load(), {"rows": 5}
+        )
+
+        checkpoint.clear()
+        self.assertFalse(self.path.exists())
+        checkpoint.clear()
+
+    def test_corrupt_checkpoint(self):
+        """
+        Test that an unreadable checkpoint is ignored.
+        """
+        self.path.write_text('{"fingerprint": ')
+        self.assertIsNone(Checkpoint(self.path, {}).load())
+
+    def test_interval(self):
+        """
+        Test that saves are due once the interval has elapsed.
+        """
+        self.assertFalse(Checkpoint(self.path, {}, interval=60).due())
+        self.assertTrue(Checkpoint(self.path, {}, interval=0).due())
+
+
+if __name__ == "__main__":
+    unittest.main()
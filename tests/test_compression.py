@@ -0,0 +1,121 @@
+"""
+Tests for the CompressingWriter class.
+"""
+
+import bz2
+import gzip
+import io
+import threading
+import unittest
+
+from utils.compression import CompressingWriter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DECOMPRESSORS = {
+    "gzip": gzip.decompress,
+    "bz2": bz2.decompress,
+}
+
+
+class TestCompressingWriter(unittest.TestCase):
+    """
+    Test cases for the CompressingWriter class.
+    """
+
+    def setUp(self):
+        """
+        Set up test data spanning several blocks.
+        """
+        self.data = b"".join(b"row %d,value %d\n" % (i, i * 7) for i in range(5000))
+
+    def compress(self, compression, threads, data, block_size=4096):
+        """
+        Compress data in several writes and return the compressed bytes.
+        """
+        output = io.BytesIO()
+        writer = CompressingWriter(
+            output, compression, threads=threads, block_size=block_size
+        )
+        for start in range(0, len(data), 1000):
+            writer.write(data[start : start + 1000])
+        writer.close()
+
+        # Assert the wrapped stream is left open
+        self.assertFalse(output.closed)
+        return output.getvalue()
+
+    def test_round_trip(self):
+        """
+        Test that the concatenated blocks decompress to the written data.
+        """
+        for compression, decompress in DECOMPRESSORS.items():
+            for threads in (0, 1, 4):
+                with self.subTest(compression=compression, threads=threads):
+                    compressed = self.compress(compression, threads, self.data)
+                    self.assertLess(len(compressed), len(self.data))
+                    self.assertEqual(decompress(compressed), self.data)
+
+    def test_reproducible_output(self):
+        """
+        Test that the output does not depend on the number of threads.
+        """
+        self.assertEqual(
+            self.compress("gzip", 0, self.data), self.compress("gzip", 4, self.data)
+        )
+
+    def test_empty_output(self):
+        """
+        Test that an empty output is still a valid compressed file.
+        """
+        for compression, decompress in DECOMPRESSORS.items():
+            self.assertEqual(decompress(self.compress(compression, 1, b"")), b"")
+
+    def test_unsupported_compression(self):
+        """
+        Test that an unknown codec is rejected.
+        """
+        with self.assertRaises(ValueError):
+            CompressingWriter(io.BytesIO(), "lzma")
+
+    def test_abort_on_error(self):
+        """
+        Test that a writer left by an exception stops its threads without
+        writing the pending blocks.
+        """
+        output = io.BytesIO()
+        with self.assertRaises(RuntimeError):
+            with CompressingWriter(
+                output, "gzip", threads=2, block_size=4096
+            ) as writer:
+                writer.write(self.data)
+                raise RuntimeError("conversion failed")
+
+        self.assertTrue(writer.closed)
+        self.assertFalse(output.closed)
+        self.assertLess(len(gzip.decompress(output.getvalue())), len(self.data))
+        self.assertFalse(
+            [
+                thread
+                for thread in threading.enumerate()
+                if thread.name.startswith("compression")
+            ]
+        )
+
+    @unittest.skipUnless(zstandard, "zstandard is not installed")
+    def test_zstd_round_trip(self):
+        """
+        Test that the concatenated zstd frames decompress to the written data.
+        """
+        compressed = self.compress("zstd", 2, self.data)
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            io.BytesIO(compressed), read_across_frames=True
+        )
+        self.assertEqual(reader.read(), self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+Tests for the SpoolDaemon class.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from main import TransformationEngine
+from orchestrator.daemon import SpoolDaemon
+
+
+class TestSpoolDaemon(unittest.TestCase):
+    """
+    Test cases for the SpoolDaemon class.
+    """
+
+    def setUp(self):
+        """
+        Set up a spool directory and an XML origin.
+        """
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.s3_dir = self.temp_dir / "s3_simulation"
+        self.source_dir = self.s3_dir / "test-bucket" / "source"
+        self.dest_dir = self.s3_dir / "test-bucket" / "dest"
+        self.source_dir.mkdir(parents=True)
+
+        (self.source_dir / "test.xml").write_text(
+            "<root><row><id>1</id></row><row><id>2</id></row></root>"
+        )
+
+        self.spool_dir = self.temp_dir / "spool"
+        self.engine = TransformationEngine(None, keep_workers=True)
+        self.daemon = SpoolDaemon(self.engine, self.spool_dir, poll_interval=0.01)
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        self.engine.close()
+        shutil.rmtree(self.temp_dir)
+
+    def queue_definition(self, name, classname="XmlToCsvParser", settings=None):
+        """
+        Drop a job definition in the incoming directory.
+        """
+        settings = dict(settings or {})
+        settings["storage"] = {"backend": "local", "base_dir": str(self.s3_dir)}
+        job_data = {
+            "settings": settings,
+            "transformations": [
+                {
+                    "object": {
+                        "origin": "s3://test-bucket/source/test.xml",
+                        "destiny": f"s3://test-bucket/dest/{name}/",
+                        "classname": classname,
+                    },
+                    "kwargs": {},
+                }
+            ],
+        }
+        path = self.spool_dir / "incoming" / f"{name}.json"
+        path.write_text(json.dumps(job_data))
+        return path
+
+    def test_process_definitions(self):
+        """
+        Test that queued definitions are run and moved with their report.
+        """
+        self.queue_definition("good")
+        self.queue_definition("bad", classname="Unknown")
+
+        self.assertEqual(self.daemon.serve(max_definitions=2), 2)
+
+        # Assert each definition was moved according to its outcome
+        self.assertTrue((self.spool_dir / "done" / "good.json").exists())
+        self.assertTrue((self.spool_dir / "failed" / "bad.json").exists())
+        self.assertEqual(list((self.spool_dir / "incoming").iterdir()), [])
+        self.assertEqual(list((self.spool_dir / "processing").iterdir()), [])
+        self.assertTrue((self.dest_dir / "good" / "test.csv").exists())
+
+        # Assert each definition got its own report
+        with open(self.spool_dir / "done" / "good.report.json", encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["summary"]["successful_jobs"], 1)
+        self.assertEqual(report["jobs"][0]["metrics"]["rows_emitted"], 2)
+        with open(self.spool_dir / "failed" / "bad.report.json", encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["summary"]["failed_jobs"], 1)
+
+    def test_streamed_definition_report(self):
+        """
+        Test that JSON Lines definitions are picked up and their report lists
+        the successful jobs.
+        """
+        storage = {"backend": "local", "base_dir": str(self.s3_dir)}
+        lines = [{"settings": {"storage": storage}}]
+        for name in ("a", "b"):
+            lines.append(
+                {
+                    "object": {
+                        "origin": "s3://test-bucket/source/test.xml",
+                        "destiny": f"s3://test-bucket/dest/{name}/",
+                        "classname": "XmlToCsvParser",
+                    },
+                    "kwargs": {},
+                }
+            )
+        path = self.spool_dir / "incoming" / "stream.ndjson"
+        path.write_text("\n".join(json.dumps(line) for line in lines))
+
+        self.assertTrue(self.daemon.process_next())
+        self.assertTrue((self.spool_dir / "done" / "stream.ndjson").exists())
+        with open(
+            self.spool_dir / "done" / "stream.report.json", encoding="utf-8"
+        ) as f:
+            report = json.load(f)
+        self.assertEqual(report["summary"]["successful_jobs"], 2)
+        self.assertEqual(len(report["jobs"]), 2)
+
+    def test_oldest_definition_first(self):
+        """
+        Test that definitions are claimed in modification time order.
+        """
+        newer = self.queue_definition("a")
+        older = self.queue_definition("b")
+        os.utime(older, (1, 1))
+        os.utime(newer, (2, 2))
+
+        self.assertTrue(self.daemon.process_next())
+        self.assertTrue((self.spool_dir / "done" / "b.json").exists())
+        self.assertTrue((self.spool_dir / "incoming" / "a.json").exists())
+
+    def test_resubmitted_definition_kept(self):
+        """
+        Test that a resubmitted definition does not overwrite the archived one.
+        """
+        for _ in range(3):
+            self.queue_definition("same")
+            self.assertTrue(self.daemon.process_next())
+
+        done_dir = self.spool_dir / "done"
+        self.assertEqual(
+            sorted(path.name for path in done_dir.iterdir()),
+            [
+                "same.1.json",
+                "same.1.report.json",
+                "same.2.json",
+                "same.2.report.json",
+                "same.json",
+                "same.report.json",
+            ],
+        )
+
+    def test_empty_spool(self):
+        """
+        Test that nothing is run when no definition is queued.
+        """
+        self.assertIsNone(self.daemon.process_next())
+
+    def test_workers_kept_between_definitions(self):
+        """
+        Test that definitions with the same settings share the worker pools.
+        """
+        settings = {"max_workers": 2, "executor": "thread"}
+        self.queue_definition("first", settings=settings)
+        self.assertTrue(self.daemon.process_next())
+        job_executor = self.engine._job_executor
+        self.assertIsNotNone(job_executor)
+
+        self.queue_definition("second", settings=settings)
+        self.assertTrue(self.daemon.process_next())
+        self.assertIs(self.engine._job_executor, job_executor)
+
+        # Assert other settings get a new executor
+        self.queue_definition("third", settings={"max_workers": 3})
+        self.assertTrue(self.daemon.process_next())
+        self.assertIsNot(self.engine._job_executor, job_executor)
+
+    def test_stop(self):
+        """
+        Test that serve returns once stop is called.
+        """
+        thread = threading.Thread(target=self.daemon.serve)
+        thread.start()
+        self.queue_definition("good")
+        self.daemon.stop()
+        thread.join(timeout=10)
+
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.engine._job_executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+"""
+Tests for the JobGraph class.
+"""
+
+import unittest
+
+from orchestrator.dag import JobGraph, ReadyQueue
+
+
+def _transformation(origin, destiny, **extra):
+    """
+    Build a minimal transformation definition.
+    """
+    transformation = {
+        "object": {"origin": origin, "destiny": destiny, "classname": "ZipFileParser"},
+        "kwargs": {},
+    }
+    transformation.update(extra)
+    return transformation
+
+
+class TestJobGraph(unittest.TestCase):
+    """
+    Test cases for the JobGraph class.
+    """
+
+    def test_infer_read_after_write(self):
+        """
+        Test that a job reading from another job's destiny depends on it.
+        """
+        graph = JobGraph()
+        graph.add_job(1, _transformation("s3://b/src/a.zip", "s3://b/stage"))
+        graph.add_job(2, _transformation("s3://b/src/b.zip", "s3://b/other/"))
+        graph.add_job(3, _transformation("s3://b/stage/a.xml", "s3://b/out/"))
+        graph.validate()
+
+        # Assert only the chained job waits
+        self.assertEqual(graph.ready_jobs(), [1, 2])
+        self.assertEqual(graph.dependencies[3], {1})
+
+        # Assert the chained job becomes ready once its dependency completes
+        self.assertEqual(graph.complete_job(2), [])
+        self.assertEqual(graph.complete_job(1), [3])
+
+    def test_infer_write_after_read(self):
+        """
+        Test that a job writing where an earlier job reads waits for it.
+        """
+        graph = JobGraph()
+        graph.add_job(1, _transformation("s3://b/stage/a.xml", "s3://b/out/"))
+        graph.add_job(2, _transformation("s3://b/src/a.zip", "s3://b/stage/"))
+        graph.validate()
+
+        self.assertEqual(graph.ready_jobs(), [1])
+
+    def test_inference_disabled(self):
+        """
+        Test that overlapping jobs are independent when inference is disabled.
+        """
+        graph = JobGraph(infer_dependencies=False)
+        graph.add_job(1, _transformation("s3://b/src/a.zip", "s3://b/stage/"))
+        graph.add_job(2, _transformation("s3://b/stage/a.xml", "s3://b/out/"))
+        graph.validate()
+
+        self.assertEqual(graph.ready_jobs(), [1, 2])
+
+    def test_declared_dependencies(self):
+        """
+        Test dependencies declared through "id" and "depends_on".
+        """
+        graph = JobGraph(infer_dependencies=False)
+        graph.add_job(
+            1, _transformation("s3://b/a.xml", "s3://b/x/", depends_on=["unzip"])
+        )
+        graph.add_job(2, _transformation("s3://b/a.zip", "s3://b/y/", id="unzip"))
+        graph.validate()
+
+        self.assertEqual(graph.ready_jobs(), [2])
+        self.assertEqual(graph.complete_job(2), [1])
+
+    def test_failed_job_skips_dependents(self):
+        """
+        Test that the transitive dependents of a failed job are dropped.
+        """
+        graph = JobGraph()
+        graph.add_job(1, _transformation("s3://b/src/a.zip", "s3://b/stage/"))
+        graph.add_job(2, _transformation("s3://b/stage/a.zip", "s3://b/stage2/"))
+        graph.add_job(3, _transformation("s3://b/stage2/a.xml", "s3://b/out/"))
+        graph.add_job(4, _transformation("s3://b/src/b.zip", "s3://b/other/"))
+        graph.validate()
+
+        self.assertEqual(graph.fail_job(1), [2, 3])
+        self.assertEqual(graph.ready_jobs(), [4])
+
+    def test_invalid_declarations(self):
+        """
+        Test that unknown ids, duplicate ids and cycles are rejected.
+        """
+        graph = JobGraph()
+        graph.add_job(1, _transformation("s3://b/a", "s3://b/x/", depends_on=["z"]))
+        with self.assertRaises(ValueError):
+            graph.validate()
+
+        graph = JobGraph()
+        graph.add_job(1, _transformation("s3://b/a", "s3://b/x/", id="a"))
+        with self.assertRaises(ValueError):
+            graph.add_job(2, _transformation("s3://b/b", "s3://b/y/", id="a"))
+
+        graph = JobGraph()
+        graph.add_job(
+            1, _transformation("s3://b/a", "s3://b/x/", id="a", depends_on=["b"])
+        )
+        graph.add_job(
+            2, _transformation("s3://b/b", "s3://b/y/", id="b", depends_on=["a"])
+        )
+        with self.assertRaises(ValueError):
+            graph.validate()
+
+    def test_streamed_jobs(self):
+        """
+        Test adding jobs while the earlier ones complete or fail.
+        """
+        graph = JobGraph()
+        self.assertTrue(
+            graph.add_streamed_job(1, _transformation("s3://b/src/a.zip", "s3://b/stage/"))
+        )
+        self.assertTrue(
+            graph.add_streamed_job(
+                2, _transformation("s3://b/stage/a.xml", "s3://b/out/", id="two")
+            )
+        )
+        self.assertEqual(graph.dependencies[2], {1})
+        self.assertEqual(graph.complete_job(1), [2])
+
+        # Assert completed jobs are forgotten and no longer dependencies
+        self.assertTrue(
+            graph.add_streamed_job(3, _transformation("s3://b/stage/b.xml", "s3://b/o/"))
+        )
+        self.assertEqual(graph.dependencies[3], set())
+        self.assertNotIn("s3://b/stage/", graph._jobs_by_destiny)
+
+        # Assert jobs depending on a failed job are failed as well
+        graph.fail_job(2)
+        self.assertFalse(
+            graph.add_streamed_job(
+                4, _transformation("s3://b/x", "s3://b/y/", depends_on=["two"])
+            )
+        )
+        self.assertFalse(
+            graph.add_streamed_job(5, _transformation("s3://b/out/a.csv", "s3://b/z/"))
+        )
+        self.assertNotIn(5, graph.transformations)
+
+        # Assert declared dependencies must name earlier jobs
+        with self.assertRaises(ValueError):
+            graph.add_streamed_job(
+                6, _transformation("s3://b/p", "s3://b/q/", depends_on=["later"])
+            )
+        self.assertEqual(sorted(graph.transformations), [3])
+
+
+class TestReadyQueue(unittest.TestCase):
+    """
+    Test cases for the ReadyQueue class.
+    """
+
+    def test_groups_popped_together(self):
+        """
+        Test that jobs of a group are popped with the first of them.
+        """
+        ready = ReadyQueue()
+        for job_id, key in ((5, "a"), (2, None), (3, "a"), (4, "b"), (1, "a")):
+            ready.push(job_id, key)
+        self.assertEqual(len(ready), 5)
+
+        self.assertEqual(ready.pop(), [1, 3, 5])
+        self.assertEqual(len(ready), 2)
+        self.assertEqual(ready.pop(), [2])
+
+        # Assert a group restarts once its jobs were popped
+        ready.push(6, "a")
+        self.assertEqual(ready.pop(), [4])
+        self.assertEqual(ready.pop(), [6])
+        self.assertFalse(ready)
+        with self.assertRaises(IndexError):
+            ready.pop()
+
+    def test_priority_and_admission(self):
+        """
+        Test that jobs are popped by priority and skipped when not admitted.
+        """
+        ready = ReadyQueue()
+        sizes = {1: 10, 2: 50, 3: 30, 4: 50, 5: 20}
+        for job_id, size in sizes.items():
+            ready.push(job_id, "a" if job_id in (3, 5) else None, -size)
+
+        # Assert the largest jobs come first, ties in job definition order
+        self.assertEqual(ready.pop(), [2])
+
+        # Assert groups too large are skipped, without being removed
+        def admit(job_ids):
+            return max(sizes[job_id] for job_id in job_ids) <= 30
+
+        self.assertEqual(ready.pop(admit), [3, 5])
+        self.assertEqual(ready.pop(admit), [1])
+        self.assertIsNone(ready.pop(admit))
+        self.assertEqual(len(ready), 1)
+        self.assertEqual(ready.pop(), [4])
+        self.assertFalse(ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the JobExecutor class.
+"""
+
+import os
+import threading
+import unittest
+
+from orchestrator.executor import JobExecutor
+
+
+def _current_pid():
+    """
+    Return the process id of the worker running the job.
+    """
+    return os.getpid()
+
+
+class TestJobExecutor(unittest.TestCase):
+    """
+    Test cases for the JobExecutor class.
+    """
+
+    def test_single_worker_runs_inline(self):
+        """
+        Test that a single worker runs jobs in the calling thread.
+        """
+        with JobExecutor(max_workers=1) as executor:
+            future = executor.submit(True, threading.get_ident, _current_pid)
+
+            # Assert the job already completed in the current thread
+            self.assertTrue(future.done())
+            self.assertEqual(future.result(), threading.get_ident())
+
+    def test_inline_exception_is_captured(self):
+        """
+        Test that an inline job failure is stored in its future.
+        """
+        def failing_job():
+            raise RuntimeError("boom")
+
+        with JobExecutor(max_workers=1) as executor:
+            future = executor.submit(False, failing_job, failing_job)
+
+            self.assertIsInstance(future.exception(), RuntimeError)
+
+    def test_auto_kind_routes_by_cpu_bound(self):
+        """
+        Test that the auto kind uses processes for CPU-bound jobs only.
+        """
+        with JobExecutor(max_workers=2, kind="auto") as executor:
+            self.assertEqual(executor.resolve_kind(True), "process")
+            self.assertEqual(executor.resolve_kind(False), "thread")
+
+            # Assert the CPU-bound job ran in a different process
+            future = executor.submit(True, _current_pid, _current_pid)
+            self.assertNotEqual(future.result(), os.getpid())
+
+            # Assert the I/O-bound job ran in a worker thread
+            future = executor.submit(False, threading.get_ident, _current_pid)
+            self.assertNotEqual(future.result(), threading.get_ident())
+
+    def test_invalid_settings(self):
+        """
+        Test that invalid settings are rejected.
+        """
+        with self.assertRaises(ValueError):
+            JobExecutor(max_workers=2, kind="gpu")
+        with self.assertRaises(ValueError):
+            JobExecutor(max_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests for the logging utilities.
+"""
+
+import io
+import json
+import logging
+import sys
+import unittest
+from unittest import mock
+
+from utils.logger import (
+    DEFAULT_DEBUG_RATE_LIMIT,
+    DebugRateLimitFilter,
+    configure_logging,
+    job_context,
+    setup_logger,
+    shutdown_logging,
+)
+
+
+class TestLogger(unittest.TestCase):
+    """
+    Test cases for the queue-based logging.
+    """
+
+    def setUp(self):
+        """
+        Send the log output to a buffer.
+        """
+        self.output = io.StringIO()
+        configure_logging(stream=self.output)
+
+    def tearDown(self):
+        """
+        Restore the default log output.
+        """
+        configure_logging(
+            level=logging.INFO,
+            json_format=False,
+            debug_rate_limit=DEFAULT_DEBUG_RATE_LIMIT,
+            stream=sys.stderr,
+        )
+
+    def read_output(self):
+        """
+        Wait for the listener to write the queued records and return them.
+        """
+        shutdown_logging()
+        return self.output.getvalue().splitlines()
+
+    def test_single_handler(self):
+        """
+        Test that setting up a logger twice writes each record once.
+        """
+        setup_logger("test_logger.single")
+        logger = setup_logger("test_logger.single")
+        self.assertEqual(len(logger.handlers), 1)
+
+        logger.info("Processed %d rows", 3)
+        lines = self.read_output()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("test_logger.single - INFO - Processed 3 rows", lines[0])
+
+    def test_json_format(self):
+        """
+        Test that records are written as JSON objects with their job.
+        """
+        configure_logging(json_format=True)
+        logger = setup_logger("test_logger.json")
+
+        with job_context(7):
+            logger.warning("Skipped %s", "member.xml")
+        logger.info("Done")
+
+        entries = [json.loads(line) for line in self.read_output()]
+        self.assertEqual(entries[0]["level"], "WARNING")
+        self.assertEqual(entries[0]["logger"], "test_logger.json")
+        self.assertEqual(entries[0]["message"], "Skipped member.xml")
+        self.assertEqual(entries[0]["job"], 7)
+        self.assertIsNone(entries[1]["job"])
+
+    def test_record_prepared_when_logged(self):
+        """
+        Test that the arguments and the exception are merged into the record
+        before the arguments change.
+        """
+        configure_logging(json_format=True)
+        logger = setup_logger("test_logger.prepared")
+
+        members = ["a.xml"]
+        logger.info("Extracted %s", members)
+        members.append("b.xml")
+        try:
+            raise ValueError("invalid row")
+        except ValueError:
+            logger.exception("Conversion of %s failed", members)
+        members.clear()
+
+        entries = [json.loads(line) for line in self.read_output()]
+        self.assertEqual(entries[0]["message"], "Extracted ['a.xml']")
+        self.assertEqual(
+            entries[1]["message"], "Conversion of ['a.xml', 'b.xml'] failed"
+        )
+        self.assertIn("ValueError: invalid row", entries[1]["exception"])
+
+    def test_debug_rate_limit(self):
+        """
+        Test that debug records of a call site are rate limited.
+        """
+        configure_logging(debug_rate_limit=5)
+        logger = setup_logger("test_logger.debug", logging.DEBUG)
+
+        for i in range(100):
+            logger.debug("Row %d", i)
+        for i in range(3):
+            logger.info("Member %d", i)
+
+        lines = self.read_output()
+        self.assertLessEqual(sum("Row" in line for line in lines), 10)
+        self.assertEqual(sum("Member" in line for line in lines), 3)
+
+    def test_debug_rate_limit_disabled(self):
+        """
+        Test that a rate limit of 0 lets every debug record through.
+        """
+        configure_logging(debug_rate_limit=0)
+        logger = setup_logger("test_logger.unlimited", logging.DEBUG)
+
+        for i in range(100):
+            logger.debug("Row %d", i)
+
+        self.assertEqual(len(self.read_output()), 100)
+
+    def test_debug_rate_limit_literal_percent(self):
+        """
+        Test that the dropped count is added to messages without arguments.
+        """
+        rate_limit = DebugRateLimitFilter(rate=1)
+        records = [
+            logging.LogRecord(
+                "test_logger", logging.DEBUG, "loop.py", 10, "100% done", (), None
+            )
+            for _ in range(3)
+        ]
+
+        with mock.patch("utils.logger.time.monotonic", side_effect=[0, 0, 1]):
+            let_through = [rate_limit.filter(record) for record in records]
+
+        self.assertEqual(let_through, [True, False, True])
+        self.assertEqual(
+            records[2].getMessage(), "100% done (1 similar messages dropped)"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
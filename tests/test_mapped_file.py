@@ -0,0 +1,109 @@
+"""
+Tests for the MappedFile class.
+"""
+
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from utils.mapped_file import MappedFile
+from utils.metrics import JobMetrics
+
+
+class TestMappedFile(unittest.TestCase):
+    """
+    Test cases for the MappedFile class.
+    """
+
+    def setUp(self):
+        """
+        Create a file to map.
+        """
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "data.bin"
+        self.data = b"".join(b"<row>%d</row>" % i for i in range(1000))
+        self.path.write_bytes(self.data)
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def test_read_like_a_file(self):
+        """
+        Test that reads and seeks behave like a regular binary file.
+        """
+        metrics = JobMetrics()
+        with MappedFile(self.path, metrics) as mapped, open(self.path, "rb") as f:
+            for offset, whence, size in ((0, 0, 10), (5, 1, 100), (-20, 2, 50)):
+                self.assertEqual(mapped.seek(offset, whence), f.seek(offset, whence))
+                self.assertEqual(mapped.read(size), f.read(size))
+                self.assertEqual(mapped.tell(), f.tell())
+
+            mapped.seek(10)
+            buffer = bytearray(8)
+            self.assertEqual(mapped.readinto(buffer), 8)
+            self.assertEqual(bytes(buffer), self.data[10:18])
+            self.assertEqual(mapped.read(), self.data[18:])
+            self.assertEqual(mapped.read(10), b"")
+
+        self.assertTrue(mapped.closed)
+        self.assertEqual(metrics.to_dict()["bytes_read"], 10 + 100 + 20 + len(self.data) - 10)
+
+    def test_views(self):
+        """
+        Test that views cover the requested ranges without copies.
+        """
+        with MappedFile(self.path) as mapped:
+            views = list(mapped.iter_views(100, 1000, 256))
+            self.assertTrue(all(isinstance(view, memoryview) for view in views))
+            self.assertEqual([len(view) for view in views], [256, 256, 256, 132])
+            self.assertEqual(b"".join(views), self.data[100:1000])
+            self.assertEqual(b"".join(mapped.iter_views(0, None, 4096)), self.data)
+
+            # Assert views outliving the file keep the pages readable
+            mapped.seek(0)
+            view = mapped.read_view(5)
+        self.assertEqual(view.tobytes(), b"<row>")
+
+    def test_release_read_pages(self):
+        """
+        Test that the pages dropped after sequential reads can be read again.
+        """
+        with mock.patch("utils.mapped_file.RELEASE_SIZE", 1), MappedFile(
+            self.path
+        ) as mapped:
+            views = list(mapped.iter_views(0, None, 1024))
+            self.assertGreater(mapped._released, 0)
+            self.assertEqual(b"".join(views), self.data)
+            self.assertEqual(mapped.find(b"<row>5</row>"), self.data.find(b"<row>5</row>"))
+
+    def test_find(self):
+        """
+        Test searching the mapped file.
+        """
+        with MappedFile(self.path) as mapped:
+            self.assertEqual(mapped.find(b"<row>5</row>"), self.data.find(b"<row>5</row>"))
+            self.assertEqual(mapped.find(b"<row>", 1, 20), self.data.find(b"<row>", 1, 20))
+            self.assertEqual(mapped.rfind(b"</"), self.data.rfind(b"</"))
+            self.assertEqual(mapped.find(b"missing"), -1)
+            self.assertEqual(mapped.byte_at(1), ord("r"))
+
+    def test_seek_errors(self):
+        """
+        Test that invalid seeks are rejected.
+        """
+        with MappedFile(self.path) as mapped:
+            with self.assertRaises(ValueError):
+                mapped.seek(-1)
+            with self.assertRaises(ValueError):
+                mapped.seek(0, 3)
+            self.assertEqual(mapped.seek(0, io.SEEK_END), len(self.data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,8 @@ from pathlib import Path
 import zipfile
 
 from main import TransformationEngine
+from orchestrator.dag import ReadyQueue
+from storage.local_storage import LocalStorageBackend
 
 
 class TestTransformationEngine(unittest.TestCase):
@@ -189,5 +191,381 @@ class TestTransformationEngine(unittest.TestCase):
         self.assertTrue(csv_file.exists())
 
 
+    def test_run_complete_job_in_parallel(self):
+        """
+        Test running a complete job with a pool of worker threads.
+        """
+        # Initialize engine with two thread workers
+        engine = TransformationEngine(self.job_file, max_workers=2, executor="thread")
+
+        # Patch the local_origin and local_destiny properties for testing
+        def monkey_patch_parser(parser):
+            if "zip" in parser.origin.lower():
+                parser.local_origin = self.zip_file
+            else:
+                parser.local_origin = self.xml_file
+            parser.local_destiny = self.dest_dir
+            return parser
+
+        # Patch the factory to use our test files
+        original_create_parser = engine.parser_factory.create_parser
+
+        def patched_create_parser(*args, **kwargs):
+            parser = original_create_parser(*args, **kwargs)
+            return monkey_patch_parser(parser)
+
+        engine.parser_factory.create_parser = patched_create_parser
+
+        # Run the job
+        result = engine.run()
+
+        # Assert all results were gathered into the counters
+        self.assertTrue(result)
+        self.assertEqual(engine.total_jobs, 2)
+        self.assertEqual(engine.successful_jobs, 2)
+        self.assertEqual(engine.failed_jobs, 0)
+        self.assertTrue((self.dest_dir / "test.txt").exists())
+        self.assertTrue((self.dest_dir / "test.csv").exists())
+
+    def test_run_invalid_executor(self):
+        """
+        Test running a job with an unknown executor kind.
+        """
+        engine = TransformationEngine(self.job_file, max_workers=2, executor="gpu")
+
+        # Assert the job fails without running any transformation
+        self.assertFalse(engine.run())
+        self.assertEqual(engine.successful_jobs, 0)
+
+    def test_failed_dependency_skips_dependents(self):
+        """
+        Test that a job is not executed when a job it depends on fails.
+        """
+        # Make the XML conversion depend on a transformation that fails
+        self.job_data["transformations"][0]["id"] = "unzip"
+        self.job_data["transformations"][0]["object"]["classname"] = "Unknown"
+        self.job_data["transformations"][1]["depends_on"] = ["unzip"]
+        with open(self.job_file, "w", encoding="utf-8") as f:
+            json.dump(self.job_data, f)
+
+        engine = TransformationEngine(self.job_file)
+        result = engine.run()
+
+        # Assert both jobs were counted as failed and nothing was converted
+        self.assertFalse(result)
+        self.assertEqual(engine.successful_jobs, 0)
+        self.assertEqual(engine.failed_jobs, 2)
+        self.assertFalse((self.dest_dir / "test.csv").exists())
+
+    def test_rerun_with_cache(self):
+        """
+        Test that unchanged transformations are skipped on the second run.
+        """
+        cache_dir = self.temp_dir / "cache"
+
+        def run_engine():
+            engine = TransformationEngine(self.job_file, cache_dir=cache_dir)
+
+            # Patch the factory to use our test files
+            original_create_parser = engine.parser_factory.create_parser
+
+            def patched_create_parser(*args, **kwargs):
+                parser = original_create_parser(*args, **kwargs)
+                if "zip" in parser.origin.lower():
+                    parser.local_origin = self.zip_file
+                else:
+                    parser.local_origin = self.xml_file
+                parser.local_destiny = self.dest_dir
+                return parser
+
+            engine.parser_factory.create_parser = patched_create_parser
+            self.assertTrue(engine.run())
+            return engine
+
+        # Assert the first run executes every job
+        engine = run_engine()
+        self.assertEqual(engine.successful_jobs, 2)
+        self.assertEqual(engine.cached_jobs, 0)
+
+        # Assert the second run skips every job
+        engine = run_engine()
+        self.assertEqual(engine.successful_jobs, 2)
+        self.assertEqual(engine.cached_jobs, 2)
+
+        # Assert a changed origin is processed again
+        self.xml_file.write_text(self.xml_content.replace("1001", "10010"))
+        engine = run_engine()
+        self.assertEqual(engine.cached_jobs, 1)
+
+    def test_run_report(self):
+        """
+        Test exporting the metrics of each job as JSON and Prometheus files.
+        """
+        report_path = self.temp_dir / "report.json"
+        prometheus_path = self.temp_dir / "metrics.prom"
+        engine = TransformationEngine(
+            self.job_file, report_path=report_path, prometheus_path=prometheus_path
+        )
+
+        # Patch the factory to use our test files
+        original_create_parser = engine.parser_factory.create_parser
+
+        def patched_create_parser(*args, **kwargs):
+            parser = original_create_parser(*args, **kwargs)
+            if "zip" in parser.origin.lower():
+                parser.local_origin = self.zip_file
+            else:
+                parser.local_origin = self.xml_file
+            parser.local_destiny = self.dest_dir
+            return parser
+
+        engine.parser_factory.create_parser = patched_create_parser
+        self.assertTrue(engine.run())
+
+        # Assert the report holds the metrics of both jobs
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["summary"]["successful_jobs"], 2)
+        zip_job, xml_job = report["jobs"]
+        self.assertEqual(zip_job["metrics"]["members_extracted"], 1)
+        self.assertGreater(zip_job["metrics"]["bytes_read"], 0)
+        self.assertEqual(xml_job["metrics"]["rows_emitted"], 2)
+        self.assertEqual(
+            xml_job["metrics"]["bytes_written"],
+            (self.dest_dir / "test.csv").stat().st_size,
+        )
+        self.assertGreater(xml_job["metrics"]["wall_time_s"], 0)
+        self.assertIn("transformation_job_rows_emitted", prometheus_path.read_text())
+
+    def test_run_job_stream(self):
+        """
+        Test running a JSON Lines job definition read while its jobs run.
+        """
+        job_file = self.temp_dir / "test_job.jsonl"
+        lines = [{"settings": {"report_path": str(self.temp_dir / "report.json")}}]
+        lines += self.job_data["transformations"]
+        lines.append({"object": {"origin": "s3://test-bucket/source/test.xml"}})
+        with open(job_file, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line) + "\n")
+            f.write("not json\n")
+
+        engine = TransformationEngine(job_file)
+
+        # Record how far the job definition was read when each job started
+        read_counts = []
+        lines_read = 0
+        read_job_stream = engine._read_job_stream
+
+        def counting_read_job_stream():
+            nonlocal lines_read
+            for item in read_job_stream():
+                lines_read += 1
+                yield item
+
+        engine._read_job_stream = counting_read_job_stream
+
+        original_create_parser = engine.parser_factory.create_parser
+
+        def patched_create_parser(*args, **kwargs):
+            read_counts.append(lines_read)
+            parser = original_create_parser(*args, **kwargs)
+            if "zip" in parser.origin.lower():
+                parser.local_origin = self.zip_file
+            else:
+                parser.local_origin = self.xml_file
+            parser.local_destiny = self.dest_dir
+            return parser
+
+        engine.parser_factory.create_parser = patched_create_parser
+
+        # Assert the incomplete and invalid lines failed without stopping the run
+        self.assertFalse(engine.run())
+        self.assertEqual(engine.total_jobs, 4)
+        self.assertEqual(engine.successful_jobs, 2)
+        self.assertEqual(engine.failed_jobs, 2)
+        self.assertTrue((self.dest_dir / "test.csv").exists())
+
+        # Assert each job started before the next line was read
+        self.assertEqual(read_counts, [2, 3])
+
+        # Assert the settings line was applied
+        with open(self.temp_dir / "report.json", "r", encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(report["summary"]["total_jobs"], 4)
+        self.assertEqual(len(report["jobs"]), 4)
+
+    def test_jobs_of_same_origin_share_read(self):
+        """
+        Test that conversions of the same origin read it only once.
+        """
+        outputs = [
+            ("csv", {}),
+            ("gz", {"compression": "gzip"}),
+            ("plain", {"streaming": True}),
+        ]
+        transformations = [
+            {
+                "object": {
+                    "origin": "s3://test-bucket/source/test.xml",
+                    "destiny": f"s3://test-bucket/dest/{name}/",
+                    "classname": "XmlToCsvParser",
+                },
+                "kwargs": kwargs,
+            }
+            for name, kwargs in outputs
+        ]
+
+        def run_engine(settings):
+            with open(self.job_file, "w", encoding="utf-8") as f:
+                json.dump({"settings": settings, "transformations": transformations}, f)
+            engine = TransformationEngine(self.job_file)
+            opened = []
+            original_create_parser = engine.parser_factory.create_parser
+
+            def patched_create_parser(*args, **kwargs):
+                parser = original_create_parser(*args, **kwargs)
+                parser.local_origin = self.xml_file
+                parser.local_destiny = self.dest_dir / parser.destiny.split("/")[-2]
+                open_input = parser.open_input
+                parser.open_input = lambda: opened.append(parser) or open_input()
+                return parser
+
+            engine.parser_factory.create_parser = patched_create_parser
+            self.assertTrue(engine.run())
+            return engine, len(opened)
+
+        engine, reads = run_engine({})
+        self.assertEqual(reads, 1)
+        self.assertEqual(engine.successful_jobs, 3)
+        self.assertEqual(
+            [result["metrics"]["rows_emitted"] for result in engine.job_results],
+            [2, 2, 2],
+        )
+        self.assertEqual(
+            sum(result["metrics"]["bytes_read"] for result in engine.job_results),
+            self.xml_file.stat().st_size,
+        )
+        shared_outputs = [
+            (self.dest_dir / "csv" / "test.csv").read_bytes(),
+            (self.dest_dir / "gz" / "test.csv.gz").read_bytes(),
+        ]
+
+        # Assert the outputs match the ones of separate reads
+        engine, reads = run_engine({"coalesce_reads": False})
+        self.assertEqual(reads, 3)
+        self.assertEqual(
+            shared_outputs,
+            [
+                (self.dest_dir / "csv" / "test.csv").read_bytes(),
+                (self.dest_dir / "gz" / "test.csv.gz").read_bytes(),
+            ],
+        )
+        self.assertEqual(
+            shared_outputs[0], (self.dest_dir / "plain" / "test.csv").read_bytes()
+        )
+
+    def test_storage_object_with_process_workers(self):
+        """
+        Test that a storage backend object is never silently replaced by the
+        default backend in process workers.
+        """
+        self.job_data["transformations"] = self.job_data["transformations"][1:]
+        with open(self.job_file, "w", encoding="utf-8") as f:
+            json.dump(self.job_data, f)
+        storage = LocalStorageBackend(self.s3_dir)
+
+        # Assert the process executor is rejected
+        engine = TransformationEngine(
+            self.job_file, max_workers=2, executor="process", storage=storage
+        )
+        self.assertFalse(engine.run())
+        self.assertFalse((self.dest_dir / "test.csv").exists())
+
+        # Assert the auto executor runs the CPU-bound job on a thread
+        engine = TransformationEngine(self.job_file, max_workers=2, storage=storage)
+        self.assertTrue(engine.run())
+        self.assertTrue((self.dest_dir / "test.csv").exists())
+
+    def test_largest_first_schedule(self):
+        """
+        Test that the longest estimated jobs run first and that the cost
+        model learns from them.
+        """
+        transformations = []
+        for name, count in (("small", 1), ("large", 200), ("medium", 20)):
+            rows = "".join(
+                f"<row><id>{i}</id><name>item {i}</name></row>" for i in range(count)
+            )
+            (self.source_dir / f"{name}.xml").write_text(f"<rows>{rows}</rows>")
+            transformations.append(
+                {
+                    "object": {
+                        "origin": f"s3://test-bucket/source/{name}.xml",
+                        "destiny": f"s3://test-bucket/dest/{name}/",
+                        "classname": "XmlToCsvParser",
+                    },
+                }
+            )
+
+        cache_dir = self.temp_dir / "cache"
+        for schedule, expected in (
+            ("largest_first", ["large", "medium", "small"]),
+            ("fifo", ["small", "large", "medium"]),
+        ):
+            with open(self.job_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "settings": {
+                            "schedule": schedule,
+                            "memory_budget": 1024 * 1024 * 1024,
+                        },
+                        "transformations": transformations,
+                    },
+                    f,
+                )
+            engine = TransformationEngine(
+                self.job_file,
+                storage=LocalStorageBackend(self.s3_dir),
+                cache_dir=cache_dir,
+            )
+            self.assertTrue(engine.run())
+
+            # Assert the jobs ran one at a time in the order of the schedule
+            self.assertEqual(
+                [result["origin"].split("/")[-1] for result in engine.job_results],
+                [f"{name}.xml" for name in expected],
+            )
+
+        # Assert the ratios measured on the XmlToCsvParser jobs were saved
+        with open(cache_dir / "cost_model.json", encoding="utf-8") as f:
+            ratios = json.load(f)["XmlToCsvParser"]
+        self.assertEqual(ratios["samples"], 3)
+        self.assertGreater(ratios["seconds_per_byte"], 0)
+
+    def test_memory_budget_admission(self):
+        """
+        Test that ready jobs are only started while their estimated memory
+        fits in the budget.
+        """
+        engine = TransformationEngine(None, memory_budget=100)
+        engine._configure_scheduling({}, None)
+        estimates = {1: 80, 2: 30, 3: 10, 4: 150}
+        ready = ReadyQueue()
+        for job_id, memory in estimates.items():
+            engine._estimates[job_id] = {"memory_bytes": memory}
+            ready.push(job_id)
+
+        # Assert smaller jobs are started while a larger one does not fit
+        self.assertEqual(engine._pop_ready(ready, {}), [1])
+        self.assertEqual(engine._pop_ready(ready, {"a": [1]}), [3])
+        self.assertIsNone(engine._pop_ready(ready, {"a": [1], "b": [3]}))
+        self.assertEqual(engine._pop_ready(ready, {"b": [3]}), [2])
+
+        # Assert a job above the budget runs once nothing else is running
+        self.assertIsNone(engine._pop_ready(ready, {"b": [3]}))
+        self.assertEqual(engine._pop_ready(ready, {}), [4])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests for the ParserRegistry class.
+"""
+
+import subprocess
+import sys
+import unittest
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from unittest import mock
+
+from factory.parser_factory import ParserFactory
+from factory.parser_registry import (
+    BUILTIN_PARSERS,
+    PARSER_ENTRY_POINT_GROUP,
+    ParserRegistry,
+)
+from parsers.zip_file_parser import ZipFileParser
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestParserRegistry(unittest.TestCase):
+    """
+    Test cases for the ParserRegistry class.
+    """
+
+    def test_builtin_parsers(self):
+        """
+        Test that every built-in parser can be loaded.
+        """
+        registry = ParserRegistry(discover_entry_points=False)
+        for name in BUILTIN_PARSERS:
+            self.assertEqual(registry.get(name).__name__, name)
+
+    def test_parsers_are_imported_on_first_use(self):
+        """
+        Test that creating a factory imports no parser module.
+        """
+        code = (
+            "import sys\n"
+            "from factory.parser_factory import ParserFactory\n"
+            "factory = ParserFactory()\n"
+            "assert not [m for m in sys.modules if m.startswith('parsers')]\n"
+            "factory.get_parser_class('ZipFileParser')\n"
+            "assert 'parsers.zip_file_parser' in sys.modules\n"
+            "assert 'parsers.xml_to_csv_parser' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+
+    def test_entry_point_discovery(self):
+        """
+        Test that parsers registered by installed packages are found.
+        """
+        entry_points = [
+            EntryPoint(
+                "ExternalParser",
+                "parsers.zip_file_parser:ZipFileParser",
+                PARSER_ENTRY_POINT_GROUP,
+            ),
+            # Built-in names cannot be overridden by an entry point
+            EntryPoint("XmlToCsvParser", "json:JSONDecoder", PARSER_ENTRY_POINT_GROUP),
+        ]
+        with mock.patch(
+            "factory.parser_registry._parser_entry_points", return_value=entry_points
+        ) as discover:
+            registry = ParserRegistry()
+
+            # Assert the entry points are only read for unknown names
+            registry.get("ZipFileParser")
+            discover.assert_not_called()
+
+            self.assertIs(registry.get("ExternalParser"), ZipFileParser)
+            self.assertEqual(registry.get("XmlToCsvParser").__name__, "XmlToCsvParser")
+            self.assertIn("ExternalParser", registry.names())
+            discover.assert_called_once()
+
+    def test_register(self):
+        """
+        Test registering parsers by class and by reference.
+        """
+        registry = ParserRegistry(discover_entry_points=False)
+        registry.register("Unzip", ZipFileParser)
+        registry.register("Lazy", "parsers.zip_file_parser:ZipFileParser")
+
+        self.assertIs(registry.get("Unzip"), ZipFileParser)
+        self.assertIs(registry.get("Lazy"), ZipFileParser)
+
+    def test_invalid_parsers(self):
+        """
+        Test that unknown, missing and non parser references are rejected.
+        """
+        registry = ParserRegistry(discover_entry_points=False)
+        registry.register("Missing", "parsers.missing_module:MissingParser")
+        registry.register("NotAParser", "json:JSONDecoder")
+
+        for name in ("Unknown", "Missing", "NotAParser"):
+            with self.assertRaises(ValueError):
+                registry.get(name)
+
+        # Assert the factory reports them the same way
+        factory = ParserFactory(registry)
+        with self.assertRaises(ValueError):
+            factory.create_parser("NotAParser", "s3://a/b.zip", "s3://a/c/")
+
+
+if __name__ == "__main__":
+    unittest.main()
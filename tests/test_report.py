@@ -0,0 +1,81 @@
+"""
+Tests for the RunReport class.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from orchestrator.report import RunReport
+
+
+class TestRunReport(unittest.TestCase):
+    """
+    Test cases for the RunReport class.
+    """
+
+    def setUp(self):
+        """
+        Set up test environment before each test case.
+        """
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.report = RunReport(
+            "job.json",
+            {"successful_jobs": 1, "failed_jobs": 1, "wall_time_s": 1.5},
+            [
+                {
+                    "job_id": 2,
+                    "classname": "ZipFileParser",
+                    "origin": 's3://b/"odd".zip',
+                    "status": "skipped",
+                    "metrics": {},
+                },
+                {
+                    "job_id": 1,
+                    "classname": "XmlToCsvParser",
+                    "origin": "s3://b/a.xml",
+                    "status": "succeeded",
+                    "metrics": {"wall_time_s": 0.5, "rows_emitted": 10},
+                },
+            ],
+        )
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def test_write_json(self):
+        """
+        Test writing the report as JSON, with jobs in job definition order.
+        """
+        path = self.temp_dir / "reports" / "run.json"
+        self.report.write_json(path)
+
+        data = json.loads(path.read_text())
+        self.assertEqual(data["summary"]["failed_jobs"], 1)
+        self.assertEqual([job["job_id"] for job in data["jobs"]], [1, 2])
+
+    def test_to_prometheus(self):
+        """
+        Test rendering the report in the Prometheus text format.
+        """
+        content = self.report.to_prometheus()
+
+        self.assertIn('transformation_run_jobs{status="failed"} 1', content)
+        self.assertIn("transformation_run_wall_seconds 1.5", content)
+        self.assertIn(
+            'transformation_job_rows_emitted{job_id="1",classname="XmlToCsvParser",'
+            'origin="s3://b/a.xml",status="succeeded"} 10',
+            content,
+        )
+        # Jobs without a metric are not exported for it
+        self.assertNotIn('origin="s3://b/\\"odd\\".zip"', content)
+        self.assertIn("# TYPE transformation_job_cpu_seconds gauge", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
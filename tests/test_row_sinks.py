@@ -0,0 +1,122 @@
+"""
+Tests for the row sinks.
+"""
+
+import csv
+import io
+import unittest
+
+from parsers.row_sinks import CSV_BATCH_ROWS, CsvRowSink
+
+
+def dict_writer_output(field_names, rows):
+    """
+    Encode rows with csv.DictWriter, the reference CSV output.
+    """
+    output = io.BytesIO()
+    text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    writer = csv.DictWriter(text, fieldnames=field_names)
+    writer.writeheader()
+    for fields in rows:
+        writer.writerow(dict(fields))
+    text.flush()
+    return output.getvalue()
+
+
+def sink_output(field_names, rows, **options):
+    """
+    Encode rows with the fast path of CsvRowSink.
+    """
+    output = io.BytesIO()
+    sink = CsvRowSink(output, field_names, **options)
+    for fields in rows:
+        sink.write_fields(fields)
+    sink.close()
+    return output.getvalue()
+
+
+class TestCsvRowSink(unittest.TestCase):
+    """
+    Test cases for the CsvRowSink class.
+    """
+
+    def test_matches_dict_writer(self):
+        """
+        Test that the batched encoder output is byte identical to DictWriter.
+        """
+        field_names = ["id", "text", "empty"]
+        rows = []
+        for i in range(CSV_BATCH_ROWS * 2 + 3):
+            rows.append(
+                [
+                    ("id", str(i)),
+                    ("text", f'quote " comma , newline \n café {i}'),
+                    ("empty", None),
+                ]
+            )
+        # Missing fields, reordered fields and repeated fields
+        rows.append([("text", "only text")])
+        rows.append([("empty", "e"), ("id", "x")])
+        rows.append([("id", "first"), ("id", "last")])
+
+        self.assertEqual(
+            sink_output(field_names, rows), dict_writer_output(field_names, rows)
+        )
+
+    def test_single_empty_column(self):
+        """
+        Test that empty rows of a single column stay distinguishable.
+        """
+        rows = [[("value", None)], [("value", "")], []]
+        self.assertEqual(
+            sink_output(["value"], rows), dict_writer_output(["value"], rows)
+        )
+
+    def test_repeated_field_names(self):
+        """
+        Test that a header with a repeated name falls back to DictWriter.
+        """
+        field_names = ["a", "b", "a"]
+        rows = [[("a", "1"), ("b", "2")], [("b", "3")]]
+        self.assertEqual(
+            sink_output(field_names, rows), dict_writer_output(field_names, rows)
+        )
+
+    def test_mixed_row_kinds_keep_order(self):
+        """
+        Test that dict rows are written after the pending batched rows.
+        """
+        output = io.BytesIO()
+        sink = CsvRowSink(output, ["id"])
+        sink.write_fields([("id", "1")])
+        sink.write_row({"id": "2"})
+        sink.write_fields([("id", "3")])
+        sink.close()
+
+        self.assertEqual(output.getvalue(), b"id\r\n1\r\n2\r\n3\r\n")
+        self.assertFalse(output.closed)
+
+    def test_unknown_field(self):
+        """
+        Test that a field missing from the header is rejected.
+        """
+        sink = CsvRowSink(io.BytesIO(), ["id"])
+        with self.assertRaises(ValueError):
+            sink.write_fields([("id", "1"), ("extra", "2")])
+
+    def test_abort_on_error(self):
+        """
+        Test that a sink left by an exception aborts its compression.
+        """
+        output = io.BytesIO()
+        with self.assertRaises(ValueError):
+            with CsvRowSink(output, ["id"], compression="gzip") as sink:
+                sink.write_fields([("id", "1")])
+                sink.write_fields([("extra", "2")])
+
+        self.assertTrue(sink._compressor.closed)
+        self.assertFalse(output.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the CostModel class.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from orchestrator.scheduler import DEFAULT_SECONDS_PER_BYTE, CostModel
+from parsers.xml_to_csv_parser import (
+    STREAMING_MEMORY_ESTIMATE,
+    TREE_MEMORY_RATIO,
+    XmlToCsvParser,
+)
+from parsers.zip_file_parser import ZipFileParser
+
+
+class TestCostModel(unittest.TestCase):
+    """
+    Test cases for the CostModel class.
+    """
+
+    def setUp(self):
+        """
+        Set up test environment before each test case.
+        """
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "cost_model.json"
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def test_priors(self):
+        """
+        Test the estimates of parser classes without measured jobs.
+        """
+        model = CostModel()
+        size = 100 * 1024 * 1024
+
+        estimate = model.estimate("XmlToCsvParser", XmlToCsvParser, size, {})
+        self.assertEqual(estimate["seconds"], size * DEFAULT_SECONDS_PER_BYTE)
+        self.assertEqual(estimate["memory_bytes"], size * TREE_MEMORY_RATIO)
+
+        # Assert incremental parsing and extraction do not follow the size
+        estimate = model.estimate(
+            "XmlToCsvParser", XmlToCsvParser, size, {"streaming": True}
+        )
+        self.assertEqual(estimate["memory_bytes"], STREAMING_MEMORY_ESTIMATE)
+        estimate = model.estimate(
+            "ZipFileParser", ZipFileParser, size, {"extract_workers": 4}
+        )
+        self.assertEqual(estimate["memory_bytes"], 4 * 1024 * 1024)
+
+    def test_learn_and_save(self):
+        """
+        Test that measured jobs update the ratios of their class, which are
+        loaded back by the next model.
+        """
+        model = CostModel(self.path)
+        estimate = model.estimate("XmlToCsvParser", XmlToCsvParser, 1000, {})
+        model.observe(
+            "XmlToCsvParser",
+            estimate,
+            {"wall_time_s": 2.0, "memory_growth_bytes": 4 * estimate["memory_bytes"]},
+        )
+        model.observe("XmlToCsvParser", estimate, {"wall_time_s": 4.0})
+        model.save()
+
+        model = CostModel(self.path)
+        ratios = model.ratios["XmlToCsvParser"]
+        self.assertEqual(ratios["samples"], 2)
+        self.assertAlmostEqual(ratios["seconds_per_byte"], 0.0026)
+        self.assertEqual(ratios["memory_factor"], 4)
+
+        estimate = model.estimate("XmlToCsvParser", XmlToCsvParser, 500, {})
+        self.assertAlmostEqual(estimate["seconds"], 1.3)
+        self.assertEqual(estimate["memory_bytes"], 500 * TREE_MEMORY_RATIO * 4)
+
+        # Assert an invalid file leaves the priors
+        self.path.write_text(json.dumps(["invalid"]))
+        self.assertEqual(CostModel(self.path).ratios, {})
+
+    def test_learn_memory_bound(self):
+        """
+        Test that jobs staying under the peak RSS only lower a memory factor
+        above their bound.
+        """
+        model = CostModel()
+        estimate = model.estimate("XmlToCsvParser", XmlToCsvParser, 1000, {})
+        prior_memory = estimate["prior_memory_bytes"]
+        model.observe(
+            "XmlToCsvParser", estimate, {"memory_growth_bytes": 4 * prior_memory}
+        )
+
+        model.observe(
+            "XmlToCsvParser", estimate, {"memory_growth_max_bytes": 8 * prior_memory}
+        )
+        self.assertEqual(model.ratios["XmlToCsvParser"]["memory_factor"], 4)
+
+        model.observe(
+            "XmlToCsvParser", estimate, {"memory_growth_max_bytes": 2 * prior_memory}
+        )
+        self.assertAlmostEqual(model.ratios["XmlToCsvParser"]["memory_factor"], 3.4)
+        self.assertEqual(model.ratios["XmlToCsvParser"]["samples"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Tests for the storage backends.
+"""
+
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from factory.storage_factory import StorageFactory
+from storage.local_storage import LocalStorageBackend
+from storage.memory_storage import MemoryStorageBackend
+
+
+class StorageBackendTests:
+    """
+    Test cases shared by every storage backend.
+    """
+
+    def create_storage(self):
+        """
+        Create the backend under test.
+        """
+        raise NotImplementedError
+
+    def setUp(self):
+        """
+        Set up test environment before each test case.
+        """
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.storage = self.create_storage()
+
+        with self.storage.open_write("s3://bucket/dir/data.bin") as f:
+            f.write(b"0123456789")
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def test_read_object(self):
+        """
+        Test streaming and ranged reads.
+        """
+        self.assertTrue(self.storage.exists("s3://bucket/dir/data.bin"))
+        self.assertFalse(self.storage.exists("s3://bucket/dir/missing.bin"))
+        self.assertEqual(self.storage.size("s3://bucket/dir/data.bin"), 10)
+
+        with self.storage.open_read("s3://bucket/dir/data.bin") as f:
+            self.assertEqual(f.read(), b"0123456789")
+        self.assertEqual(
+            self.storage.read_range("s3://bucket/dir/data.bin", 3, 4), b"3456"
+        )
+        self.assertEqual(
+            self.storage.read_range("s3://bucket/dir/data.bin", 8, 10), b"89"
+        )
+
+    def test_range_reader_seek(self):
+        """
+        Test the seekable stream backed by ranged reads.
+        """
+        with self.storage.open_range_reader(
+            "s3://bucket/dir/data.bin", buffer_size=4
+        ) as f:
+            f.seek(-3, io.SEEK_END)
+            self.assertEqual(f.read(), b"789")
+            f.seek(2)
+            self.assertEqual(f.read(3), b"234")
+            self.assertEqual(f.tell(), 5)
+
+    def test_list(self):
+        """
+        Test listing objects under a prefix.
+        """
+        with self.storage.open_write("s3://bucket/dir/sub/other.bin") as f:
+            f.write(b"x")
+        with self.storage.open_write("s3://bucket/dirty.bin") as f:
+            f.write(b"x")
+
+        self.assertEqual(
+            self.storage.list("s3://bucket/dir/"),
+            ["s3://bucket/dir/data.bin", "s3://bucket/dir/sub/other.bin"],
+        )
+        self.assertEqual(
+            self.storage.list("s3://bucket/dir"),
+            [
+                "s3://bucket/dir/data.bin",
+                "s3://bucket/dir/sub/other.bin",
+                "s3://bucket/dirty.bin",
+            ],
+        )
+
+    def test_multipart_upload(self):
+        """
+        Test assembling an object from parts uploaded out of order.
+        """
+        upload_id = self.storage.create_multipart_upload("s3://bucket/parts.bin")
+        self.storage.upload_part(upload_id, 2, b"world")
+        self.storage.upload_part(upload_id, 1, b"hello ")
+        self.assertFalse(self.storage.exists("s3://bucket/parts.bin"))
+
+        self.storage.complete_multipart_upload(upload_id)
+        with self.storage.open_read("s3://bucket/parts.bin") as f:
+            self.assertEqual(f.read(), b"hello world")
+
+        # Aborted uploads leave nothing behind
+        upload_id = self.storage.create_multipart_upload("s3://bucket/gone.bin")
+        self.storage.upload_part(upload_id, 1, b"data")
+        self.storage.abort_multipart_upload(upload_id)
+        self.assertFalse(self.storage.exists("s3://bucket/gone.bin"))
+        self.assertEqual(self.storage.list("s3://bucket/g"), [])
+
+    def test_failed_write_is_not_published(self):
+        """
+        Test that a write interrupted by an error does not create the object.
+        """
+        with self.assertRaises(RuntimeError):
+            with self.storage.open_write("s3://bucket/broken.bin") as f:
+                f.write(b"partial")
+                raise RuntimeError("boom")
+        self.assertFalse(self.storage.exists("s3://bucket/broken.bin"))
+        self.assertEqual(self.storage.list("s3://bucket/b"), [])
+
+
+class TestLocalStorageBackend(StorageBackendTests, unittest.TestCase):
+    """
+    Test cases for the LocalStorageBackend class.
+    """
+
+    def create_storage(self):
+        return LocalStorageBackend(self.temp_dir)
+
+    def test_local_path(self):
+        """
+        Test that objects are stored under the base directory.
+        """
+        self.assertEqual(
+            self.storage.local_path("s3://bucket/dir/data.bin"),
+            self.temp_dir / "bucket" / "dir" / "data.bin",
+        )
+        with self.assertRaises(ValueError):
+            self.storage.local_path("/bucket/dir/data.bin")
+
+
+class TestMemoryStorageBackend(StorageBackendTests, unittest.TestCase):
+    """
+    Test cases for the MemoryStorageBackend class.
+    """
+
+    def create_storage(self):
+        return MemoryStorageBackend()
+
+    def test_not_selectable_in_settings(self):
+        """
+        Test that the factory only creates the in-memory backend once a test
+        registers it.
+        """
+        factory = StorageFactory()
+        with self.assertRaises(ValueError):
+            factory.create_storage("memory")
+
+        factory.register("memory", MemoryStorageBackend)
+        self.assertIsInstance(factory.create_storage("memory"), MemoryStorageBackend)
+
+    def test_small_parts(self):
+        """
+        Test that streamed writes are split into parts.
+        """
+        with self.storage.open_write("s3://bucket/big.bin", part_size=4) as f:
+            f.write(b"abcdefghij")
+        self.assertEqual(
+            self.storage.read_range("s3://bucket/big.bin", 0, 100), b"abcdefghij"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
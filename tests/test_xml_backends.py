@@ -0,0 +1,103 @@
+"""
+Tests for the XML parsing backends.
+"""
+
+import unittest
+
+from parsers.xml_backends import (
+    PARSE_ERRORS,
+    XML_BACKENDS,
+    available_backends,
+    get_backend,
+)
+
+XML_CONTENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE rows [<!ENTITY company "ACME &amp; Co">]>
+<rows xmlns:n="urn:notes">
+  <!-- comment before the rows -->
+  <row id="1">
+    <name>caf\xc3\xa9 &company;</name>
+    <empty/>
+    <blank>   </blank>
+    <n:note>see <b>bold</b> tail</n:note>
+    <data><![CDATA[<raw> & text]]></data>
+  </row>
+  <row id="2"><name>second<!-- inline --> row</name><empty></empty></row>
+  <row/>
+</rows>
+"""
+
+EXPECTED_ROWS = [
+    [
+        ("name", "café ACME & Co"),
+        ("empty", None),
+        ("blank", "   "),
+        ("{urn:notes}note", "see "),
+        ("data", "<raw> & text"),
+    ],
+    [("name", "second row"), ("empty", None)],
+    [],
+]
+
+
+def blocks(data, size):
+    """
+    Split data into blocks of a given size.
+    """
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestXmlBackends(unittest.TestCase):
+    """
+    Test cases for the XML parsing backends.
+    """
+
+    def test_backends_produce_the_same_rows(self):
+        """
+        Test every available backend in both modes and with tiny blocks.
+        """
+        for name in available_backends():
+            backend = get_backend(name)
+            for streaming in (True, False):
+                for size in (7, 64 * 1024):
+                    with self.subTest(backend=name, streaming=streaming, size=size):
+                        rows = list(
+                            backend.iter_rows(blocks(XML_CONTENT, size), streaming)
+                        )
+                        self.assertEqual(rows, EXPECTED_ROWS)
+
+    def test_malformed_document(self):
+        """
+        Test that every backend rejects a truncated document.
+        """
+        for name in available_backends():
+            with self.subTest(backend=name):
+                with self.assertRaises(PARSE_ERRORS):
+                    list(get_backend(name).iter_rows([XML_CONTENT[:200]]))
+
+    def test_auto_selection(self):
+        """
+        Test that auto picks the first available backend.
+        """
+        self.assertIn("etree", available_backends())
+        self.assertEqual(get_backend().name, available_backends()[0])
+        self.assertIn(get_backend().name, ("lxml", "etree"))
+
+    def test_unknown_backend(self):
+        """
+        Test that an unknown backend name is rejected.
+        """
+        with self.assertRaises(ValueError):
+            get_backend("sax")
+
+    @unittest.skipIf(XML_BACKENDS["lxml"].available(), "lxml is installed")
+    def test_unavailable_backend(self):
+        """
+        Test that pinning a backend whose library is missing fails.
+        """
+        with self.assertRaises(ImportError):
+            get_backend("lxml")
+
+
+if __name__ == "__main__":
+    unittest.main()
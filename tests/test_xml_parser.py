@@ -4,11 +4,21 @@ Tests for the XmlToCsvParser class.
 
 import unittest
 import csv
+import gzip
 import tempfile
 import shutil
 from pathlib import Path
+from unittest import mock
 
+from benchmarks.generators import generate_xml
+from parsers.xml_backends import available_backends
 from parsers.xml_to_csv_parser import XmlToCsvParser
+from storage.memory_storage import MemoryStorageBackend
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
 
 
 class TestXmlToCsvParser(unittest.TestCase):
@@ -142,6 +152,499 @@ class TestXmlToCsvParser(unittest.TestCase):
         # Assert result is False (failure)
         self.assertFalse(result)
 
+    def test_parse_truncated_xml_leaves_no_output(self):
+        """
+        Test that a parse error after the first rows leaves no partial output.
+        """
+        self.xml_file.write_text(
+            "<root>" + "<row><id>1</id></row>" * 5000 + "<row><id>"
+        )
+
+        for kwargs in (
+            {"xml_backend": "etree"},
+            {"xml_backend": "etree", "streaming": True},
+            {"xml_backend": "expat"},
+        ):
+            parser = XmlToCsvParser(self.s3_origin, self.s3_destiny, **kwargs)
+            parser.local_origin = self.xml_file
+            parser.local_destiny = self.dest_dir
+            self.assertFalse(parser.parse())
+            self.assertEqual(list(self.dest_dir.iterdir()), [])
+
+    def test_parse_streaming_matches_tree(self):
+        """
+        Test that streaming mode produces the same CSV as the default mode.
+        """
+        # Convert with the default (in-memory tree) mode, pinning a backend
+        # that builds the tree
+        parser = XmlToCsvParser(self.s3_origin, self.s3_destiny, xml_backend="etree")
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertTrue(parser.parse())
+        expected = (self.dest_dir / "test.csv").read_bytes()
+
+        # Convert again with streaming enabled
+        parser = XmlToCsvParser(
+            self.s3_origin, self.s3_destiny, xml_backend="etree", streaming=True
+        )
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertTrue(parser.parse())
+
+        # Assert both modes wrote byte-identical output
+        self.assertEqual((self.dest_dir / "test.csv").read_bytes(), expected)
+
+    def test_parse_streaming_empty_root(self):
+        """
+        Test streaming mode with an XML file that has no rows.
+        """
+        empty_xml = self.source_dir / "empty.xml"
+        empty_xml.write_text("<transactions></transactions>")
+
+        parser = XmlToCsvParser(
+            "s3://test-bucket/source/empty.xml", self.s3_destiny, streaming=True
+        )
+        parser.local_origin = empty_xml
+        parser.local_destiny = self.dest_dir
+
+        # Assert result is False and no CSV file was written
+        self.assertFalse(parser.parse())
+        self.assertFalse((self.dest_dir / "empty.csv").exists())
+
+    def test_parse_with_object_store(self):
+        """
+        Test converting an XML object held by a non-local storage backend.
+        """
+        storage = MemoryStorageBackend({self.s3_origin: self.xml_file.read_bytes()})
+
+        for streaming in (False, True):
+            parser = XmlToCsvParser(
+                self.s3_origin, self.s3_destiny, storage=storage, streaming=streaming
+            )
+            self.assertIsNone(parser.local_origin)
+
+            # Assert the CSV object was written to the store
+            self.assertTrue(parser.parse())
+            content = storage.objects["s3://test-bucket/dest/test.csv"]
+            rows = list(csv.DictReader(content.decode("utf-8").splitlines()))
+            self.assertEqual(len(rows), 2)
+            self.assertEqual(rows[1]["description"], "Subscription renewal")
+
+    def test_parse_backends_match(self):
+        """
+        Test that every available XML backend produces the same CSV.
+        """
+        generate_xml(self.source_dir / "nested.xml", 200, width=4, depth=2)
+
+        outputs = {}
+        for backend in available_backends():
+            parser = XmlToCsvParser(
+                "s3://test-bucket/source/nested.xml",
+                self.s3_destiny,
+                xml_backend=backend,
+            )
+            parser.local_origin = self.source_dir / "nested.xml"
+            parser.local_destiny = self.dest_dir
+            self.assertTrue(parser.parse())
+            self.assertEqual(parser.backend.name, backend)
+            outputs[backend] = (self.dest_dir / "nested.csv").read_bytes()
+
+        self.assertEqual(len(set(outputs.values())), 1)
+
+        # Assert unknown backends are rejected
+        parser = XmlToCsvParser(self.s3_origin, self.s3_destiny, xml_backend="sax")
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertFalse(parser.parse())
+
+    def test_parse_memory_mapped_input(self):
+        """
+        Test that memory-mapped inputs produce the same CSV as buffered reads.
+        """
+        generate_xml(self.source_dir / "nested.xml", 200, width=4, depth=2)
+
+        for backend in available_backends():
+            outputs = []
+            for mmap_min_size in (2**63, 1):
+                with mock.patch("parsers.base_parser.MMAP_MIN_SIZE", mmap_min_size):
+                    parser = XmlToCsvParser(
+                        "s3://test-bucket/source/nested.xml",
+                        self.s3_destiny,
+                        xml_backend=backend,
+                        streaming=True,
+                        mmap=True,
+                    )
+                    parser.local_origin = self.source_dir / "nested.xml"
+                    parser.local_destiny = self.dest_dir
+                    self.assertTrue(parser.parse())
+                outputs.append((self.dest_dir / "nested.csv").read_bytes())
+                self.assertEqual(
+                    parser.metrics.to_dict()["bytes_read"],
+                    (self.source_dir / "nested.xml").stat().st_size,
+                )
+
+            self.assertEqual(outputs[0], outputs[1])
+
+    def test_parse_sharded_matches_sequential(self):
+        """
+        Test that the sharded conversion produces the same CSV as a single pass.
+        """
+        generate_xml(self.source_dir / "large.xml", 500, width=4)
+        namespaced_xml = self.source_dir / "namespaced.xml"
+        namespaced_xml.write_text(
+            '<?xml version="1.0"?>\n<t:rows xmlns:t="urn:test">'
+            + "".join(
+                f'<t:row id="{i}"><t:value>v{i}</t:value><t:rowx>{i}</t:rowx></t:row>'
+                for i in range(300)
+            )
+            + "</t:rows>\n<!-- trailer -->\n"
+        )
+        trailer_xml = self.source_dir / "trailer.xml"
+        trailer_xml.write_text(
+            "<rows>"
+            + "".join(f"<row><value>v{i}</value></row>" for i in range(300))
+            + "</rows>\n<!-- </row> --><?done </row>?>\n"
+        )
+
+        for name in ("large", "namespaced", "trailer"):
+            outputs = []
+            for kwargs in ({}, {"shard_workers": 4, "min_shard_size": 1}):
+                parser = XmlToCsvParser(
+                    f"s3://test-bucket/source/{name}.xml", self.s3_destiny, **kwargs
+                )
+                parser.local_origin = self.source_dir / f"{name}.xml"
+                parser.local_destiny = self.dest_dir
+                self.assertTrue(parser.parse())
+                outputs.append((self.dest_dir / f"{name}.csv").read_bytes())
+
+            # Assert the parts were concatenated in order after one header
+            self.assertEqual(outputs[0], outputs[1])
+            self.assertGreater(parser.metrics.to_dict()["rows_emitted"], 1)
+
+    def test_parse_shared(self):
+        """
+        Test converting one read of the XML to several outputs.
+        """
+        parsers = []
+        for name, kwargs in (
+            ("csv", {}),
+            ("bad", {"compression": "rar"}),
+            ("gz", {"compression": "gzip"}),
+        ):
+            parser = XmlToCsvParser(self.s3_origin, f"s3://test-bucket/{name}/", **kwargs)
+            parser.local_origin = self.xml_file
+            parser.local_destiny = self.temp_dir / name
+            parsers.append(parser)
+
+        # Assert invalid options only fail their own parser
+        self.assertEqual(XmlToCsvParser.parse_shared(parsers), [True, False, True])
+        with open(self.temp_dir / "csv" / "test.csv", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[1]["description"], "Subscription renewal")
+        with gzip.open(self.temp_dir / "gz" / "test.csv.gz", "rb") as f:
+            self.assertEqual(f.read(), (self.temp_dir / "csv" / "test.csv").read_bytes())
+        self.assertEqual(parsers[2].metrics.to_dict()["rows_emitted"], 2)
+
+        # Assert only the conversions of the whole file share reads
+        self.assertEqual(
+            XmlToCsvParser.shared_read_key({"compression": "gzip"}),
+            XmlToCsvParser.shared_read_key({}),
+        )
+        self.assertNotEqual(
+            XmlToCsvParser.shared_read_key({"columns": ["id"]}),
+            XmlToCsvParser.shared_read_key({}),
+        )
+        self.assertIsNone(XmlToCsvParser.shared_read_key({"schema": "union"}))
+        self.assertIsNone(XmlToCsvParser.shared_read_key({"shard_workers": 4}))
+
+    def test_parse_shared_output_failure(self):
+        """
+        Test that a parser whose output cannot be created fails alone and
+        leaves no output.
+        """
+        parsers = []
+        for name, kwargs in (
+            ("csv", {}),
+            ("parquet", {"output_format": "parquet"}),
+            ("broken", {}),
+            ("gz", {"compression": "gzip"}),
+        ):
+            parser = XmlToCsvParser(self.s3_origin, f"s3://test-bucket/{name}/", **kwargs)
+            parser.local_origin = self.xml_file
+            parser.local_destiny = self.temp_dir / name
+            parsers.append(parser)
+
+        with mock.patch(
+            "parsers.row_sinks._import_pyarrow", side_effect=ImportError("no pyarrow")
+        ), mock.patch.object(
+            parsers[2], "_open_sink", side_effect=OSError("disk full")
+        ):
+            results = XmlToCsvParser.parse_shared(parsers)
+
+        self.assertEqual(results, [True, False, False, True])
+        self.assertTrue((self.temp_dir / "csv" / "test.csv").exists())
+        self.assertTrue((self.temp_dir / "gz" / "test.csv.gz").exists())
+        for name in ("parquet", "broken"):
+            directory = self.temp_dir / name
+            self.assertFalse(directory.exists() and any(directory.iterdir()))
+
+    def test_parse_selected_columns(self):
+        """
+        Test converting selected columns of nested, filtered records.
+        """
+        self.xml_file.write_text(
+            '<export><meta><count>3</count></meta><data>'
+            '<transaction id="1" currency="EUR"><amount>150.75</amount>'
+            "<status>ok</status><notes><note>a</note></notes></transaction>"
+            '<transaction id="2" currency="USD"><amount>75.20</amount>'
+            "<status>void</status></transaction>"
+            '<transaction id="3"><amount>9.99</amount><status>ok</status></transaction>'
+            "</data></export>"
+        )
+
+        parser = XmlToCsvParser(
+            self.s3_origin,
+            self.s3_destiny,
+            record_path="export/data/transaction",
+            columns={"id": "@id", "amount": "amount", "currency": "@currency"},
+            filters=["status=ok"],
+        )
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertTrue(parser.parse())
+
+        with open(self.dest_dir / "test.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(
+            rows,
+            [["id", "amount", "currency"], ["1", "150.75", "EUR"], ["3", "9.99", ""]],
+        )
+
+        # Assert selected columns without matching records give a header-only
+        # output, while other conversions without rows fail
+        for columns, success in ((["@id", "amount"], True), (None, False)):
+            (self.dest_dir / "test.csv").unlink(missing_ok=True)
+            parser = XmlToCsvParser(
+                self.s3_origin,
+                self.s3_destiny,
+                record_path="export/data/transaction",
+                columns=columns,
+                filters=["status=missing"],
+            )
+            parser.local_origin = self.xml_file
+            parser.local_destiny = self.dest_dir
+            self.assertEqual(parser.parse(), success)
+            self.assertEqual((self.dest_dir / "test.csv").exists(), success)
+            if success:
+                self.assertEqual(
+                    (self.dest_dir / "test.csv").read_bytes(), b"@id,amount\r\n"
+                )
+
+        # Assert invalid paths fail the conversion
+        parser = XmlToCsvParser(self.s3_origin, self.s3_destiny, columns=["a/*"])
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertFalse(parser.parse())
+
+    def test_parse_union_schema(self):
+        """
+        Test that the union schema keeps the fields that appear after the first row.
+        """
+        evolving_xml = self.source_dir / "evolving.xml"
+        evolving_xml.write_text(
+            "<rows>"
+            "<row><id>1</id><name>a</name></row>"
+            "<row><id>2</id><extra>x</extra></row>"
+            "<row><name>c</name><id>3</id><late>y</late></row>"
+            "</rows>"
+        )
+
+        def make_parser(**kwargs):
+            parser = XmlToCsvParser(
+                "s3://test-bucket/source/evolving.xml", self.s3_destiny, **kwargs
+            )
+            parser.local_origin = evolving_xml
+            parser.local_destiny = self.dest_dir
+            return parser
+
+        # Assert the first row schema rejects the later fields
+        self.assertFalse(make_parser().parse())
+
+        for streaming in (False, True):
+            parser = make_parser(schema="union", streaming=streaming)
+            self.assertTrue(parser.parse())
+
+            with open(self.dest_dir / "evolving.csv", newline="") as f:
+                reader = csv.reader(f)
+                self.assertEqual(next(reader), ["id", "name", "extra", "late"])
+                self.assertEqual(
+                    list(reader),
+                    [["1", "a", "", ""], ["2", "", "x", ""], ["3", "c", "", "y"]],
+                )
+            self.assertEqual(parser.metrics.to_dict()["rows_emitted"], 3)
+
+        # Assert unknown schema modes are rejected
+        self.assertFalse(make_parser(schema="infer").parse())
+
+    def test_parse_compressed_output(self):
+        """
+        Test that compressed CSV outputs decompress to the plain CSV.
+        """
+        generate_xml(self.source_dir / "large.xml", 500, width=4)
+
+        def convert(**kwargs):
+            parser = XmlToCsvParser(
+                "s3://test-bucket/source/large.xml", self.s3_destiny, **kwargs
+            )
+            parser.local_origin = self.source_dir / "large.xml"
+            parser.local_destiny = self.dest_dir
+            self.assertTrue(parser.parse())
+            return parser
+
+        convert()
+        plain_csv = (self.dest_dir / "large.csv").read_bytes()
+
+        for kwargs in (
+            {"compression": "gzip"},
+            {"compression": "gzip", "compression_threads": 0},
+            {"compression": "gzip", "shard_workers": 3, "min_shard_size": 1},
+        ):
+            parser = convert(**kwargs)
+            compressed = (self.dest_dir / "large.csv.gz").read_bytes()
+            self.assertEqual(gzip.decompress(compressed), plain_csv)
+            self.assertEqual(parser.metrics.to_dict()["bytes_written"], len(compressed))
+
+        # Assert unknown codecs are rejected
+        parser = XmlToCsvParser(self.s3_origin, self.s3_destiny, compression="lzma")
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertFalse(parser.parse())
+
+    def test_parse_resumes_from_checkpoint(self):
+        """
+        Test that a conversion interrupted after a checkpoint resumes from it.
+        """
+        generate_xml(self.source_dir / "large.xml", 20000, width=4)
+
+        def convert(crash_after=None, **kwargs):
+            parser = XmlToCsvParser(
+                "s3://test-bucket/source/large.xml", self.s3_destiny, **kwargs
+            )
+            parser.local_origin = self.source_dir / "large.xml"
+            parser.local_destiny = self.dest_dir
+
+            iter_rows = parser._iter_rows
+
+            def crashing_iter_rows(open_source):
+                for index, fields in enumerate(iter_rows(open_source)):
+                    if index == crash_after:
+                        raise RuntimeError("worker killed")
+                    yield fields
+
+            if crash_after is not None:
+                parser._iter_rows = crashing_iter_rows
+            return parser, parser.parse()
+
+        convert()
+        plain_csv = (self.dest_dir / "large.csv").read_bytes()
+
+        for compression, output_name in ((None, "large.csv"), ("gzip", "large.csv.gz")):
+            output = self.dest_dir / output_name
+            checkpoint_file = self.dest_dir / f".{output_name}.checkpoint"
+            kwargs = {
+                "checkpoint": True,
+                "checkpoint_interval": 0,
+                "compression": compression,
+            }
+
+            # Assert the crash leaves a checkpoint behind
+            _, success = convert(crash_after=10000, **kwargs)
+            self.assertFalse(success)
+            self.assertTrue(checkpoint_file.exists())
+
+            # Assert the restart only writes the rows after the checkpoint
+            parser, success = convert(**kwargs)
+            self.assertTrue(success)
+            content = output.read_bytes()
+            if compression == "gzip":
+                content = gzip.decompress(content)
+            self.assertEqual(content, plain_csv)
+            metrics = parser.metrics.to_dict()
+            self.assertEqual(metrics["rows_emitted"], 20000)
+            self.assertLess(metrics["bytes_written"], output.stat().st_size)
+            self.assertFalse(checkpoint_file.exists())
+
+        # Assert a checkpoint of other kwargs is ignored
+        convert(crash_after=10000, checkpoint=True, checkpoint_interval=0)
+        parser, success = convert(checkpoint=True, batch_size=10)
+        self.assertTrue(success)
+        self.assertEqual((self.dest_dir / "large.csv").read_bytes(), plain_csv)
+        self.assertEqual(
+            parser.metrics.to_dict()["bytes_written"], len(plain_csv)
+        )
+
+    def test_parse_unsupported_output_format(self):
+        """
+        Test that an unknown output format is rejected.
+        """
+        parser = XmlToCsvParser(self.s3_origin, self.s3_destiny, output_format="xlsx")
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+
+        self.assertFalse(parser.parse())
+        self.assertEqual(list(self.dest_dir.iterdir()), [])
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_parse_columnar_formats(self):
+        """
+        Test writing Parquet and Arrow outputs in several batches.
+        """
+        import pyarrow.parquet as pq
+
+        for streaming in (False, True):
+            parser = XmlToCsvParser(
+                self.s3_origin,
+                self.s3_destiny,
+                streaming=streaming,
+                output_format="parquet",
+                batch_size=1,
+                compression="zstd",
+            )
+            parser.local_origin = self.xml_file
+            parser.local_destiny = self.dest_dir
+            self.assertTrue(parser.parse())
+
+            # Assert one row group per batch and the same values as the CSV
+            parquet_file = pq.ParquetFile(self.dest_dir / "test.parquet")
+            self.assertEqual(parquet_file.num_row_groups, 2)
+            table = parquet_file.read()
+            self.assertEqual(table.column("id").to_pylist(), ["1001", "1002"])
+
+        parser = XmlToCsvParser(self.s3_origin, self.s3_destiny, output_format="arrow")
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+        self.assertTrue(parser.parse())
+
+        with pyarrow.OSFile(str(self.dest_dir / "test.arrow"), "rb") as source:
+            table = pyarrow.ipc.open_file(source).read_all()
+        self.assertEqual(
+            table.column("description").to_pylist(),
+            ["Payment for services", "Subscription renewal"],
+        )
+
+    @unittest.skipIf(pyarrow, "pyarrow is installed")
+    def test_parse_columnar_format_without_pyarrow(self):
+        """
+        Test that the columnar formats fail cleanly when pyarrow is missing.
+        """
+        parser = XmlToCsvParser(
+            self.s3_origin, self.s3_destiny, output_format="parquet"
+        )
+        parser.local_origin = self.xml_file
+        parser.local_destiny = self.dest_dir
+
+        self.assertFalse(parser.parse())
+
 
 if __name__ == "__main__":
     unittest.main()
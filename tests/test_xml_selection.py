@@ -0,0 +1,110 @@
+"""
+Tests for the record selection of the XML conversion.
+"""
+
+import unittest
+
+from parsers.xml_backends import available_backends, get_backend
+from parsers.xml_selection import RecordSelection
+from tests.test_xml_backends import EXPECTED_ROWS, XML_CONTENT
+
+FEED_CONTENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:x="urn:x">
+  <header><entry id="0"><name>not a record</name></entry></header>
+  <entries>
+    <entry id="1" x:type="a">
+      <name>One</name>
+      <address><city>Paris</city><zip>75001</zip></address>
+      <history><event>created</event><event>updated</event></history>
+      <status>active</status>
+    </entry>
+    <entry id="2">
+      <x:name>Two</x:name>
+      <address><city>Rome</city></address>
+      <status>inactive</status>
+    </entry>
+    <entry id="3">
+      <name>Three</name>
+      <status>active</status>
+    </entry>
+  </entries>
+</feed>
+"""
+
+
+class TestRecordSelection(unittest.TestCase):
+    """
+    Test cases for the RecordSelection class and the backends driving it.
+    """
+
+    def select(self, *args, content=FEED_CONTENT):
+        """
+        Select rows with every available backend, checking they agree.
+        """
+        selection = RecordSelection(*args)
+        results = []
+        for backend in available_backends():
+            # Small blocks split the elements across feeds
+            blocks = [content[i : i + 7] for i in range(0, len(content), 7)]
+            results.append(list(get_backend(backend).iter_records(blocks, selection)))
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+        return results[0]
+
+    def test_default_selection_matches_rows(self):
+        """
+        Test that selecting the children of the root yields the usual rows.
+        """
+        self.assertEqual(self.select(content=XML_CONTENT), EXPECTED_ROWS)
+
+    def test_record_path_and_columns(self):
+        """
+        Test projecting nested values and attributes of nested records.
+        """
+        rows = self.select(
+            "feed/entries/entry", ["@id", "name", "address/city", "@type"]
+        )
+        self.assertEqual(
+            rows,
+            [
+                [("@id", "1"), ("name", "One"), ("address/city", "Paris"), ("@type", "a")],
+                [("@id", "2"), ("name", "Two"), ("address/city", "Rome"), ("@type", None)],
+                [("@id", "3"), ("name", "Three"), ("address/city", None), ("@type", None)],
+            ],
+        )
+
+    def test_renamed_columns_and_filters(self):
+        """
+        Test renaming columns and filtering on paths outside the columns.
+        """
+        rows = self.select("*/entries/*", {"id": "@id", "city": "address/city"}, ["status=active"])
+        self.assertEqual(rows, [[("id", "1"), ("city", "Paris")], [("id", "3"), ("city", None)]])
+
+        rows = self.select("feed/entries/entry", {"id": "@id"}, ["address/city", "@id!=1"])
+        self.assertEqual(rows, [[("id", "2")]])
+
+    def test_children_of_selected_records(self):
+        """
+        Test that records without columns output their children.
+        """
+        rows = self.select("feed/entries/entry", None, ["@id=3"])
+        self.assertEqual(rows, [[("name", "Three"), ("status", "active")]])
+
+    def test_invalid_selection(self):
+        """
+        Test that invalid paths and filters are rejected.
+        """
+        for args in (
+            ("/",),
+            (None, []),
+            (None, ["a/*/b"]),
+            (None, ["a/@b/c"]),
+            (None, ["@"]),
+            (None, None, [1]),
+        ):
+            with self.assertRaises(ValueError):
+                RecordSelection(*args)
+
+
+if __name__ == "__main__":
+    unittest.main()
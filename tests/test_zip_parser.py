@@ -6,9 +6,12 @@ import unittest
 import shutil
 import zipfile
 from pathlib import Path
+from unittest import mock
 import tempfile
 
 from parsers.zip_file_parser import ZipFileParser
+from storage.memory_storage import MemoryStorageBackend
+from utils.mapped_file import MappedFile
 
 
 class TestZipFileParser(unittest.TestCase):
@@ -114,5 +117,209 @@ class TestZipFileParser(unittest.TestCase):
         self.assertFalse(result)
 
 
+    def test_parse_parallel_extraction(self):
+        """
+        Test extracting a multi-member ZIP file with several workers.
+        """
+        # Create an archive with nested, empty and chunked (large) members
+        contents = {f"data/file{i}.txt": f"content {i}" * (i + 1) for i in range(8)}
+        contents["data/large.bin"] = "x" * 50000
+        multi_zip = self.source_dir / "multi.zip"
+        with zipfile.ZipFile(multi_zip, "w", zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr("data/empty/", "")
+            for name, content in contents.items():
+                zipf.writestr(name, content)
+
+        # Initialize parser with four workers and small chunks
+        parser = ZipFileParser(
+            "s3://test-bucket/source/multi.zip",
+            self.s3_destiny,
+            extract_workers=4,
+            chunk_size=1024,
+        )
+        parser.local_origin = multi_zip
+        parser.local_destiny = self.dest_dir
+
+        # Assert every member was extracted with its content
+        self.assertTrue(parser.parse())
+        self.assertTrue((self.dest_dir / "data" / "empty").is_dir())
+        for name, content in contents.items():
+            self.assertEqual((self.dest_dir / name).read_text(), content)
+
+    def test_parse_member_stays_in_destination(self):
+        """
+        Test that member names cannot escape the destination directory.
+        """
+        evil_zip = self.source_dir / "evil.zip"
+        with zipfile.ZipFile(evil_zip, "w") as zipf:
+            zipf.writestr("../../evil.txt", "evil")
+
+        parser = ZipFileParser("s3://test-bucket/source/evil.zip", self.s3_destiny)
+        parser.local_origin = evil_zip
+        parser.local_destiny = self.dest_dir
+
+        # Assert the member was written inside the destination directory
+        self.assertTrue(parser.parse())
+        self.assertTrue((self.dest_dir / "evil.txt").exists())
+        self.assertFalse((self.s3_dir / "evil.txt").exists())
+
+    def test_parse_with_object_store(self):
+        """
+        Test extracting a ZIP object held by a non-local storage backend.
+        """
+        storage = MemoryStorageBackend({self.s3_origin: self.zip_file.read_bytes()})
+
+        for workers in (1, 2):
+            parser = ZipFileParser(
+                self.s3_origin,
+                self.s3_destiny,
+                storage=storage,
+                extract_workers=workers,
+            )
+
+            # Assert the member was uploaded to the store
+            self.assertTrue(parser.parse())
+            self.assertEqual(
+                storage.objects["s3://test-bucket/dest/test.txt"],
+                b"Test content for ZIP parser",
+            )
+
+    def test_parse_resumes_from_checkpoint(self):
+        """
+        Test that a restarted extraction skips the members already extracted.
+        """
+        with zipfile.ZipFile(self.zip_file, "w") as zipf:
+            for i in range(5):
+                zipf.writestr(f"member{i}.txt", f"content {i}")
+
+        def extract(fail_member=None):
+            parser = ZipFileParser(
+                self.s3_origin, self.s3_destiny, checkpoint=True, checkpoint_interval=0
+            )
+            parser.local_origin = self.zip_file
+            parser.local_destiny = self.dest_dir
+
+            extract_member = parser._extract_member
+
+            def failing_extract_member(zip_ref, member, chunk_size):
+                if member.filename == fail_member:
+                    raise OSError("disk full")
+                extract_member(zip_ref, member, chunk_size)
+
+            parser._extract_member = failing_extract_member
+            return parser, parser.parse()
+
+        # Assert the failure leaves the extracted members in the checkpoint
+        _, success = extract(fail_member="member3.txt")
+        self.assertFalse(success)
+        self.assertTrue((self.dest_dir / ".test.zip.checkpoint").exists())
+
+        # Assert the restart only extracts the remaining members
+        parser, success = extract()
+        self.assertTrue(success)
+        self.assertEqual(parser.metrics.to_dict()["members_extracted"], 2)
+        self.assertEqual(
+            sorted(parser.outputs),
+            [parser.output_location(f"member{i}.txt") for i in range(5)],
+        )
+        for i in range(5):
+            self.assertEqual(
+                (self.dest_dir / f"member{i}.txt").read_text(), f"content {i}"
+            )
+        self.assertFalse((self.dest_dir / ".test.zip.checkpoint").exists())
+
+    def test_parse_memory_mapped_input(self):
+        """
+        Test extracting a memory-mapped archive.
+        """
+        with zipfile.ZipFile(self.zip_file, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for i in range(5):
+                zipf.writestr(f"member{i}.txt", f"content {i}" * 1000)
+
+        with mock.patch("parsers.base_parser.MMAP_MIN_SIZE", 1):
+            parser = ZipFileParser(
+                self.s3_origin, self.s3_destiny, extract_workers=2, mmap=True
+            )
+            parser.local_origin = self.zip_file
+            parser.local_destiny = self.dest_dir
+            self.assertTrue(parser.parse())
+            with parser.open_seekable_input() as source:
+                self.assertIsInstance(source, MappedFile)
+
+        for i in range(5):
+            self.assertEqual(
+                (self.dest_dir / f"member{i}.txt").read_text(), f"content {i}" * 1000
+            )
+
+    def test_parse_incremental(self):
+        """
+        Test that incremental extraction only writes new or changed members.
+        """
+
+        def write_archive(contents):
+            with zipfile.ZipFile(self.zip_file, "w") as zipf:
+                for name, content in contents.items():
+                    zipf.writestr(name, content)
+
+        def extract():
+            parser = ZipFileParser(self.s3_origin, self.s3_destiny, incremental=True)
+            parser.local_origin = self.zip_file
+            parser.local_destiny = self.dest_dir
+            self.assertTrue(parser.parse())
+            return parser.metrics.to_dict()
+
+        write_archive({"a.txt": "a", "b.txt": "b", "c.txt": "c"})
+        self.assertEqual(extract()["members_extracted"], 3)
+        self.assertEqual(len(list(self.dest_dir.glob(".test.zip.*.index"))), 1)
+
+        # Assert a second run leaves the unchanged members alone
+        metrics = extract()
+        self.assertEqual(metrics["members_extracted"], 0)
+        self.assertEqual(metrics["members_skipped"], 3)
+
+        # Assert changed, new and locally modified members are extracted
+        write_archive({"a.txt": "a", "b.txt": "B", "c.txt": "c", "d.txt": "d"})
+        (self.dest_dir / "c.txt").write_text("edited")
+        metrics = extract()
+        self.assertEqual(metrics["members_extracted"], 3)
+        self.assertEqual(metrics["members_skipped"], 1)
+        self.assertEqual((self.dest_dir / "b.txt").read_text(), "B")
+        self.assertEqual((self.dest_dir / "c.txt").read_text(), "c")
+        self.assertEqual((self.dest_dir / "d.txt").read_text(), "d")
+
+        # Assert an archive of the same name from another origin does not
+        # use the index of the first one
+        parser = ZipFileParser(
+            "s3://test-bucket/other/test.zip", self.s3_destiny, incremental=True
+        )
+        parser.local_origin = self.zip_file
+        parser.local_destiny = self.dest_dir
+        self.assertTrue(parser.parse())
+        self.assertEqual(parser.metrics.to_dict()["members_extracted"], 4)
+        self.assertEqual(len(list(self.dest_dir.glob(".test.zip.*.index"))), 2)
+
+    def test_parse_include_exclude(self):
+        """
+        Test that only the members matching the globs are extracted.
+        """
+        with zipfile.ZipFile(self.zip_file, "w") as zipf:
+            for name in ("data/a.xml", "data/b.xml", "data/skip.xml", "readme.txt"):
+                zipf.writestr(name, name)
+
+        parser = ZipFileParser(
+            self.s3_origin, self.s3_destiny, include="*.xml", exclude=["*/skip.*"]
+        )
+        parser.local_origin = self.zip_file
+        parser.local_destiny = self.dest_dir
+
+        self.assertTrue(parser.parse())
+        extracted = sorted(
+            path.relative_to(self.dest_dir).as_posix()
+            for path in self.dest_dir.rglob("*")
+            if path.is_file()
+        )
+        self.assertEqual(extracted, ["data/a.xml", "data/b.xml"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,175 @@
+"""
+Tests for the ZipXmlToCsvParser class.
+"""
+
+import unittest
+import csv
+import shutil
+import zipfile
+from pathlib import Path
+import tempfile
+
+from parsers.zip_xml_to_csv_parser import ZipXmlToCsvParser
+from storage.memory_storage import MemoryStorageBackend
+
+XML_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<transactions>
+  <transaction>
+    <id>1001</id>
+    <amount>150.75</amount>
+  </transaction>
+  <transaction>
+    <id>1002</id>
+    <amount>75.20</amount>
+  </transaction>
+</transactions>"""
+
+
+class TestZipXmlToCsvParser(unittest.TestCase):
+    """
+    Test cases for the ZipXmlToCsvParser class.
+    """
+
+    def setUp(self):
+        """
+        Set up test environment before each test case.
+        """
+        # Create temporary directories
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+        # Create directories for simulating S3 structure
+        self.s3_dir = self.temp_dir / "s3_simulation"
+        self.source_dir = self.s3_dir / "test-bucket" / "source"
+        self.dest_dir = self.s3_dir / "test-bucket" / "dest"
+
+        self.source_dir.mkdir(parents=True, exist_ok=True)
+
+        # Create a test ZIP file with XML and non XML members
+        self.zip_file = self.source_dir / "test.zip"
+        with zipfile.ZipFile(self.zip_file, "w", zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr("first.xml", XML_CONTENT)
+            zipf.writestr("nested/second.xml", XML_CONTENT.replace("1001", "2001"))
+            zipf.writestr("empty.xml", "<transactions></transactions>")
+            zipf.writestr("readme.txt", "not converted")
+
+        # Define S3 paths for testing
+        self.s3_origin = "s3://test-bucket/source/test.zip"
+        self.s3_destiny = "s3://test-bucket/dest/"
+
+    def tearDown(self):
+        """
+        Clean up test environment after each test case.
+        """
+        # Remove temporary directory
+        shutil.rmtree(self.temp_dir)
+
+    def make_parser(self, **kwargs):
+        """
+        Create a parser reading from and writing to the temporary directories.
+        """
+        parser = ZipXmlToCsvParser(self.s3_origin, self.s3_destiny, **kwargs)
+        parser.local_origin = self.zip_file
+        parser.local_destiny = self.dest_dir
+        return parser
+
+    def read_rows(self, relative_path):
+        """
+        Read a CSV output as a list of dicts.
+        """
+        with open(self.dest_dir / relative_path, newline="") as f:
+            return list(csv.DictReader(f))
+
+    def test_parse_success(self):
+        """
+        Test converting the XML members without extracting them.
+        """
+        parser = self.make_parser()
+
+        self.assertTrue(parser.parse())
+
+        # Assert only the CSV outputs were written
+        written = sorted(
+            str(path.relative_to(self.dest_dir))
+            for path in self.dest_dir.rglob("*")
+            if path.is_file()
+        )
+        self.assertEqual(written, ["first.csv", "nested/second.csv"])
+        self.assertEqual(self.read_rows("first.csv")[1]["id"], "1002")
+        self.assertEqual(self.read_rows("nested/second.csv")[0]["id"], "2001")
+
+        metrics = parser.metrics.to_dict()
+        self.assertEqual(metrics["rows_emitted"], 4)
+        self.assertEqual(metrics["members_extracted"], 2)
+
+    def test_parse_matches_tree_mode(self):
+        """
+        Test that the streaming and tree modes produce the same CSV.
+        """
+        self.assertTrue(self.make_parser(streaming=True).parse())
+        streaming_csv = (self.dest_dir / "first.csv").read_bytes()
+
+        self.assertTrue(self.make_parser(streaming=False).parse())
+        self.assertEqual((self.dest_dir / "first.csv").read_bytes(), streaming_csv)
+
+    def test_parse_pattern(self):
+        """
+        Test restricting the converted members with a glob.
+        """
+        self.assertTrue(self.make_parser(pattern="nested/*.xml").parse())
+        self.assertFalse((self.dest_dir / "first.csv").exists())
+        self.assertTrue((self.dest_dir / "nested" / "second.csv").exists())
+
+        # Assert the parse fails when no member matches
+        self.assertFalse(self.make_parser(pattern="*.json").parse())
+
+    def test_parse_invalid_member(self):
+        """
+        Test that a malformed XML member fails the conversion.
+        """
+        with zipfile.ZipFile(self.zip_file, "a") as zipf:
+            zipf.writestr("broken.xml", "<transactions><transaction>")
+
+        self.assertFalse(self.make_parser().parse())
+
+    def test_parse_resumes_from_checkpoint(self):
+        """
+        Test that a restarted conversion skips the converted members and still
+        lists their outputs.
+        """
+        parser = self.make_parser(checkpoint=True, checkpoint_interval=0)
+        convert = parser._convert
+
+        def failing_convert(open_source, output_stem, sink_class):
+            if output_stem == "nested/second":
+                raise OSError("disk full")
+            return convert(open_source, output_stem, sink_class)
+
+        parser._convert = failing_convert
+        self.assertFalse(parser.parse())
+
+        parser = self.make_parser(checkpoint=True, checkpoint_interval=0)
+        self.assertTrue(parser.parse())
+        self.assertEqual(parser.metrics.to_dict()["members_extracted"], 1)
+        self.assertEqual(
+            sorted(parser.outputs),
+            [
+                self.dest_dir / "first.csv",
+                self.dest_dir / "nested" / "second.csv",
+            ],
+        )
+
+    def test_parse_with_object_store(self):
+        """
+        Test converting an archive held by a non-local storage backend.
+        """
+        storage = MemoryStorageBackend({self.s3_origin: self.zip_file.read_bytes()})
+        parser = ZipXmlToCsvParser(self.s3_origin, self.s3_destiny, storage=storage)
+
+        self.assertTrue(parser.parse())
+        content = storage.objects["s3://test-bucket/dest/nested/second.csv"]
+        rows = list(csv.DictReader(content.decode("utf-8").splitlines()))
+        self.assertEqual([row["id"] for row in rows], ["2001", "1002"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Checkpoints letting an interrupted transformation resume where it stopped.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+# Default number of seconds between two checkpoints of a transformation
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+
+
+class Checkpoint:
+    """
+    Progress of a transformation, saved to a JSON sidecar file.
+
+    The file holds a fingerprint of the transformation (e.g. the size and
+    modification time of the origin and the parser arguments) next to the
+    progress state, so a checkpoint left by another input or configuration is
+    ignored. It is replaced atomically, so a crash while saving leaves the
+    previous checkpoint in place.
+    """
+
+    def __init__(self, path, fingerprint, interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            path (str or Path): The sidecar file.
+            fingerprint (dict): JSON serializable description of the
+                transformation the progress belongs to.
+            interval (float): Minimum number of seconds between two saves.
+        """
+        self.path = Path(path)
+        self.fingerprint = json.loads(json.dumps(fingerprint, default=str))
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """
+        Read the saved progress.
+
+        Returns:
+            dict: The state given to the last save, or None when there is no
+                checkpoint or it belongs to another transformation.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Missing or half written by a crash: start over
+            return None
+
+        if not isinstance(data, dict) or data.get("fingerprint") != self.fingerprint:
+            return None
+        return data.get("state")
+
+    def due(self):
+        """
+        Check whether the interval since the last save has elapsed.
+
+        Returns:
+            bool: True if the progress should be saved.
+        """
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, state):
+        """
+        Save the progress, replacing the previous checkpoint.
+
+        Args:
+            state (dict): JSON serializable progress of the transformation.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "state": state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def clear(self):
+        """
+        Remove the checkpoint, once the transformation has completed.
+        """
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
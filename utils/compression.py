@@ -0,0 +1,202 @@
+"""
+Utilities for compressing output streams while they are written.
+"""
+
+import bz2
+import gzip
+import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Supported codecs -> file extension
+COMPRESSION_EXTENSIONS = {
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "zstd": ".zst",
+}
+
+# Size of the blocks compressed independently (1 MiB)
+DEFAULT_COMPRESSION_BLOCK_SIZE = 1024 * 1024
+
+
+def _block_compressor(compression, level):
+    """
+    Get a function compressing a block into a self-contained gzip member,
+    bz2 stream or zstd frame.
+
+    Args:
+        compression (str): The codec, a key of COMPRESSION_EXTENSIONS.
+        level (int): The compression level, or None for the codec default.
+
+    Returns:
+        callable: Function taking and returning bytes. It is safe to call
+            from several threads at once.
+
+    Raises:
+        ValueError: If the codec is not supported.
+        ImportError: If the codec needs a package that is not installed.
+    """
+    if compression == "gzip":
+        level = 6 if level is None else level
+        # A fixed mtime keeps the output reproducible
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+
+    if compression == "bz2":
+        level = 9 if level is None else level
+        return lambda data: bz2.compress(data, level)
+
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "The zstd compression requires zstandard (pip install zstandard)"
+            ) from None
+        level = 3 if level is None else level
+        # Compressor objects are not thread safe, so one is created per block
+        return lambda data: zstandard.ZstdCompressor(level=level).compress(data)
+
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def check_compression(compression):
+    """
+    Check that a codec can be used, before any output is written.
+
+    Args:
+        compression (str): The codec, a key of COMPRESSION_EXTENSIONS.
+
+    Raises:
+        ValueError: If the codec is not supported.
+        ImportError: If the codec needs a package that is not installed.
+    """
+    _block_compressor(compression, None)
+
+
+class CompressingWriter(io.RawIOBase):
+    """
+    Writable stream compressing the data written to it into another stream.
+
+    The data is cut into blocks that are compressed independently, each into a
+    complete gzip member, bz2 stream or zstd frame. The concatenation is a valid
+    compressed file for gzip, bzip2 and zstd and for the Python modules, and
+    blocks can be compressed by several threads at once while the caller keeps
+    producing data. The compressed blocks are always written in order.
+
+    Closing the writer flushes the remaining data but leaves the wrapped stream
+    open. A writer left by an exception is aborted instead, which stops its
+    threads without writing the pending blocks.
+    """
+
+    def __init__(
+        self,
+        stream,
+        compression,
+        level=None,
+        threads=1,
+        block_size=DEFAULT_COMPRESSION_BLOCK_SIZE,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            stream (io.IOBase): Writable binary stream receiving the output.
+            compression (str): The codec, a key of COMPRESSION_EXTENSIONS.
+            level (int): The compression level, or None for the codec default.
+            threads (int): Number of compression threads. With 0, blocks are
+                compressed synchronously by the writing thread.
+            block_size (int): Size in bytes of the uncompressed blocks.
+
+        Raises:
+            ValueError: If the codec is not supported.
+            ImportError: If the codec needs a package that is not installed.
+        """
+        super().__init__()
+        self.stream = stream
+        self.block_size = block_size
+        self._compress = _block_compressor(compression, level)
+
+        self._buffer = bytearray()
+        self._blocks = 0
+        self._pending = deque()
+
+        # Bound the blocks in flight, and with them the memory used
+        self._max_pending = 2 * threads
+        self._pool = (
+            ThreadPoolExecutor(max_workers=threads, thread_name_prefix="compression")
+            if threads > 0
+            else None
+        )
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed file")
+
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[: self.block_size])
+            del self._buffer[: self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def flush(self):
+        """
+        Compress the buffered data as a block of its own and write every
+        pending block, so the wrapped stream holds a valid compressed file.
+        """
+        if self._buffer and not self.closed:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._write_next()
+        super().flush()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            # An empty output still gets one block, so it is a valid file
+            if self._buffer or not self._blocks:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_next()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+            super().close()
+
+    def abort(self):
+        """
+        Close the writer without writing the data not written yet, and shut
+        down its compression threads. The wrapped stream is left open.
+        """
+        if self.closed:
+            return
+        self._buffer.clear()
+        self._pending.clear()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def _submit(self, block):
+        self._blocks += 1
+        if self._pool is None:
+            self.stream.write(self._compress(block))
+            return
+
+        self._pending.append(self._pool.submit(self._compress, block))
+        while len(self._pending) > self._max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        self.stream.write(self._pending.popleft().result())
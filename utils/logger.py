@@ -1,44 +1,345 @@
 """
 This module provides logging functionality for the transformation engine.
 
-It contains utilities for setting up and configuring loggers with appropriate 
+It contains utilities for setting up and configuring loggers with appropriate
 handlers and formatters to ensure consistent logging across the application.
+
+Records never reach the output on the thread that logs them: every logger
+shares one QueueHandler, and a single listener thread per process formats and
+writes the queued records.
 """
 
+import atexit
+import contextvars
+import copy
+import datetime
+import json
 import logging
+import multiprocessing.util
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+# Format of the text log lines
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(job)s%(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Supported output formats
+LOG_FORMATS = ("text", "json")
+
+# Environment variable selecting the output format, inherited by the worker
+# processes
+LOG_FORMAT_ENV = "TRANSFORMATION_ENGINE_LOG_FORMAT"
+
+# Debug records let through per second for each logging call site
+DEFAULT_DEBUG_RATE_LIMIT = 10
+
+# Identifier of the transformation job running in the current thread/process
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+class JobContextFilter(logging.Filter):
+    """
+    Logging filter that tags each record with the job currently being executed.
+
+    The tag is exposed as the ``job`` record attribute, which is an empty string
+    outside of a job context so regular log lines keep their usual format. The
+    raw identifier is exposed as ``job_id`` (None outside of a job context).
+    """
+
+    def filter(self, record):
+        job_id = _current_job.get()
+        record.job_id = job_id
+        record.job = f"[job {job_id}] " if job_id is not None else ""
+        return True
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Logging filter limiting the debug records of each call site.
+
+    At most ``rate`` debug records per second are let through for a given
+    logging call, so debug statements inside per-row or per-member loops cannot
+    flood the output. The first record let through after some were dropped
+    mentions how many. Records above the debug level are never dropped.
+    """
+
+    def __init__(self, rate=DEFAULT_DEBUG_RATE_LIMIT):
+        """
+        Initialize the filter.
+
+        Args:
+            rate (int): Debug records per second and call site, 0 for no limit.
+        """
+        super().__init__()
+        self.rate = rate
+        self._lock = threading.Lock()
+
+        # (path, line) -> [second, records let through, records dropped]
+        self._call_sites = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or not self.rate:
+            return True
+
+        second = int(time.monotonic())
+        with self._lock:
+            call_site = self._call_sites.setdefault(
+                (record.pathname, record.lineno), [second, 0, 0]
+            )
+            if call_site[0] != second:
+                call_site[0] = second
+                call_site[1] = 0
+            if call_site[1] >= self.rate:
+                call_site[2] += 1
+                return False
+            call_site[1] += 1
+            dropped, call_site[2] = call_site[2], 0
+
+        if dropped:
+            # The message may hold a literal "%" when it has no arguments, so
+            # the note is added once it is formatted
+            record.msg = f"{record.getMessage()} ({dropped} similar messages dropped)"
+            record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatter writing each record as a JSON object on a single line.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "thread": record.threadName,
+            "job": getattr(record, "job_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _ListenerQueueHandler(QueueHandler):
+    """
+    QueueHandler leaving the formatting of the records to the listener thread.
+
+    As with QueueHandler, the message arguments and the traceback are merged
+    into the record before it is queued, so arguments modified afterwards and
+    tracebacks holding frames do not reach the listener. Only the line
+    formatting and the write are left to it.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(
+                    record.exc_info
+                )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        _ensure_listener()
+        self.queue.put_nowait(record)
+
+
+# Process-wide logging configuration
+_config = {
+    "level": logging.INFO,
+    "json": None,
+    "stream": None,
+}
+_lock = threading.RLock()
+_exception_formatter = logging.Formatter()
+_job_filter = JobContextFilter()
+_rate_limit_filter = DebugRateLimitFilter()
+_queue_handler = _ListenerQueueHandler(queue.SimpleQueue())
+_queue_handler.addFilter(_job_filter)
+_queue_handler.addFilter(_rate_limit_filter)
+
+# Listener thread of the current process
+_listener = None
+
+# Whether the queued records are written when this worker process exits
+_worker_exit_registered = False
+
+# Names of the loggers created by setup_logger
+_loggers = set()
+
+
+def _make_formatter():
+    json_format = _config["json"]
+    if json_format is None:
+        json_format = os.environ.get(LOG_FORMAT_ENV, "text") == "json"
+    if json_format:
+        return JsonFormatter()
+    return logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+
+
+def _ensure_listener():
+    """
+    Start the listener thread of the current process if it is not running.
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    with _lock:
+        if _listener is None:
+            handler = logging.StreamHandler(_config["stream"] or sys.stderr)
+            handler.setFormatter(_make_formatter())
+            _listener = QueueListener(_queue_handler.queue, handler)
+            _listener.start()
+
+
+def _after_fork_in_child():
+    """
+    Give a forked worker process a logging queue of its own.
+
+    The worker inherits the handler but not the listener thread, and the
+    records queued before the fork belong to the parent.
+    """
+    global _listener, _lock, _worker_exit_registered
+
+    _lock = threading.RLock()
+    _worker_exit_registered = False
+    _rate_limit_filter._lock = threading.Lock()
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = None
+
+
+def _register_worker_exit(handler):
+    """
+    Write the queued records when a forked multiprocessing worker exits.
 
+    Args:
+        handler (QueueHandler): The shared handler (unused).
+    """
+    init_worker_logging()
+
+
+def init_worker_logging():
+    """
+    Write the queued records when the current worker process exits.
+
+    Workers leave through os._exit, which skips atexit but runs the
+    multiprocessing finalizers registered once the worker has started.
+    Forked workers register it on their own; process pools call this from
+    their initializer so workers started with spawn or forkserver do too.
+    """
+    global _worker_exit_registered
+
+    if not _worker_exit_registered:
+        multiprocessing.util.Finalize(None, shutdown_logging, exitpriority=0)
+        _worker_exit_registered = True
+
+
+def shutdown_logging():
+    """
+    Write every queued record and stop the listener thread.
 
-def setup_logger(name="transformation_engine", log_level=logging.INFO):
+    Logging keeps working afterwards: the next record starts a new listener.
+    Called automatically when the process exits.
+    """
+    global _listener
+
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def configure_logging(level=None, json_format=None, debug_rate_limit=None, stream=None):
+    """
+    Configure the log output of the process.
+
+    The loggers created by setup_logger all write through the same queue, so
+    this applies to every one of them, including those already created.
+
+    Args:
+        level (int): Level of the loggers created by setup_logger without an
+            explicit level (default: unchanged, initially logging.INFO).
+        json_format (bool): Write one JSON object per record instead of text
+            lines (default: unchanged, initially the TRANSFORMATION_ENGINE_LOG_FORMAT
+            environment variable, "text" or "json").
+        debug_rate_limit (int): Debug records let through per second for each
+            logging call site, 0 for no limit (default: unchanged, initially 10).
+        stream (io.TextIOBase): Stream receiving the output (default:
+            unchanged, initially sys.stderr).
+    """
+    with _lock:
+        if level is not None:
+            _config["level"] = level
+            for name in _loggers:
+                logging.getLogger(name).setLevel(level)
+        if json_format is not None:
+            _config["json"] = json_format
+        if debug_rate_limit is not None:
+            _rate_limit_filter.rate = debug_rate_limit
+        if stream is not None:
+            _config["stream"] = stream
+
+        # The next record starts a listener with the new output
+        shutdown_logging()
+
+
+@contextmanager
+def job_context(job_id):
+    """
+    Attribute every log record emitted inside the block to the given job.
+
+    Args:
+        job_id: Identifier of the job (e.g. its position in the job definition).
+    """
+    token = _current_job.set(job_id)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def setup_logger(name="transformation_engine", log_level=None):
     """
     Setup and configure a logger with the given name and log level.
 
+    The logger writes through the queue shared by every logger of the
+    process, so calling this again for the same name adds no handler.
+
     Args:
         name (str): The name of the logger.
-        log_level (int): The logging level (default: logging.INFO).
+        log_level (int): The logging level (default: the level given to
+            configure_logging, logging.INFO unless changed).
 
     Returns:
         logging.Logger: Configured logger instance.
     """
-    # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(log_level)
-
-    # Create console handler and set level
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
+    logger.setLevel(_config["level"] if log_level is None else log_level)
 
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
+        _loggers.add(name)
 
-    # Add formatter to console handler
-    console_handler.setFormatter(formatter)
+    return logger
 
-    # Check if handlers already exist to avoid duplicate handlers
-    if not logger.handlers:
-        # Add console handler to logger
-        logger.addHandler(console_handler)
 
-    return logger
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_after_fork_in_child)
+multiprocessing.util.register_after_fork(_queue_handler, _register_worker_exit)
@@ -0,0 +1,198 @@
+"""
+Memory-mapped reads of local files.
+"""
+
+import io
+import mmap
+
+# Smallest local input read through a memory map (1 MiB). Below it, the cost
+# of setting up the mapping outweighs the copies it saves.
+MMAP_MIN_SIZE = 1024 * 1024
+
+# Bytes read past the pages dropped from the resident memory before they are
+# dropped as well (8 MiB)
+RELEASE_SIZE = 8 * 1024 * 1024
+
+
+class MappedFile:
+    """
+    Read-only binary file backed by a memory map.
+
+    It can be handed to consumers expecting a regular file object (ZipFile,
+    ...): read returns bytes copied straight from the page cache, without a
+    system call. Consumers accepting buffers can use read_view and iter_views
+    instead, which return memoryview slices of the mapping and copy nothing.
+
+    Sequential reads drop the pages they went past from the resident memory
+    of the process, so reading a large file does not leave all of it
+    resident. The pages stay in the page cache and are read back from it
+    when accessed again.
+
+    The file must not be truncated while it is mapped.
+    """
+
+    def __init__(self, path, metrics=None, counter="bytes_read"):
+        """
+        Map a file.
+
+        Args:
+            path (str or Path): The file, which must not be empty.
+            metrics (JobMetrics): The metrics receiving the byte counts
+                (default: none).
+            counter (str): Name of the counter to increment.
+        """
+        with open(path, "rb") as f:
+            # The mapping keeps its own handle on the file
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._position = 0
+        self._released = 0
+        self._metrics = metrics
+        self._counter = counter
+        self.name = str(path)
+
+    @property
+    def size(self):
+        """
+        int: Size of the file in bytes.
+        """
+        return len(self._view)
+
+    @property
+    def closed(self):
+        """
+        bool: Whether the file is closed.
+        """
+        return self._view is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the mapping.
+
+        The pages stay mapped while slices returned by read_view or iter_views
+        are alive, and are unmapped with the last of them.
+        """
+        if self._view is None:
+            return
+        self._view.release()
+        self._view = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def writable(self):
+        return False
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"Invalid whence: {whence}")
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def read_view(self, size=-1):
+        """
+        Read without copying.
+
+        Args:
+            size (int): Maximum number of bytes, -1 for the rest of the file.
+
+        Returns:
+            memoryview: A slice of the mapping, empty at the end of the file.
+        """
+        start = min(self._position, self.size)
+        end = self.size if size is None or size < 0 else min(start + size, self.size)
+        self._position = end
+        if start - self._released >= RELEASE_SIZE:
+            self._release(start)
+        if self._metrics is not None:
+            self._metrics.add(self._counter, end - start)
+        return self._view[start:end]
+
+    def _release(self, offset):
+        """
+        Drop the pages between the last released offset and the given one
+        from the resident memory.
+        """
+        offset -= offset % mmap.PAGESIZE
+        if hasattr(mmap, "MADV_DONTNEED") and offset > self._released:
+            self._map.madvise(
+                mmap.MADV_DONTNEED, self._released, offset - self._released
+            )
+        self._released = offset
+
+    def read(self, size=-1):
+        return self.read_view(size).tobytes()
+
+    def read1(self, size=-1):
+        return self.read(size)
+
+    def readinto(self, buffer):
+        view = self.read_view(len(buffer))
+        buffer[: len(view)] = view
+        return len(view)
+
+    def iter_views(self, start, end, block_size):
+        """
+        Yield a range of the file in slices of the mapping, without copying.
+
+        Args:
+            start (int): First byte of the range.
+            end (int): End of the range (exclusive), or None for the end of file.
+            block_size (int): Maximum size of the slices.
+
+        Yields:
+            memoryview: The next slice.
+        """
+        self.seek(start)
+        end = self.size if end is None else min(end, self.size)
+        while self._position < end:
+            yield self.read_view(min(block_size, end - self._position))
+
+    def find(self, sub, start=0, end=None):
+        """
+        Find a byte string in the file, as bytes.find does.
+
+        Returns:
+            int: The offset of the first occurrence, or -1.
+        """
+        return self._map.find(sub, start, self.size if end is None else end)
+
+    def rfind(self, sub, start=0, end=None):
+        """
+        Find the last occurrence of a byte string in the file, as bytes.rfind does.
+
+        Returns:
+            int: The offset of the last occurrence, or -1.
+        """
+        return self._map.rfind(sub, start, self.size if end is None else end)
+
+    def byte_at(self, offset):
+        """
+        Get a single byte of the file.
+
+        Returns:
+            int: The byte value.
+        """
+        return self._map[offset]
@@ -0,0 +1,222 @@
+"""
+Utilities for collecting performance metrics while transformations run.
+"""
+
+import os
+import sys
+import threading
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        int: The peak RSS in bytes, or None when it cannot be measured.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes():
+    """
+    Get the current resident set size of the current process.
+
+    Returns:
+        int: The RSS in bytes, or None when it cannot be measured (only Linux
+            is supported).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class MemoryProbe:
+    """
+    Measure the memory a job adds to the resident set of its process.
+
+    Processes only expose their peak RSS, so a job is only measured when it
+    raises that peak: its memory is then the new peak minus the RSS when the
+    job started. A job staying under the peak is not measured, only bounded:
+    it added at most the peak minus the RSS when it started. Jobs running
+    concurrently in the same process are measured together.
+
+    The measured jobs are the ones using the most memory, so their growth
+    alone overestimates the jobs of a class. Consumers must also use the
+    bound of the other jobs, see CostModel.observe.
+    """
+
+    def __init__(self):
+        """
+        Record the RSS and the peak RSS at the start of the job.
+        """
+        self.start_rss = current_rss_bytes()
+        self.start_peak = peak_rss_bytes()
+
+    def growth(self, end_peak=None):
+        """
+        Get the memory added by the job.
+
+        Args:
+            end_peak (int): The peak RSS at the end of the job (default:
+                measured now).
+
+        Returns:
+            int: The growth in bytes, or None when the job did not raise the
+                peak or the RSS cannot be measured.
+        """
+        if end_peak is None:
+            end_peak = peak_rss_bytes()
+        if None in (self.start_rss, self.start_peak, end_peak):
+            return None
+        if end_peak <= self.start_peak:
+            return None
+        return max(end_peak - self.start_rss, 0)
+
+    def growth_bound(self, end_peak=None):
+        """
+        Get the most memory the job can have added, when it did not raise the
+        peak and growth cannot measure it.
+
+        Args:
+            end_peak (int): The peak RSS at the end of the job (default:
+                measured now).
+
+        Returns:
+            int: The bound in bytes, or None when the job raised the peak or
+                the RSS cannot be measured.
+        """
+        if end_peak is None:
+            end_peak = peak_rss_bytes()
+        if None in (self.start_rss, self.start_peak, end_peak):
+            return None
+        if end_peak > self.start_peak:
+            return None
+        return max(self.start_peak - self.start_rss, 0)
+
+
+class JobMetrics:
+    """
+    Counters and timings of a single transformation job.
+
+    Counters can be incremented from several threads (e.g. the parallel ZIP
+    extraction workers).
+    """
+
+    # Counters reported for every job
+    COUNTERS = (
+        "wall_time_s",
+        "cpu_time_s",
+        "bytes_read",
+        "bytes_written",
+        "rows_emitted",
+        "members_extracted",
+    )
+
+    def __init__(self):
+        """
+        Initialize all counters to zero.
+        """
+        self.values = dict.fromkeys(self.COUNTERS, 0)
+        self.values["peak_rss_bytes"] = None
+        self.values["memory_growth_bytes"] = None
+        self.values["memory_growth_max_bytes"] = None
+        self._lock = threading.Lock()
+
+    def add(self, name, amount):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): The counter name.
+            amount (int or float): The increment.
+        """
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + amount
+
+    def set(self, name, value):
+        """
+        Set the value of a metric.
+
+        Args:
+            name (str): The metric name.
+            value: The new value.
+        """
+        with self._lock:
+            self.values[name] = value
+
+    def to_dict(self):
+        """
+        Get a snapshot of the metrics.
+
+        Returns:
+            dict: Metric name -> value.
+        """
+        with self._lock:
+            return dict(self.values)
+
+
+class CountingStream:
+    """
+    Wrapper around a binary stream that counts the bytes read or written.
+
+    Every other attribute is delegated to the wrapped stream, so the wrapper
+    can be handed to consumers expecting a regular file object (ZipFile,
+    iterparse, TextIOWrapper, ...).
+    """
+
+    def __init__(self, stream, metrics, counter):
+        """
+        Initialize the wrapper.
+
+        Args:
+            stream (io.IOBase): The wrapped binary stream.
+            metrics (JobMetrics): The metrics receiving the byte counts.
+            counter (str): Name of the counter to increment.
+        """
+        self._stream = stream
+        self._metrics = metrics
+        self._counter = counter
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._stream.__exit__(exc_type, exc_value, traceback)
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self._metrics.add(self._counter, len(data))
+        return data
+
+    def read1(self, size=-1):
+        data = self._stream.read1(size)
+        self._metrics.add(self._counter, len(data))
+        return data
+
+    def readinto(self, buffer):
+        count = self._stream.readinto(buffer)
+        self._metrics.add(self._counter, count or 0)
+        return count
+
+    def write(self, data):
+        count = self._stream.write(data)
+        self._metrics.add(self._counter, len(data) if count is None else count)
+        return count
@@ -5,13 +5,17 @@ Utility functions for working with file paths and S3 paths.
 import os
 from pathlib import Path
 
+# Local directory simulating the S3 buckets
+DEFAULT_S3_SIMULATION_DIR = "s3_simulation"
 
-def s3_to_local_path(s3_path):
+
+def s3_to_local_path(s3_path, base_dir=DEFAULT_S3_SIMULATION_DIR):
     """
     Converts an S3 path to a local path.
 
     Args:
         s3_path (str): The S3 path to convert, should start with 's3://'.
+        base_dir (str or Path): The local directory simulating the buckets.
 
     Returns:
         Path: The corresponding local path object.
@@ -28,8 +32,7 @@ def s3_to_local_path(s3_path):
     relative_path = s3_path[5:]
 
     # Convert to local path
-    base_dir = Path("s3_simulation")
-    return base_dir / relative_path
+    return Path(base_dir) / relative_path
 
 
 def ensure_directory_exists(path):